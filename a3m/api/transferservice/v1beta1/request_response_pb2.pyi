@@ -4,6 +4,7 @@ isort:skip_file
 """
 import builtins
 import google.protobuf.descriptor
+import google.protobuf.field_mask_pb2
 import google.protobuf.internal.containers
 import google.protobuf.internal.enum_type_wrapper
 import google.protobuf.message
@@ -40,21 +41,51 @@ PACKAGE_STATUS_COMPLETE: PackageStatus.ValueType  # 3
 PACKAGE_STATUS_PROCESSING: PackageStatus.ValueType  # 4
 global___PackageStatus = PackageStatus
 
+class _PackagePriority:
+    ValueType = typing.NewType("ValueType", builtins.int)
+    V: typing_extensions.TypeAlias = ValueType
+
+class _PackagePriorityEnumTypeWrapper(
+    google.protobuf.internal.enum_type_wrapper._EnumTypeWrapper[
+        _PackagePriority.ValueType
+    ],
+    builtins.type,
+):
+    DESCRIPTOR: google.protobuf.descriptor.EnumDescriptor
+    PACKAGE_PRIORITY_UNSPECIFIED: _PackagePriority.ValueType  # 0
+    PACKAGE_PRIORITY_LOW: _PackagePriority.ValueType  # 1
+    PACKAGE_PRIORITY_NORMAL: _PackagePriority.ValueType  # 2
+    PACKAGE_PRIORITY_HIGH: _PackagePriority.ValueType  # 3
+
+class PackagePriority(_PackagePriority, metaclass=_PackagePriorityEnumTypeWrapper):
+    pass
+
+PACKAGE_PRIORITY_UNSPECIFIED: PackagePriority.ValueType  # 0
+PACKAGE_PRIORITY_LOW: PackagePriority.ValueType  # 1
+PACKAGE_PRIORITY_NORMAL: PackagePriority.ValueType  # 2
+PACKAGE_PRIORITY_HIGH: PackagePriority.ValueType  # 3
+global___PackagePriority = PackagePriority
+
 class SubmitRequest(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
     NAME_FIELD_NUMBER: builtins.int
     URL_FIELD_NUMBER: builtins.int
     CONFIG_FIELD_NUMBER: builtins.int
+    PRIORITY_FIELD_NUMBER: builtins.int
     name: typing.Text
     url: typing.Text
     @property
     def config(self) -> global___ProcessingConfig: ...
+    priority: global___PackagePriority.ValueType
+    """Priority of the package while it waits to be processed, normal if unspecified."""
+
     def __init__(
         self,
         *,
         name: typing.Text = ...,
         url: typing.Text = ...,
         config: typing.Optional[global___ProcessingConfig] = ...,
+        priority: global___PackagePriority.ValueType = ...,
     ) -> None: ...
     def HasField(
         self, field_name: typing_extensions.Literal["config", b"config"]
@@ -62,7 +93,7 @@ class SubmitRequest(google.protobuf.message.Message):
     def ClearField(
         self,
         field_name: typing_extensions.Literal[
-            "config", b"config", "name", b"name", "url", b"url"
+            "config", b"config", "name", b"name", "priority", b"priority", "url", b"url"
         ],
     ) -> None: ...
 
@@ -83,17 +114,65 @@ class SubmitResponse(google.protobuf.message.Message):
 
 global___SubmitResponse = SubmitResponse
 
+class SubmitBatchRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    TRANSFERS_FIELD_NUMBER: builtins.int
+    @property
+    def transfers(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[
+        global___SubmitRequest
+    ]: ...
+    def __init__(
+        self,
+        *,
+        transfers: typing.Optional[typing.Iterable[global___SubmitRequest]] = ...,
+    ) -> None: ...
+    def ClearField(
+        self, field_name: typing_extensions.Literal["transfers", b"transfers"]
+    ) -> None: ...
+
+global___SubmitBatchRequest = SubmitBatchRequest
+
+class SubmitBatchResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    IDS_FIELD_NUMBER: builtins.int
+    @property
+    def ids(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[typing.Text]:
+        """Identifiers of the packages, in the order of the transfers submitted."""
+        pass
+    def __init__(
+        self,
+        *,
+        ids: typing.Optional[typing.Iterable[typing.Text]] = ...,
+    ) -> None: ...
+    def ClearField(
+        self, field_name: typing_extensions.Literal["ids", b"ids"]
+    ) -> None: ...
+
+global___SubmitBatchResponse = SubmitBatchResponse
+
 class ReadRequest(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
     ID_FIELD_NUMBER: builtins.int
+    INCLUDE_JOBS_FIELD_NUMBER: builtins.int
     id: typing.Text
+    include_jobs: builtins.bool
+    """Include the jobs of the package in the response."""
+
     def __init__(
         self,
         *,
         id: typing.Text = ...,
+        include_jobs: builtins.bool = ...,
     ) -> None: ...
     def ClearField(
-        self, field_name: typing_extensions.Literal["id", b"id"]
+        self,
+        field_name: typing_extensions.Literal[
+            "id", b"id", "include_jobs", b"include_jobs"
+        ],
     ) -> None: ...
 
 global___ReadRequest = ReadRequest
@@ -127,17 +206,107 @@ class ReadResponse(google.protobuf.message.Message):
 
 global___ReadResponse = ReadResponse
 
+class WatchRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    ID_FIELD_NUMBER: builtins.int
+    id: typing.Text
+    def __init__(
+        self,
+        *,
+        id: typing.Text = ...,
+    ) -> None: ...
+    def ClearField(
+        self, field_name: typing_extensions.Literal["id", b"id"]
+    ) -> None: ...
+
+global___WatchRequest = WatchRequest
+
+class WatchResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    STATUS_FIELD_NUMBER: builtins.int
+    JOB_FIELD_NUMBER: builtins.int
+    JOBS_FIELD_NUMBER: builtins.int
+    status: global___PackageStatus.ValueType
+    job: typing.Text
+    @property
+    def jobs(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[
+        global___Job
+    ]:
+        """The jobs that changed since the previous response. The first and the
+        last responses list all the jobs of the package.
+        """
+        pass
+    def __init__(
+        self,
+        *,
+        status: global___PackageStatus.ValueType = ...,
+        job: typing.Text = ...,
+        jobs: typing.Optional[typing.Iterable[global___Job]] = ...,
+    ) -> None: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "job", b"job", "jobs", b"jobs", "status", b"status"
+        ],
+    ) -> None: ...
+
+global___WatchResponse = WatchResponse
+
 class ListTasksRequest(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
     JOB_ID_FIELD_NUMBER: builtins.int
+    PAGE_SIZE_FIELD_NUMBER: builtins.int
+    PAGE_TOKEN_FIELD_NUMBER: builtins.int
+    FILTER_FIELD_NUMBER: builtins.int
+    READ_MASK_FIELD_NUMBER: builtins.int
     job_id: typing.Text
+    page_size: builtins.int
+    """Maximum number of tasks returned, 1000 if unset. Larger values are
+    lowered to 10000.
+    """
+
+    page_token: typing.Text
+    """The next_page_token of the previous response, to get the next page."""
+
+    @property
+    def filter(self) -> global___TaskFilter: ...
+    @property
+    def read_mask(self) -> google.protobuf.field_mask_pb2.FieldMask:
+        """Fields of the tasks returned, all of them if unset. Leave stdout and
+        stderr out to keep responses small.
+        """
+        pass
     def __init__(
         self,
         *,
         job_id: typing.Text = ...,
+        page_size: builtins.int = ...,
+        page_token: typing.Text = ...,
+        filter: typing.Optional[global___TaskFilter] = ...,
+        read_mask: typing.Optional[google.protobuf.field_mask_pb2.FieldMask] = ...,
     ) -> None: ...
+    def HasField(
+        self,
+        field_name: typing_extensions.Literal[
+            "filter", b"filter", "read_mask", b"read_mask"
+        ],
+    ) -> builtins.bool: ...
     def ClearField(
-        self, field_name: typing_extensions.Literal["job_id", b"job_id"]
+        self,
+        field_name: typing_extensions.Literal[
+            "filter",
+            b"filter",
+            "job_id",
+            b"job_id",
+            "page_size",
+            b"page_size",
+            "page_token",
+            b"page_token",
+            "read_mask",
+            b"read_mask",
+        ],
     ) -> None: ...
 
 global___ListTasksRequest = ListTasksRequest
@@ -145,23 +314,120 @@ global___ListTasksRequest = ListTasksRequest
 class ListTasksResponse(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
     TASKS_FIELD_NUMBER: builtins.int
+    NEXT_PAGE_TOKEN_FIELD_NUMBER: builtins.int
+    SKIPPED_TASKS_FIELD_NUMBER: builtins.int
     @property
     def tasks(
         self,
     ) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[
         global___Task
     ]: ...
+    next_page_token: typing.Text
+    """Token of the next page, empty if this is the last one."""
+
+    skipped_tasks: builtins.int
+    """Files of the job not given a task, they aren't listed."""
+
     def __init__(
         self,
         *,
         tasks: typing.Optional[typing.Iterable[global___Task]] = ...,
+        next_page_token: typing.Text = ...,
+        skipped_tasks: builtins.int = ...,
     ) -> None: ...
     def ClearField(
-        self, field_name: typing_extensions.Literal["tasks", b"tasks"]
+        self,
+        field_name: typing_extensions.Literal[
+            "next_page_token",
+            b"next_page_token",
+            "skipped_tasks",
+            b"skipped_tasks",
+            "tasks",
+            b"tasks",
+        ],
     ) -> None: ...
 
 global___ListTasksResponse = ListTasksResponse
 
+class StreamTasksRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    JOB_ID_FIELD_NUMBER: builtins.int
+    FILTER_FIELD_NUMBER: builtins.int
+    READ_MASK_FIELD_NUMBER: builtins.int
+    job_id: typing.Text
+    @property
+    def filter(self) -> global___TaskFilter: ...
+    @property
+    def read_mask(self) -> google.protobuf.field_mask_pb2.FieldMask:
+        """Fields of the tasks returned, all of them if unset."""
+        pass
+    def __init__(
+        self,
+        *,
+        job_id: typing.Text = ...,
+        filter: typing.Optional[global___TaskFilter] = ...,
+        read_mask: typing.Optional[google.protobuf.field_mask_pb2.FieldMask] = ...,
+    ) -> None: ...
+    def HasField(
+        self,
+        field_name: typing_extensions.Literal[
+            "filter", b"filter", "read_mask", b"read_mask"
+        ],
+    ) -> builtins.bool: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "filter", b"filter", "job_id", b"job_id", "read_mask", b"read_mask"
+        ],
+    ) -> None: ...
+
+global___StreamTasksRequest = StreamTasksRequest
+
+class StreamTasksResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    TASKS_FIELD_NUMBER: builtins.int
+    @property
+    def tasks(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[
+        global___Task
+    ]: ...
+    def __init__(
+        self,
+        *,
+        tasks: typing.Optional[typing.Iterable[global___Task]] = ...,
+    ) -> None: ...
+    def ClearField(
+        self, field_name: typing_extensions.Literal["tasks", b"tasks"]
+    ) -> None: ...
+
+global___StreamTasksResponse = StreamTasksResponse
+
+class TaskFilter(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    FAILED_FIELD_NUMBER: builtins.int
+    FILENAME_PREFIX_FIELD_NUMBER: builtins.int
+    failed: builtins.bool
+    """Only include tasks with a non-zero exit code."""
+
+    filename_prefix: typing.Text
+    """Only include tasks whose filename starts with this prefix."""
+
+    def __init__(
+        self,
+        *,
+        failed: builtins.bool = ...,
+        filename_prefix: typing.Text = ...,
+    ) -> None: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "failed", b"failed", "filename_prefix", b"filename_prefix"
+        ],
+    ) -> None: ...
+
+global___TaskFilter = TaskFilter
+
 class EmptyRequest(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
     def __init__(
@@ -210,6 +476,7 @@ class Job(google.protobuf.message.Message):
     LINK_ID_FIELD_NUMBER: builtins.int
     STATUS_FIELD_NUMBER: builtins.int
     START_TIME_FIELD_NUMBER: builtins.int
+    SKIPPED_TASKS_FIELD_NUMBER: builtins.int
     id: typing.Text
     name: typing.Text
     group: typing.Text
@@ -217,6 +484,9 @@ class Job(google.protobuf.message.Message):
     status: global___Job.Status.ValueType
     @property
     def start_time(self) -> google.protobuf.timestamp_pb2.Timestamp: ...
+    skipped_tasks: builtins.int
+    """Files of the job not given a task, e.g. because no FPR rule applies to them."""
+
     def __init__(
         self,
         *,
@@ -226,6 +496,7 @@ class Job(google.protobuf.message.Message):
         link_id: typing.Text = ...,
         status: global___Job.Status.ValueType = ...,
         start_time: typing.Optional[google.protobuf.timestamp_pb2.Timestamp] = ...,
+        skipped_tasks: builtins.int = ...,
     ) -> None: ...
     def HasField(
         self, field_name: typing_extensions.Literal["start_time", b"start_time"]
@@ -241,6 +512,8 @@ class Job(google.protobuf.message.Message):
             b"link_id",
             "name",
             b"name",
+            "skipped_tasks",
+            b"skipped_tasks",
             "start_time",
             b"start_time",
             "status",
@@ -21,16 +21,31 @@ class TransferServiceStub:
             request_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.SubmitRequest.SerializeToString,
             response_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.SubmitResponse.FromString,
         )
+        self.SubmitBatch = channel.unary_unary(
+            "/a3m.api.transferservice.v1beta1.TransferService/SubmitBatch",
+            request_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.SubmitBatchRequest.SerializeToString,
+            response_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.SubmitBatchResponse.FromString,
+        )
         self.Read = channel.unary_unary(
             "/a3m.api.transferservice.v1beta1.TransferService/Read",
             request_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.ReadRequest.SerializeToString,
             response_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.ReadResponse.FromString,
         )
+        self.Watch = channel.unary_stream(
+            "/a3m.api.transferservice.v1beta1.TransferService/Watch",
+            request_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchRequest.SerializeToString,
+            response_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchResponse.FromString,
+        )
         self.ListTasks = channel.unary_unary(
             "/a3m.api.transferservice.v1beta1.TransferService/ListTasks",
             request_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.ListTasksRequest.SerializeToString,
             response_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.ListTasksResponse.FromString,
         )
+        self.StreamTasks = channel.unary_stream(
+            "/a3m.api.transferservice.v1beta1.TransferService/StreamTasks",
+            request_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.StreamTasksRequest.SerializeToString,
+            response_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.StreamTasksResponse.FromString,
+        )
         self.Empty = channel.unary_unary(
             "/a3m.api.transferservice.v1beta1.TransferService/Empty",
             request_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.EmptyRequest.SerializeToString,
@@ -47,14 +62,32 @@ class TransferServiceServicer:
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def SubmitBatch(self, request, context):
+        """Submits many new transfers at once."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def Read(self, request, context):
         """Reads the status of a given transfer."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def Watch(self, request, context):
+        """Streams the status of a given transfer as its jobs run, until processing ends."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def ListTasks(self, request, context):
-        """Lists all tasks in a given transfer."""
+        """Lists the tasks of a given job, one page at a time."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def StreamTasks(self, request, context):
+        """Streams the tasks of a given job."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
@@ -73,16 +106,31 @@ def add_TransferServiceServicer_to_server(servicer, server):
             request_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.SubmitRequest.FromString,
             response_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.SubmitResponse.SerializeToString,
         ),
+        "SubmitBatch": grpc.unary_unary_rpc_method_handler(
+            servicer.SubmitBatch,
+            request_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.SubmitBatchRequest.FromString,
+            response_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.SubmitBatchResponse.SerializeToString,
+        ),
         "Read": grpc.unary_unary_rpc_method_handler(
             servicer.Read,
             request_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.ReadRequest.FromString,
             response_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.ReadResponse.SerializeToString,
         ),
+        "Watch": grpc.unary_stream_rpc_method_handler(
+            servicer.Watch,
+            request_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchRequest.FromString,
+            response_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchResponse.SerializeToString,
+        ),
         "ListTasks": grpc.unary_unary_rpc_method_handler(
             servicer.ListTasks,
             request_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.ListTasksRequest.FromString,
             response_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.ListTasksResponse.SerializeToString,
         ),
+        "StreamTasks": grpc.unary_stream_rpc_method_handler(
+            servicer.StreamTasks,
+            request_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.StreamTasksRequest.FromString,
+            response_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.StreamTasksResponse.SerializeToString,
+        ),
         "Empty": grpc.unary_unary_rpc_method_handler(
             servicer.Empty,
             request_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.EmptyRequest.FromString,
@@ -128,6 +176,35 @@ class TransferService:
             metadata,
         )
 
+    @staticmethod
+    def SubmitBatch(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/a3m.api.transferservice.v1beta1.TransferService/SubmitBatch",
+            a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.SubmitBatchRequest.SerializeToString,
+            a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.SubmitBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
     @staticmethod
     def Read(
         request,
@@ -157,6 +234,35 @@ class TransferService:
             metadata,
         )
 
+    @staticmethod
+    def Watch(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/a3m.api.transferservice.v1beta1.TransferService/Watch",
+            a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchRequest.SerializeToString,
+            a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
     @staticmethod
     def ListTasks(
         request,
@@ -186,6 +292,35 @@ class TransferService:
             metadata,
         )
 
+    @staticmethod
+    def StreamTasks(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/a3m.api.transferservice.v1beta1.TransferService/StreamTasks",
+            a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.StreamTasksRequest.SerializeToString,
+            a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.StreamTasksResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
     @staticmethod
     def Empty(
         request,
@@ -0,0 +1,61 @@
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: a3m/api/workerservice/v1beta1/request_response.proto
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
+    b'\n4a3m/api/workerservice/v1beta1/request_response.proto\x12\x1d\x61\x33m.api.workerservice.v1beta1\x1a\x1fgoogle/protobuf/timestamp.proto"V\n\x0cLeaseRequest\x12\x1b\n\tworker_id\x18\x01 \x01(\tR\x08workerId\x12)\n\x10resource_classes\x18\x02 \x03(\tR\x0fresourceClasses"r\n\rLeaseResponse\x12:\n\x05\x62\x61tch\x18\x01 \x01(\x0b\x32$.a3m.api.workerservice.v1beta1.BatchR\x05\x62\x61tch\x12%\n\x0elease_duration\x18\x02 \x01(\x01R\rleaseDuration"L\n\x10HeartbeatRequest\x12\x1b\n\tworker_id\x18\x01 \x01(\tR\x08workerId\x12\x1b\n\tbatch_ids\x18\x02 \x03(\tR\x08\x62\x61tchIds"9\n\x11HeartbeatResponse\x12$\n\x0elost_batch_ids\x18\x01 \x03(\tR\x0clostBatchIds"\xad\x01\n\x17ReportTaskResultRequest\x12\x1b\n\tworker_id\x18\x01 \x01(\tR\x08workerId\x12\x19\n\x08\x62\x61tch_id\x18\x02 \x01(\tR\x07\x62\x61tchId\x12\x17\n\x07task_id\x18\x03 \x01(\tR\x06taskId\x12\x41\n\x06result\x18\x04 \x01(\x0b\x32).a3m.api.workerservice.v1beta1.TaskResultR\x06result"6\n\x18ReportTaskResultResponse\x12\x1a\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08R\x08\x61\x63\x63\x65pted"\xde\x02\n\x0f\x43ompleteRequest\x12\x1b\n\tworker_id\x18\x01 \x01(\tR\x08workerId\x12\x19\n\x08\x62\x61tch_id\x18\x02 \x01(\tR\x07\x62\x61tchId\x12\x62\n\x0ctask_results\x18\x03 \x03(\x0b\x32?.a3m.api.workerservice.v1beta1.CompleteRequest.TaskResultsEntryR\x0btaskResults\x12\x1f\n\x08\x64uration\x18\x04 \x01(\x01H\x00R\x08\x64uration\x88\x01\x01\x12\x16\n\x06\x66\x61iled\x18\x05 \x01(\x08R\x06\x66\x61iled\x1ai\n\x10TaskResultsEntry\x12\x10\n\x03key\x18\x01 \x01(\tR\x03key\x12?\n\x05value\x18\x02 \x01(\x0b\x32).a3m.api.workerservice.v1beta1.TaskResultR\x05value:\x02\x38\x01\x42\x0b\n\t_duration".\n\x10\x43ompleteResponse\x12\x1a\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08R\x08\x61\x63\x63\x65pted"r\n\x05\x42\x61tch\x12\x0e\n\x02id\x18\x01 \x01(\tR\x02id\x12\x19\n\x08job_name\x18\x02 \x01(\tR\x07jobName\x12>\n\x05tasks\x18\x03 \x03(\x0b\x32(.a3m.api.workerservice.v1beta1.BatchTaskR\x05tasks"\xc8\x01\n\tBatchTask\x12\x0e\n\x02id\x18\x01 \x01(\tR\x02id\x12!\n\x0c\x63reated_date\x18\x02 \x01(\tR\x0b\x63reatedDate\x12\x1c\n\targuments\x18\x03 \x01(\tR\targuments\x12\x12\n\x04\x61rgv\x18\x04 \x03(\tR\x04\x61rgv\x12\x19\n\x08has_argv\x18\x05 \x01(\x08R\x07hasArgv\x12!\n\x0cwants_output\x18\x06 \x01(\x08R\x0bwantsOutput\x12\x18\n\x07\x65xecute\x18\x07 \x01(\tR\x07\x65xecute"\x8e\x02\n\nTaskResult\x12\x1b\n\texit_code\x18\x01 \x01(\x05R\x08\x65xitCode\x12;\n\x0b\x66inish_time\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.TimestampR\nfinishTime\x12\x1b\n\x06stdout\x18\x03 \x01(\tH\x00R\x06stdout\x88\x01\x01\x12\x1b\n\x06stderr\x18\x04 \x01(\tH\x01R\x06stderr\x88\x01\x01\x12V\n\x0fpackage_updates\x18\x05 \x01(\x0b\x32-.a3m.api.workerservice.v1beta1.PackageUpdatesR\x0epackageUpdatesB\t\n\x07_stdoutB\t\n\x07_stderr"\xc4\x02\n\x0ePackageUpdates\x12(\n\rtransfer_path\x18\x01 \x01(\tH\x00R\x0ctransferPath\x88\x01\x01\x12\x1e\n\x08sip_path\x18\x02 \x01(\tH\x01R\x07sipPath\x88\x01\x01\x12&\n\x0c\x61ip_filename\x18\x03 \x01(\tH\x02R\x0b\x61ipFilename\x88\x01\x01\x12T\n\x07\x63ontext\x18\x04 \x03(\x0b\x32:.a3m.api.workerservice.v1beta1.PackageUpdates.ContextEntryR\x07\x63ontext\x1a:\n\x0c\x43ontextEntry\x12\x10\n\x03key\x18\x01 \x01(\tR\x03key\x12\x14\n\x05value\x18\x02 \x01(\tR\x05value:\x02\x38\x01\x42\x10\n\x0e_transfer_pathB\x0b\n\t_sip_pathB\x0f\n\r_aip_filenameB\xa3\x02\n!com.a3m.api.workerservice.v1beta1B\x14RequestResponseProtoP\x01ZQgithub.com/artefactual-labs/a3m/proto/a3m/api/workerservice/v1beta1;workerservice\xa2\x02\x03\x41\x41W\xaa\x02\x1d\x41\x33m.Api.Workerservice.V1beta1\xca\x02\x1d\x41\x33m\\Api\\Workerservice\\V1beta1\xe2\x02)A3m\\Api\\Workerservice\\V1beta1\\GPBMetadata\xea\x02 A3m::Api::Workerservice::V1beta1b\x06proto3'
+)
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(
+    DESCRIPTOR, "a3m.api.workerservice.v1beta1.request_response_pb2", globals()
+)
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+    DESCRIPTOR._options = None
+    DESCRIPTOR._serialized_options = b"\n!com.a3m.api.workerservice.v1beta1B\024RequestResponseProtoP\001ZQgithub.com/artefactual-labs/a3m/proto/a3m/api/workerservice/v1beta1;workerservice\242\002\003AAW\252\002\035A3m.Api.Workerservice.V1beta1\312\002\035A3m\\Api\\Workerservice\\V1beta1\342\002)A3m\\Api\\Workerservice\\V1beta1\\GPBMetadata\352\002 A3m::Api::Workerservice::V1beta1"
+    _COMPLETEREQUEST_TASKRESULTSENTRY._options = None
+    _COMPLETEREQUEST_TASKRESULTSENTRY._serialized_options = b"8\001"
+    _PACKAGEUPDATES_CONTEXTENTRY._options = None
+    _PACKAGEUPDATES_CONTEXTENTRY._serialized_options = b"8\001"
+    _LEASEREQUEST._serialized_start = 120
+    _LEASEREQUEST._serialized_end = 206
+    _LEASERESPONSE._serialized_start = 208
+    _LEASERESPONSE._serialized_end = 322
+    _HEARTBEATREQUEST._serialized_start = 324
+    _HEARTBEATREQUEST._serialized_end = 400
+    _HEARTBEATRESPONSE._serialized_start = 402
+    _HEARTBEATRESPONSE._serialized_end = 459
+    _REPORTTASKRESULTREQUEST._serialized_start = 462
+    _REPORTTASKRESULTREQUEST._serialized_end = 635
+    _REPORTTASKRESULTRESPONSE._serialized_start = 637
+    _REPORTTASKRESULTRESPONSE._serialized_end = 691
+    _COMPLETEREQUEST._serialized_start = 694
+    _COMPLETEREQUEST._serialized_end = 1044
+    _COMPLETEREQUEST_TASKRESULTSENTRY._serialized_start = 926
+    _COMPLETEREQUEST_TASKRESULTSENTRY._serialized_end = 1031
+    _COMPLETERESPONSE._serialized_start = 1046
+    _COMPLETERESPONSE._serialized_end = 1092
+    _BATCH._serialized_start = 1094
+    _BATCH._serialized_end = 1208
+    _BATCHTASK._serialized_start = 1211
+    _BATCHTASK._serialized_end = 1411
+    _TASKRESULT._serialized_start = 1414
+    _TASKRESULT._serialized_end = 1684
+    _PACKAGEUPDATES._serialized_start = 1687
+    _PACKAGEUPDATES._serialized_end = 2011
+    _PACKAGEUPDATES_CONTEXTENTRY._serialized_start = 1905
+    _PACKAGEUPDATES_CONTEXTENTRY._serialized_end = 1963
+# @@protoc_insertion_point(module_scope)
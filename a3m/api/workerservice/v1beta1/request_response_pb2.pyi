@@ -0,0 +1,525 @@
+"""
+@generated by mypy-protobuf.  Do not edit manually!
+isort:skip_file
+"""
+import builtins
+import google.protobuf.descriptor
+import google.protobuf.internal.containers
+import google.protobuf.message
+import google.protobuf.timestamp_pb2
+import typing
+import typing_extensions
+
+DESCRIPTOR: google.protobuf.descriptor.FileDescriptor
+
+class LeaseRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    WORKER_ID_FIELD_NUMBER: builtins.int
+    RESOURCE_CLASSES_FIELD_NUMBER: builtins.int
+    worker_id: typing.Text
+    @property
+    def resource_classes(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[typing.Text]:
+        """Resource classes of the batches the worker runs, all of them if empty."""
+        pass
+    def __init__(
+        self,
+        *,
+        worker_id: typing.Text = ...,
+        resource_classes: typing.Optional[typing.Iterable[typing.Text]] = ...,
+    ) -> None: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "resource_classes", b"resource_classes", "worker_id", b"worker_id"
+        ],
+    ) -> None: ...
+
+global___LeaseRequest = LeaseRequest
+
+class LeaseResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    BATCH_FIELD_NUMBER: builtins.int
+    LEASE_DURATION_FIELD_NUMBER: builtins.int
+    @property
+    def batch(self) -> global___Batch:
+        """Unset when there are no batches to run."""
+        pass
+    lease_duration: builtins.float
+    """Seconds the lease lasts without heartbeats or task results."""
+
+    def __init__(
+        self,
+        *,
+        batch: typing.Optional[global___Batch] = ...,
+        lease_duration: builtins.float = ...,
+    ) -> None: ...
+    def HasField(
+        self, field_name: typing_extensions.Literal["batch", b"batch"]
+    ) -> builtins.bool: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "batch", b"batch", "lease_duration", b"lease_duration"
+        ],
+    ) -> None: ...
+
+global___LeaseResponse = LeaseResponse
+
+class HeartbeatRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    WORKER_ID_FIELD_NUMBER: builtins.int
+    BATCH_IDS_FIELD_NUMBER: builtins.int
+    worker_id: typing.Text
+    @property
+    def batch_ids(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[
+        typing.Text
+    ]: ...
+    def __init__(
+        self,
+        *,
+        worker_id: typing.Text = ...,
+        batch_ids: typing.Optional[typing.Iterable[typing.Text]] = ...,
+    ) -> None: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "batch_ids", b"batch_ids", "worker_id", b"worker_id"
+        ],
+    ) -> None: ...
+
+global___HeartbeatRequest = HeartbeatRequest
+
+class HeartbeatResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    LOST_BATCH_IDS_FIELD_NUMBER: builtins.int
+    @property
+    def lost_batch_ids(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[typing.Text]:
+        """Batches whose lease the worker lost."""
+        pass
+    def __init__(
+        self,
+        *,
+        lost_batch_ids: typing.Optional[typing.Iterable[typing.Text]] = ...,
+    ) -> None: ...
+    def ClearField(
+        self, field_name: typing_extensions.Literal["lost_batch_ids", b"lost_batch_ids"]
+    ) -> None: ...
+
+global___HeartbeatResponse = HeartbeatResponse
+
+class ReportTaskResultRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    WORKER_ID_FIELD_NUMBER: builtins.int
+    BATCH_ID_FIELD_NUMBER: builtins.int
+    TASK_ID_FIELD_NUMBER: builtins.int
+    RESULT_FIELD_NUMBER: builtins.int
+    worker_id: typing.Text
+    batch_id: typing.Text
+    task_id: typing.Text
+    @property
+    def result(self) -> global___TaskResult: ...
+    def __init__(
+        self,
+        *,
+        worker_id: typing.Text = ...,
+        batch_id: typing.Text = ...,
+        task_id: typing.Text = ...,
+        result: typing.Optional[global___TaskResult] = ...,
+    ) -> None: ...
+    def HasField(
+        self, field_name: typing_extensions.Literal["result", b"result"]
+    ) -> builtins.bool: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "batch_id",
+            b"batch_id",
+            "result",
+            b"result",
+            "task_id",
+            b"task_id",
+            "worker_id",
+            b"worker_id",
+        ],
+    ) -> None: ...
+
+global___ReportTaskResultRequest = ReportTaskResultRequest
+
+class ReportTaskResultResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    ACCEPTED_FIELD_NUMBER: builtins.int
+    accepted: builtins.bool
+    """False if the worker lost the lease, or the task isn't part of the batch."""
+
+    def __init__(
+        self,
+        *,
+        accepted: builtins.bool = ...,
+    ) -> None: ...
+    def ClearField(
+        self, field_name: typing_extensions.Literal["accepted", b"accepted"]
+    ) -> None: ...
+
+global___ReportTaskResultResponse = ReportTaskResultResponse
+
+class CompleteRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    class TaskResultsEntry(google.protobuf.message.Message):
+        DESCRIPTOR: google.protobuf.descriptor.Descriptor
+        KEY_FIELD_NUMBER: builtins.int
+        VALUE_FIELD_NUMBER: builtins.int
+        key: typing.Text
+        @property
+        def value(self) -> global___TaskResult: ...
+        def __init__(
+            self,
+            *,
+            key: typing.Text = ...,
+            value: typing.Optional[global___TaskResult] = ...,
+        ) -> None: ...
+        def HasField(
+            self, field_name: typing_extensions.Literal["value", b"value"]
+        ) -> builtins.bool: ...
+        def ClearField(
+            self,
+            field_name: typing_extensions.Literal["key", b"key", "value", b"value"],
+        ) -> None: ...
+
+    WORKER_ID_FIELD_NUMBER: builtins.int
+    BATCH_ID_FIELD_NUMBER: builtins.int
+    TASK_RESULTS_FIELD_NUMBER: builtins.int
+    DURATION_FIELD_NUMBER: builtins.int
+    FAILED_FIELD_NUMBER: builtins.int
+    worker_id: typing.Text
+    batch_id: typing.Text
+    @property
+    def task_results(
+        self,
+    ) -> google.protobuf.internal.containers.MessageMap[
+        typing.Text, global___TaskResult
+    ]:
+        """Results by task identifier."""
+        pass
+    duration: builtins.float
+    """Seconds spent running the batch."""
+
+    failed: builtins.bool
+    """Whether the batch failed, its tasks are all failed then."""
+
+    def __init__(
+        self,
+        *,
+        worker_id: typing.Text = ...,
+        batch_id: typing.Text = ...,
+        task_results: typing.Optional[
+            typing.Mapping[typing.Text, global___TaskResult]
+        ] = ...,
+        duration: typing.Optional[builtins.float] = ...,
+        failed: builtins.bool = ...,
+    ) -> None: ...
+    def HasField(
+        self,
+        field_name: typing_extensions.Literal[
+            "_duration", b"_duration", "duration", b"duration"
+        ],
+    ) -> builtins.bool: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "_duration",
+            b"_duration",
+            "batch_id",
+            b"batch_id",
+            "duration",
+            b"duration",
+            "failed",
+            b"failed",
+            "task_results",
+            b"task_results",
+            "worker_id",
+            b"worker_id",
+        ],
+    ) -> None: ...
+    def WhichOneof(
+        self, oneof_group: typing_extensions.Literal["_duration", b"_duration"]
+    ) -> typing.Optional[typing_extensions.Literal["duration"]]: ...
+
+global___CompleteRequest = CompleteRequest
+
+class CompleteResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    ACCEPTED_FIELD_NUMBER: builtins.int
+    accepted: builtins.bool
+    """False if the worker lost the lease."""
+
+    def __init__(
+        self,
+        *,
+        accepted: builtins.bool = ...,
+    ) -> None: ...
+    def ClearField(
+        self, field_name: typing_extensions.Literal["accepted", b"accepted"]
+    ) -> None: ...
+
+global___CompleteResponse = CompleteResponse
+
+class Batch(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    ID_FIELD_NUMBER: builtins.int
+    JOB_NAME_FIELD_NUMBER: builtins.int
+    TASKS_FIELD_NUMBER: builtins.int
+    id: typing.Text
+    job_name: typing.Text
+    """Name of the client script."""
+
+    @property
+    def tasks(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[
+        global___BatchTask
+    ]: ...
+    def __init__(
+        self,
+        *,
+        id: typing.Text = ...,
+        job_name: typing.Text = ...,
+        tasks: typing.Optional[typing.Iterable[global___BatchTask]] = ...,
+    ) -> None: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "id", b"id", "job_name", b"job_name", "tasks", b"tasks"
+        ],
+    ) -> None: ...
+
+global___Batch = Batch
+
+class BatchTask(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    ID_FIELD_NUMBER: builtins.int
+    CREATED_DATE_FIELD_NUMBER: builtins.int
+    ARGUMENTS_FIELD_NUMBER: builtins.int
+    ARGV_FIELD_NUMBER: builtins.int
+    HAS_ARGV_FIELD_NUMBER: builtins.int
+    WANTS_OUTPUT_FIELD_NUMBER: builtins.int
+    EXECUTE_FIELD_NUMBER: builtins.int
+    id: typing.Text
+    created_date: typing.Text
+    """Value of the %jobCreatedDate% replacement."""
+
+    arguments: typing.Text
+    @property
+    def argv(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[typing.Text]:
+        """Arguments split by the server, used instead of arguments if has_argv is set."""
+        pass
+    has_argv: builtins.bool
+    wants_output: builtins.bool
+    execute: typing.Text
+    def __init__(
+        self,
+        *,
+        id: typing.Text = ...,
+        created_date: typing.Text = ...,
+        arguments: typing.Text = ...,
+        argv: typing.Optional[typing.Iterable[typing.Text]] = ...,
+        has_argv: builtins.bool = ...,
+        wants_output: builtins.bool = ...,
+        execute: typing.Text = ...,
+    ) -> None: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "arguments",
+            b"arguments",
+            "argv",
+            b"argv",
+            "created_date",
+            b"created_date",
+            "execute",
+            b"execute",
+            "has_argv",
+            b"has_argv",
+            "id",
+            b"id",
+            "wants_output",
+            b"wants_output",
+        ],
+    ) -> None: ...
+
+global___BatchTask = BatchTask
+
+class TaskResult(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    EXIT_CODE_FIELD_NUMBER: builtins.int
+    FINISH_TIME_FIELD_NUMBER: builtins.int
+    STDOUT_FIELD_NUMBER: builtins.int
+    STDERR_FIELD_NUMBER: builtins.int
+    PACKAGE_UPDATES_FIELD_NUMBER: builtins.int
+    exit_code: builtins.int
+    @property
+    def finish_time(self) -> google.protobuf.timestamp_pb2.Timestamp: ...
+    stdout: typing.Text
+    """Output of the client script, only sent if the task wants it."""
+
+    stderr: typing.Text
+    @property
+    def package_updates(self) -> global___PackageUpdates: ...
+    def __init__(
+        self,
+        *,
+        exit_code: builtins.int = ...,
+        finish_time: typing.Optional[google.protobuf.timestamp_pb2.Timestamp] = ...,
+        stdout: typing.Optional[typing.Text] = ...,
+        stderr: typing.Optional[typing.Text] = ...,
+        package_updates: typing.Optional[global___PackageUpdates] = ...,
+    ) -> None: ...
+    def HasField(
+        self,
+        field_name: typing_extensions.Literal[
+            "_stderr",
+            b"_stderr",
+            "_stdout",
+            b"_stdout",
+            "finish_time",
+            b"finish_time",
+            "package_updates",
+            b"package_updates",
+            "stderr",
+            b"stderr",
+            "stdout",
+            b"stdout",
+        ],
+    ) -> builtins.bool: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "_stderr",
+            b"_stderr",
+            "_stdout",
+            b"_stdout",
+            "exit_code",
+            b"exit_code",
+            "finish_time",
+            b"finish_time",
+            "package_updates",
+            b"package_updates",
+            "stderr",
+            b"stderr",
+            "stdout",
+            b"stdout",
+        ],
+    ) -> None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing_extensions.Literal["_stderr", b"_stderr"]
+    ) -> typing.Optional[typing_extensions.Literal["stderr"]]: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing_extensions.Literal["_stdout", b"_stdout"]
+    ) -> typing.Optional[typing_extensions.Literal["stdout"]]: ...
+
+global___TaskResult = TaskResult
+
+class PackageUpdates(google.protobuf.message.Message):
+    """Changes made to the package by a client script."""
+
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    class ContextEntry(google.protobuf.message.Message):
+        DESCRIPTOR: google.protobuf.descriptor.Descriptor
+        KEY_FIELD_NUMBER: builtins.int
+        VALUE_FIELD_NUMBER: builtins.int
+        key: typing.Text
+        value: typing.Text
+        def __init__(
+            self,
+            *,
+            key: typing.Text = ...,
+            value: typing.Text = ...,
+        ) -> None: ...
+        def ClearField(
+            self,
+            field_name: typing_extensions.Literal["key", b"key", "value", b"value"],
+        ) -> None: ...
+
+    TRANSFER_PATH_FIELD_NUMBER: builtins.int
+    SIP_PATH_FIELD_NUMBER: builtins.int
+    AIP_FILENAME_FIELD_NUMBER: builtins.int
+    CONTEXT_FIELD_NUMBER: builtins.int
+    transfer_path: typing.Text
+    sip_path: typing.Text
+    aip_filename: typing.Text
+    @property
+    def context(
+        self,
+    ) -> google.protobuf.internal.containers.ScalarMap[typing.Text, typing.Text]:
+        """Replacement values for the following jobs."""
+        pass
+    def __init__(
+        self,
+        *,
+        transfer_path: typing.Optional[typing.Text] = ...,
+        sip_path: typing.Optional[typing.Text] = ...,
+        aip_filename: typing.Optional[typing.Text] = ...,
+        context: typing.Optional[typing.Mapping[typing.Text, typing.Text]] = ...,
+    ) -> None: ...
+    def HasField(
+        self,
+        field_name: typing_extensions.Literal[
+            "_aip_filename",
+            b"_aip_filename",
+            "_sip_path",
+            b"_sip_path",
+            "_transfer_path",
+            b"_transfer_path",
+            "aip_filename",
+            b"aip_filename",
+            "sip_path",
+            b"sip_path",
+            "transfer_path",
+            b"transfer_path",
+        ],
+    ) -> builtins.bool: ...
+    def ClearField(
+        self,
+        field_name: typing_extensions.Literal[
+            "_aip_filename",
+            b"_aip_filename",
+            "_sip_path",
+            b"_sip_path",
+            "_transfer_path",
+            b"_transfer_path",
+            "aip_filename",
+            b"aip_filename",
+            "context",
+            b"context",
+            "sip_path",
+            b"sip_path",
+            "transfer_path",
+            b"transfer_path",
+        ],
+    ) -> None: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing_extensions.Literal["_aip_filename", b"_aip_filename"]
+    ) -> typing.Optional[typing_extensions.Literal["aip_filename"]]: ...
+    @typing.overload
+    def WhichOneof(
+        self, oneof_group: typing_extensions.Literal["_sip_path", b"_sip_path"]
+    ) -> typing.Optional[typing_extensions.Literal["sip_path"]]: ...
+    @typing.overload
+    def WhichOneof(
+        self,
+        oneof_group: typing_extensions.Literal["_transfer_path", b"_transfer_path"],
+    ) -> typing.Optional[typing_extensions.Literal["transfer_path"]]: ...
+
+global___PackageUpdates = PackageUpdates
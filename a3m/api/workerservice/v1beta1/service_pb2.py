@@ -0,0 +1,33 @@
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: a3m/api/workerservice/v1beta1/service.proto
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from a3m.api.workerservice.v1beta1 import (
+    request_response_pb2 as a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2,
+)
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
+    b'\n+a3m/api/workerservice/v1beta1/service.proto\x12\x1d\x61\x33m.api.workerservice.v1beta1\x1a\x34\x61\x33m/api/workerservice/v1beta1/request_response.proto2\xde\x03\n\rWorkerService\x12\x64\n\x05Lease\x12+.a3m.api.workerservice.v1beta1.LeaseRequest\x1a,.a3m.api.workerservice.v1beta1.LeaseResponse"\x00\x12p\n\tHeartbeat\x12/.a3m.api.workerservice.v1beta1.HeartbeatRequest\x1a\x30.a3m.api.workerservice.v1beta1.HeartbeatResponse"\x00\x12\x85\x01\n\x10ReportTaskResult\x12\x36.a3m.api.workerservice.v1beta1.ReportTaskResultRequest\x1a\x37.a3m.api.workerservice.v1beta1.ReportTaskResultResponse"\x00\x12m\n\x08\x43omplete\x12..a3m.api.workerservice.v1beta1.CompleteRequest\x1a/.a3m.api.workerservice.v1beta1.CompleteResponse"\x00\x42\x9b\x02\n!com.a3m.api.workerservice.v1beta1B\x0cServiceProtoP\x01ZQgithub.com/artefactual-labs/a3m/proto/a3m/api/workerservice/v1beta1;workerservice\xa2\x02\x03\x41\x41W\xaa\x02\x1d\x41\x33m.Api.Workerservice.V1beta1\xca\x02\x1d\x41\x33m\\Api\\Workerservice\\V1beta1\xe2\x02)A3m\\Api\\Workerservice\\V1beta1\\GPBMetadata\xea\x02 A3m::Api::Workerservice::V1beta1b\x06proto3'
+)
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(
+    DESCRIPTOR, "a3m.api.workerservice.v1beta1.service_pb2", globals()
+)
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+    DESCRIPTOR._options = None
+    DESCRIPTOR._serialized_options = b"\n!com.a3m.api.workerservice.v1beta1B\014ServiceProtoP\001ZQgithub.com/artefactual-labs/a3m/proto/a3m/api/workerservice/v1beta1;workerservice\242\002\003AAW\252\002\035A3m.Api.Workerservice.V1beta1\312\002\035A3m\\Api\\Workerservice\\V1beta1\342\002)A3m\\Api\\Workerservice\\V1beta1\\GPBMetadata\352\002 A3m::Api::Workerservice::V1beta1"
+    _WORKERSERVICE._serialized_start = 133
+    _WORKERSERVICE._serialized_end = 611
+# @@protoc_insertion_point(module_scope)
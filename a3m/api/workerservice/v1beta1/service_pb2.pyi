@@ -0,0 +1,7 @@
+"""
+@generated by mypy-protobuf.  Do not edit manually!
+isort:skip_file
+"""
+import google.protobuf.descriptor
+
+DESCRIPTOR: google.protobuf.descriptor.FileDescriptor
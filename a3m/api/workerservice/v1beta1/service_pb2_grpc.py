@@ -0,0 +1,216 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from a3m.api.workerservice.v1beta1 import (
+    request_response_pb2 as a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2,
+)
+
+
+class WorkerServiceStub:
+    """Batches of tasks run by remote workers, served when the remote task backend is used."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Lease = channel.unary_unary(
+            "/a3m.api.workerservice.v1beta1.WorkerService/Lease",
+            request_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseRequest.SerializeToString,
+            response_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseResponse.FromString,
+        )
+        self.Heartbeat = channel.unary_unary(
+            "/a3m.api.workerservice.v1beta1.WorkerService/Heartbeat",
+            request_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatRequest.SerializeToString,
+            response_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatResponse.FromString,
+        )
+        self.ReportTaskResult = channel.unary_unary(
+            "/a3m.api.workerservice.v1beta1.WorkerService/ReportTaskResult",
+            request_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.ReportTaskResultRequest.SerializeToString,
+            response_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.ReportTaskResultResponse.FromString,
+        )
+        self.Complete = channel.unary_unary(
+            "/a3m.api.workerservice.v1beta1.WorkerService/Complete",
+            request_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteRequest.SerializeToString,
+            response_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteResponse.FromString,
+        )
+
+
+class WorkerServiceServicer:
+    """Batches of tasks run by remote workers, served when the remote task backend is used."""
+
+    def Lease(self, request, context):
+        """Leases the next batch of tasks to run, if any."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def Heartbeat(self, request, context):
+        """Renews the leases of the batches run by a worker."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def ReportTaskResult(self, request, context):
+        """Reports the result of a task as soon as it's done."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def Complete(self, request, context):
+        """Reports the results of a batch once it's done."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+
+def add_WorkerServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+        "Lease": grpc.unary_unary_rpc_method_handler(
+            servicer.Lease,
+            request_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseRequest.FromString,
+            response_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseResponse.SerializeToString,
+        ),
+        "Heartbeat": grpc.unary_unary_rpc_method_handler(
+            servicer.Heartbeat,
+            request_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatRequest.FromString,
+            response_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatResponse.SerializeToString,
+        ),
+        "ReportTaskResult": grpc.unary_unary_rpc_method_handler(
+            servicer.ReportTaskResult,
+            request_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.ReportTaskResultRequest.FromString,
+            response_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.ReportTaskResultResponse.SerializeToString,
+        ),
+        "Complete": grpc.unary_unary_rpc_method_handler(
+            servicer.Complete,
+            request_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteRequest.FromString,
+            response_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteResponse.SerializeToString,
+        ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+        "a3m.api.workerservice.v1beta1.WorkerService", rpc_method_handlers
+    )
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+# This class is part of an EXPERIMENTAL API.
+class WorkerService:
+    """Batches of tasks run by remote workers, served when the remote task backend is used."""
+
+    @staticmethod
+    def Lease(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/a3m.api.workerservice.v1beta1.WorkerService/Lease",
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseRequest.SerializeToString,
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
+    @staticmethod
+    def Heartbeat(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/a3m.api.workerservice.v1beta1.WorkerService/Heartbeat",
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatRequest.SerializeToString,
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
+    @staticmethod
+    def ReportTaskResult(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/a3m.api.workerservice.v1beta1.WorkerService/ReportTaskResult",
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.ReportTaskResultRequest.SerializeToString,
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.ReportTaskResultResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
+    @staticmethod
+    def Complete(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/a3m.api.workerservice.v1beta1.WorkerService/Complete",
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteRequest.SerializeToString,
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
@@ -18,12 +18,14 @@
 different Archivematica modules.
 """
 import collections
-import hashlib
 import os
 import re
+import threading
 from itertools import zip_longest
 from uuid import uuid4
 
+from a3m.hashing import hash_file
+from a3m.hashing import hash_files
 from a3m.namespaces import NSMAP
 
 
@@ -58,6 +60,55 @@ class OrderedListsDict(collections.OrderedDict):
         self[key].append(value)
 
 
+class ChecksumCache:
+    """
+    LRU cache of file checksums.
+
+    Entries are keyed by the identity of the file (device and inode) and its
+    size and modification time, so renaming or moving a file within a
+    filesystem keeps its entry while writing to it invalidates it. The change
+    time is left out on purpose, renaming a file updates it.
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(filename, algorithm):
+        stat = os.stat(filename)
+        return (
+            stat.st_dev,
+            stat.st_ino,
+            stat.st_size,
+            stat.st_mtime_ns,
+            algorithm,
+        )
+
+    def get(self, key):
+        with self.lock:
+            try:
+                self.entries.move_to_end(key)
+            except KeyError:
+                return None
+            return self.entries[key]
+
+    def set(self, key, checksum):
+        with self.lock:
+            self.entries[key] = checksum
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+checksum_cache = ChecksumCache()
+
+
 def strToUnicode(string, obstinate=False):
     """Convert string to Unicode format."""
     if isinstance(string, bytes):
@@ -99,18 +150,42 @@ def get_file_checksum(filename, algorithm="sha256"):
     """
     Perform a checksum on the specified file.
 
-    This function reads in files incrementally to avoid memory exhaustion.
-    See: https://stackoverflow.com/a/4213255
+    This function reads in files incrementally to avoid memory exhaustion,
+    see `a3m.hashing.hash_file`.
+
+    Checksums are cached in ``checksum_cache`` so a file that hasn't changed
+    on disk is only hashed once.
 
     :param filename: The path to the file we want to check
     :param algorithm: Which algorithm to use for hashing, e.g. 'md5'
     :return: Returns a checksum string for the specified file.
     """
-    hash_ = hashlib.new(algorithm)
-    with open(filename, "rb") as file_:
-        for chunk in iter(lambda: file_.read(1024 * hash_.block_size), b""):
-            hash_.update(chunk)
-    return hash_.hexdigest()
+    key = checksum_cache.key(filename, algorithm)
+    checksum = checksum_cache.get(key)
+    if checksum is None:
+        checksum = hash_file(filename, (algorithm,))[algorithm]
+        checksum_cache.set(key, checksum)
+    return checksum
+
+
+def get_file_checksums(filenames, algorithm="sha256"):
+    """
+    Perform a checksum on each of the specified files, concurrently.
+
+    Like `get_file_checksum`, cached checksums are reused.
+
+    :param filenames: The paths to the files we want to check
+    :param algorithm: Which algorithm to use for hashing, e.g. 'md5'
+    :return: Returns a list of checksum strings, one per file.
+    """
+    keys = [checksum_cache.key(filename, algorithm) for filename in filenames]
+    checksums = [checksum_cache.get(key) for key in keys]
+    missing = [index for index, checksum in enumerate(checksums) if checksum is None]
+    results = hash_files([filenames[index] for index in missing], (algorithm,))
+    for index, (_, result) in zip(missing, results):
+        checksums[index] = result[algorithm]
+        checksum_cache.set(keys[index], checksums[index])
+    return checksums
 
 
 def find_metadata_files(sip_path, filename, only_transfers=False):
@@ -19,8 +19,14 @@ from a3m.server.rpc.client import Client
 
 
 @click.command()
-@click.argument("uri")
+@click.argument("uri", required=False)
 @click.option("--name", help="Name of the package.", metavar="NAME")
+@click.option(
+    "--uri-file",
+    type=click.File("r"),
+    help="File listing the URIs of many transfers, one per line.",
+    metavar="FILE",
+)
 @click.option(
     "--address",
     help='a3m server address (form "host:port"), e.g.: "172.26.30.2:12345".',
@@ -36,9 +42,25 @@ from a3m.server.rpc.client import Client
     metavar="CONFIG_PAIR",
     help='Processing configuration pair (form "name:value"), e.g.: "normalize=no".',
 )
+@click.option(
+    "--priority",
+    type=click.Choice(["low", "normal", "high"]),
+    default="normal",
+    help="Priority of the packages while they wait to be processed.",
+)
 @click.option("--no-input", is_flag=True, help="Disable interactive mode.")
 @click.pass_context
-def main(ctx, uri, name, address, processing_config, wait_for_ready, no_input):
+def main(
+    ctx,
+    uri,
+    name,
+    uri_file,
+    address,
+    processing_config,
+    wait_for_ready,
+    priority,
+    no_input,
+):
     """a3m - Lightweight Archivematica.
 
     Creates an Archival Information Package (AIP) from the contents in URI.
@@ -50,7 +72,13 @@ def main(ctx, uri, name, address, processing_config, wait_for_ready, no_input):
     used to refer to a remote instance. Use `--wait-for-ready` if you want the
     client to block until the server becomes available. If you are running this
     tool in an automated fashion, use `--no-input` to avoid prompts.
+
+    Use `--uri-file` instead of URI to submit many transfers at once. They are
+    named after NAME, if given, or after the last segment of their URIs.
     """
+    if (uri is None) == (uri_file is None):
+        raise click.UsageError("Provide either URI or --uri-file.")
+
     init_django()
     suppress_warnings()
 
@@ -58,6 +86,20 @@ def main(ctx, uri, name, address, processing_config, wait_for_ready, no_input):
     if not settings.DEBUG:
         logging.disable(sys.maxsize)
 
+    processing_config = _prepare_config(processing_config)
+    priority = transfer_service_api.request_response_pb2.PackagePriority.Value(
+        f"PACKAGE_PRIORITY_{priority.upper()}"
+    )
+
+    if uri_file is not None:
+        uris = [line.strip() for line in uri_file if line.strip()]
+        if not uris:
+            raise click.UsageError("No URIs found in --uri-file.")
+        _submit_many(
+            ctx, uris, name, address, processing_config, priority, wait_for_ready
+        )
+        return
+
     # A3M-TODO: stop forcing users to provide a transfer name.
     if name is None:
         if no_input:
@@ -65,10 +107,8 @@ def main(ctx, uri, name, address, processing_config, wait_for_ready, no_input):
         else:
             name = click.prompt("Enter transfer name")
 
-    processing_config = _prepare_config(processing_config)
-
     with ClientWrapper(address, wait_for_ready) as cw:
-        resp = cw.client.submit(uri, name, processing_config)
+        resp = cw.client.submit(uri, name, processing_config, priority)
         click.secho(f"AIP {resp.id} is being generated...")
 
         resp = cw.client.wait_until_complete(resp.id)
@@ -87,6 +127,45 @@ def main(ctx, uri, name, address, processing_config, wait_for_ready, no_input):
         click.secho("Processing completed successfully!", fg="green")
 
 
+def _submit_many(ctx, uris, name, address, processing_config, priority, wait_for_ready):
+    """Submits many transfers in one call and waits for all of them."""
+    if name is None:
+        names = [_name_from_uri(uri, index) for index, uri in enumerate(uris, 1)]
+    else:
+        names = [f"{name}.{index}" for index in range(1, len(uris) + 1)]
+
+    with ClientWrapper(address, wait_for_ready) as cw:
+        resp = cw.client.submit_many(zip(uris, names), processing_config, priority)
+        click.secho(f"{len(resp.ids)} AIPs are being generated...")
+
+        failed = 0
+        for uri, package_id in zip(uris, resp.ids):
+            resp = cw.client.wait_until_complete(package_id)
+            if (
+                resp.status
+                == transfer_service_api.request_response_pb2.PACKAGE_STATUS_COMPLETE
+            ):
+                click.secho(f"AIP {package_id} ({uri}) completed.", fg="green")
+                continue
+            failed += 1
+            click.secho(
+                f"AIP {package_id} ({uri}) failed ({transfer_service_api.request_response_pb2.PackageStatus.Name(resp.status)})!",
+                fg="red",
+            )
+            _print_failed_jobs(cw.client, resp.jobs)
+
+        if failed:
+            click.secho(f"Error processing {failed} of {len(uris)} packages!", fg="red")
+            ctx.exit(1)
+
+        click.secho("Processing completed successfully!", fg="green")
+
+
+def _name_from_uri(uri: str, index: int) -> str:
+    name = uri.rstrip("/").rsplit("/", 1)[-1]
+    return name or f"transfer.{index}"
+
+
 def _to_int(value: str) -> Optional[int]:
     try:
         return int(value)
@@ -174,12 +253,12 @@ def _print_failed_jobs(client: Client, jobs):
         )
         console.print(table)
         try:
-            resp = client.list_tasks(item.id)
+            tasks = list(client.stream_tasks(item.id, failed=True))
         except Exception:
             console.print("Tasks could not be loaded.")
             continue
         task: transfer_service_api.request_response_pb2.Task
-        for task in resp.tasks:
+        for task in tasks:
             content = f"""[bold]Task {task.id}[/]
 
 Module [bold]{task.execution}[/] (with arguments: [dim]{task.arguments}[/])
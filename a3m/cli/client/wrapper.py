@@ -53,6 +53,8 @@ class ClientWrapper(ContextDecorator):
             settings.WORKER_THREADS,
             settings.RPC_THREADS,
             settings.DEBUG,
+            settings.ASYNCIO,
+            worker_bind_address=settings.WORKER_BIND_ADDRESS,
         )
 
         # Compute address since port was dynamically assigned.
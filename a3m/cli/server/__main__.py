@@ -40,6 +40,8 @@ def main():
         settings.WORKER_THREADS,
         settings.RPC_THREADS,
         settings.DEBUG,
+        settings.ASYNCIO,
+        worker_bind_address=settings.WORKER_BIND_ADDRESS,
     )
     server.start()
 
@@ -0,0 +1,99 @@
+import logging
+import multiprocessing
+import os
+import platform
+import signal
+
+import click
+
+from a3m import __version__
+from a3m.cli.common import init_django
+from a3m.cli.common import suppress_warnings
+
+
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.option(
+    "--address",
+    required=True,
+    help='Address of the worker service of the a3m server (form "host:port"), e.g.: "172.26.30.2:7001".',
+    metavar="ADDRESS",
+)
+@click.option(
+    "--resource-class",
+    "resource_classes",
+    multiple=True,
+    help="Resource class of the links to run batches of, all if not given.",
+    metavar="NAME",
+)
+@click.option(
+    "--processes",
+    default=1,
+    show_default=True,
+    help="Number of worker processes, each running one batch at a time.",
+)
+def main(address, resource_classes, processes):
+    """a3m worker - runs tasks for an a3m server.
+
+    The server must use the remote task backend (``task_backend = remote``).
+    Workers share its database and its shared directory.
+    """
+    init_django()
+    suppress_warnings()
+
+    logger.info(
+        f"Starting a3m worker... (version={__version__} pid={os.getpid()} "
+        f"uid={os.getuid()} python={platform.python_version()} "
+        f"server={address} processes={processes})"
+    )
+
+    from a3m.client.remote_worker import run_worker
+
+    if processes <= 1:
+        run_worker(address, resource_classes)
+    else:
+        run_worker_processes(address, resource_classes, processes)
+
+    logger.info("a3m worker shutdown complete.")
+
+
+def run_worker_processes(address, resource_classes, processes):
+    """Run workers in child processes until a termination signal is received.
+
+    Client scripts run in the process of the worker and aren't meant to share
+    it with other batches, so like the workers of `PoolTaskBackend` each
+    worker gets a process of its own. Forking a process that runs gRPC threads
+    is unsafe, the children are started from a clean interpreter.
+    """
+    from a3m.client.remote_worker import run_worker_process
+
+    settings_module = os.environ["DJANGO_SETTINGS_MODULE"]
+    mp_context = multiprocessing.get_context("spawn")
+    children = [
+        mp_context.Process(
+            target=run_worker_process,
+            args=(settings_module, address, resource_classes),
+            name=f"worker-{number}",
+        )
+        for number in range(processes)
+    ]
+
+    def signal_handler(signo, frame):
+        logger.info("Received termination signal (%s)", signal.Signals(signo).name)
+        for child in children:
+            if child.is_alive():
+                child.terminate()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ from a3m.dicts import replace_string_values
 from a3m.dicts import ReplacementDict
 from a3m.dicts import setup_dicts
 from a3m.executeOrRunSubProcess import executeOrRun
-from a3m.fpr.models import FormatVersion
+from a3m.fpr.index import rule_index
 from a3m.fpr.models import FPRule
 from a3m.main.models import FPCommandOutput
 
@@ -30,13 +30,9 @@ def _get_rules(file_uuid):
         return None
 
     rules = None
-    try:
-        format = FormatVersion.active.get(fileformatversion__file_uuid=file_uuid)
-        rules = FPRule.active.filter(
-            format=format.uuid, purpose="characterization"
-        ).order_by("uuid")
-    except FormatVersion.DoesNotExist:
-        pass
+    format_version = rule_index.get_file_format_version(file_uuid)
+    if format_version is not None:
+        rules = rule_index.get_rules(FPRule.CHARACTERIZATION, format_version)
 
     # A3M-TODO DEFAULT CHARACTERIZATION DISABLED
     # Characterization always occurs - if nothing is specified, get one or more
@@ -10,11 +10,11 @@ from a3m.executeOrRunSubProcess import executeOrRun
 from a3m.main.models import SIP
 
 
-def update_unit(sip_uuid, compressed_location):
+def update_unit(job, sip_uuid, compressed_location):
     # Set aipFilename in Unit
-    SIP.objects.filter(uuid=sip_uuid).update(
-        aip_filename=os.path.basename(compressed_location)
-    )
+    aip_filename = os.path.basename(compressed_location)
+    SIP.objects.filter(uuid=sip_uuid).update(aip_filename=aip_filename)
+    job.update_package(aip_filename=aip_filename)
 
 
 def compress_aip(
@@ -74,7 +74,7 @@ def compress_aip(
     # Setting it to an empty string ensures the common
     # "%SIPDirectory%%AIPFilename%" pattern still points at the right thing.
     if program == "None":
-        update_unit(sip_uuid, uncompressed_location)
+        update_unit(job, sip_uuid, uncompressed_location)
         return 0
 
     job.pyprint(
@@ -158,7 +158,7 @@ def compress_aip(
         fileUUID=file_uuid,
     )
 
-    update_unit(sip_uuid, compressed_location)
+    update_unit(job, sip_uuid, compressed_location)
 
     return exit_code
 
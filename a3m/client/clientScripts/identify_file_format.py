@@ -1,13 +1,18 @@
 import argparse
+import collections
 import logging
+import os
+import threading
 import uuid
 
 import pygfried
 from django.db import transaction
 
+from a3m.databaseFunctions import bulk_insert_events
 from a3m.databaseFunctions import getUTCDate
-from a3m.databaseFunctions import insertIntoEvents
 from a3m.fpr.models import FormatVersion
+from a3m.main.models import BULK_CREATE_BATCH_SIZE
+from a3m.main.models import Event
 from a3m.main.models import File
 from a3m.main.models import FileFormatVersion
 from a3m.main.models import FileID
@@ -18,17 +23,149 @@ logger = logging.getLogger(__name__)
 TOOL_DESCRIPTION = "pygfried/siegfried"
 TOOL_VERSION = pygfried.version()
 
+# Maximum number of identifications kept by `identification_cache`.
+IDENTIFICATION_CACHE_SIZE = 100000
 
-def write_file_format_version(file_obj, format_version_obj):
-    (ffv, created) = FileFormatVersion.objects.get_or_create(
-        file_uuid=file_obj, defaults={"format_version": format_version_obj}
+
+class IdentificationCache:
+    """
+    LRU cache of the PUIDs returned by siegfried.
+
+    Entries are keyed by the identity of the file, its name, size and
+    modification time. Siegfried matches file extensions too, so renaming a
+    file invalidates its entry while moving it to another directory doesn't.
+    """
+
+    def __init__(self, maxsize=IDENTIFICATION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(path):
+        stat = os.stat(path)
+        return (
+            stat.st_dev,
+            stat.st_ino,
+            os.path.basename(path),
+            stat.st_size,
+            stat.st_mtime_ns,
+        )
+
+    def get(self, key):
+        with self.lock:
+            try:
+                self.entries.move_to_end(key)
+            except KeyError:
+                return None
+            return self.entries[key]
+
+    def set(self, key, puid):
+        with self.lock:
+            self.entries[key] = puid
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+identification_cache = IdentificationCache()
+
+
+def _scan(paths):
+    """Run siegfried once over all the paths given.
+
+    Returns a dict mapping each path to its PUID, or to the exception that
+    prevented its identification.
+    """
+    try:
+        output = pygfried.identify_many(paths)
+    except Exception as err:
+        return {path: err for path in paths}
+
+    # Files are not necessarily reported in the order they were given.
+    entries = {entry["filename"]: entry for entry in output["files"]}
+    results = {}
+    for path in paths:
+        entry = entries.get(path)
+        if entry is None:
+            results[path] = Exception("Not reported by siegfried")
+        elif entry["errors"]:
+            results[path] = Exception(entry["errors"])
+        elif entry["matches"]:
+            results[path] = entry["matches"][0]["id"]
+        else:
+            results[path] = "UNKNOWN"
+    return results
+
+
+def identify_paths(paths):
+    """Identify files with siegfried, reusing cached results.
+
+    :param paths: Paths of the files.
+    :return: A dict mapping each path to its PUID, or to the exception that
+        prevented its identification.
+    """
+    results = {}
+    keys = {}
+    for path in dict.fromkeys(paths):
+        try:
+            keys[path] = identification_cache.key(path)
+        except OSError as err:
+            results[path] = err
+            continue
+        puid = identification_cache.get(keys[path])
+        if puid is not None:
+            results[path] = puid
+
+    missing = [path for path in keys if path not in results]
+    if missing:
+        for path, result in _scan(missing).items():
+            if not isinstance(result, Exception):
+                identification_cache.set(keys[path], result)
+            results[path] = result
+    return results
+
+
+class Identification:
+    """Identification of a file, processed in bulk by `identify_file_formats`."""
+
+    def __init__(self, file_path, file_uuid, disable_reidentify):
+        self.file_path = file_path
+        self.file_uuid = str(file_uuid)
+        self.disable_reidentify = disable_reidentify
+        self.puid = None
+        self.exit_code = None
+        self.error = None
+
+
+def write_file_format_versions(format_versions):
+    """Link files to their format versions, replacing any previous link.
+
+    :param format_versions: Dict mapping file UUIDs to `FormatVersion` objects.
+    """
+    existing = FileFormatVersion.objects.filter(file_uuid_id__in=format_versions)
+    to_update = []
+    for ffv in existing:
+        ffv.format_version = format_versions.pop(ffv.file_uuid_id)
+        to_update.append(ffv)
+    FileFormatVersion.objects.bulk_update(
+        to_update, ["format_version"], batch_size=BULK_CREATE_BATCH_SIZE
+    )
+    FileFormatVersion.objects.bulk_create(
+        [
+            FileFormatVersion(file_uuid_id=file_uuid, format_version=format_version)
+            for file_uuid, format_version in format_versions.items()
+        ],
+        batch_size=BULK_CREATE_BATCH_SIZE,
     )
-    if not created:  # Update the version if it wasn't created new
-        ffv.format_version = format_version_obj
-        ffv.save()
 
 
-def write_identification_event(file_uuid, puid=None, success=True):
+def identification_event(file_uuid, puid=None, success=True):
+    """Return an unsaved format identification `Event`."""
     event_detail_text = 'program="{}"; version="{}"'.format(
         TOOL_DESCRIPTION, TOOL_VERSION
     )
@@ -40,25 +177,21 @@ def write_identification_event(file_uuid, puid=None, success=True):
     if not puid or puid == "UNKNOWN":
         puid = "No Matching Format"
 
-    date = getUTCDate()
-
-    insertIntoEvents(
-        fileUUID=file_uuid,
-        eventIdentifierUUID=str(uuid.uuid4()),
-        eventType="format identification",
-        eventDateTime=date,
-        eventDetail=event_detail_text,
-        eventOutcome=event_outcome_text,
-        eventOutcomeDetailNote=puid,
+    return Event(
+        event_id=uuid.uuid4(),
+        file_uuid_id=file_uuid,
+        event_type="format identification",
+        event_datetime=getUTCDate(),
+        event_detail=event_detail_text,
+        event_outcome=event_outcome_text,
+        event_outcome_detail=puid,
     )
 
 
-def write_file_id(file_id, format_version_obj):
-    """
-    Write the identified format to the DB.
-    """
-    FileID.objects.create(
-        file_id=file_id,
+def identified_file_id(file_uuid, format_version_obj):
+    """Return an unsaved `FileID` with the identified format."""
+    return FileID(
+        file_id=file_uuid,
         format_name=format_version_obj.format.description,
         format_version=format_version_obj.version or "",
         format_registry_name="PRONOM",
@@ -66,39 +199,89 @@ def write_file_id(file_id, format_version_obj):
     )
 
 
-def identify_file_format(file_path, file_id, disable_reidentify):
-    # If reidentification is disabled and a format identification event exists for this file, exit
-    file_obj = File.objects.get(uuid=file_id)
-    if (
-        disable_reidentify
-        and file_obj.event_set.filter(event_type="format identification").exists()
-    ):
-        logger.debug(
-            "This file has already been identified, and re-identification is disabled. Skipping."
+def identify_file_formats(identifications):
+    """Identify a batch of files and record the results in bulk.
+
+    All the files are handed to siegfried in one call, see `identify_paths`.
+    Files and their previous identification events are fetched upfront and
+    PUIDs are resolved against a single query of format versions, so the
+    number of queries doesn't grow with the size of the batch. The exit code
+    of each identification, or the error that prevented it, is set in the
+    `Identification` objects given.
+    """
+    file_uuids = [item.file_uuid for item in identifications]
+    files = File.objects.in_bulk(file_uuids)
+    identified = set()
+    if any(item.disable_reidentify for item in identifications):
+        identified = set(
+            Event.objects.filter(
+                file_uuid_id__in=file_uuids, event_type="format identification"
+            ).values_list("file_uuid_id", flat=True)
         )
-        return 0
 
-    try:
-        puid = pygfried.identify(file_path)
-    except Exception as err:
-        logger.error("Error running pygfried: %s", err)
-        return 255
+    candidates = []
+    for item in identifications:
+        if item.file_uuid not in files:
+            item.error = File.DoesNotExist(f"File {item.file_uuid} does not exist.")
+            continue
 
-    if not puid or puid == "UNKNOWN":
-        write_identification_event(file_id, success=False)
-        return 255
+        # If reidentification is disabled and a format identification event
+        # exists for this file, skip it.
+        if item.disable_reidentify and item.file_uuid in identified:
+            logger.debug(
+                "This file has already been identified, and re-identification is disabled. Skipping."
+            )
+            item.exit_code = 0
+            continue
 
-    try:
-        format_version_obj = FormatVersion.active.get(pronom_id=puid)
-    except FormatVersion.DoesNotExist:
-        write_identification_event(file_id, success=False)
-        return 255
+        candidates.append(item)
+
+    results = identify_paths([item.file_path for item in candidates])
+    pending = []
+    for item in candidates:
+        result = results[item.file_path]
+        if isinstance(result, Exception):
+            logger.error("Error running pygfried: %s", result)
+            item.exit_code = 255
+            continue
+
+        item.puid = result
+        pending.append(item)
+
+    format_versions = {
+        format_version.pronom_id: format_version
+        for format_version in FormatVersion.active.filter(
+            pronom_id__in={item.puid for item in pending}
+        ).select_related("format")
+    }
 
-    write_file_format_version(file_obj, format_version_obj)
-    write_identification_event(file_id, puid=puid)
-    write_file_id(file_id, format_version_obj)
+    identified_versions = {}
+    events = []
+    file_ids = []
+    for item in pending:
+        format_version_obj = format_versions.get(item.puid)
+        if format_version_obj is None:
+            events.append(identification_event(item.file_uuid, success=False))
+            item.exit_code = 255
+            continue
 
-    return 0
+        identified_versions[item.file_uuid] = format_version_obj
+        events.append(identification_event(item.file_uuid, puid=item.puid))
+        file_ids.append(identified_file_id(item.file_uuid, format_version_obj))
+        item.exit_code = 0
+
+    write_file_format_versions(identified_versions)
+    bulk_insert_events(events)
+    FileID.objects.bulk_create(file_ids, batch_size=BULK_CREATE_BATCH_SIZE)
+
+
+def identify_file_format(file_path, file_id, disable_reidentify):
+    """Identify a single file, see `identify_file_formats`."""
+    identification = Identification(file_path, file_id, disable_reidentify)
+    identify_file_formats([identification])
+    if identification.error is not None:
+        raise identification.error
+    return identification.exit_code
 
 
 def call(jobs):
@@ -112,13 +295,18 @@ def call(jobs):
     )
 
     with transaction.atomic():
+        identifications = []
         for job in jobs:
+            args = parser.parse_args(job.args[1:])
+            identifications.append(
+                Identification(args.file_path, args.file_uuid, args.disable_reidentify)
+            )
+
+        identify_file_formats(identifications)
+
+        # Jobs are only done once the results have been written.
+        for job, identification in zip(jobs, identifications):
             with job.JobContext():
-                args = parser.parse_args(job.args[1:])
-                job.set_status(
-                    identify_file_format(
-                        args.file_path,
-                        args.file_uuid,
-                        args.disable_reidentify,
-                    )
-                )
+                if identification.error is not None:
+                    raise identification.error
+                job.set_status(identification.exit_code)
@@ -39,6 +39,7 @@ def moveSIP(job, src, dst, sipUUID, sharedDirectoryPath):
     if dest.endswith("/."):
         dest = os.path.join(dest[:-1], os.path.basename(src))
     updateDB(dest + "/", sipUUID)
+    job.update_package(sip_path=dest + "/")
 
     # If destination already exists, delete it with warning
     dest_path = os.path.join(dst, os.path.basename(src))
@@ -40,6 +40,7 @@ def moveSIP(job, src, dst, transferUUID, sharedDirectoryPath):
     if os.path.isdir(src):
         dest += "/"
     updateDB(dest, transferUUID)
+    job.update_package(transfer_path=dest)
 
     return rename(src, dst, printfn=job.pyprint, should_exit=False)
 
@@ -1,18 +1,26 @@
 import argparse
+import concurrent.futures
 import csv
 import os
+import threading
 import traceback
 import uuid
+from contextlib import contextmanager
 
+from django.conf import settings as mcpclient_settings
 from django.db import transaction
 from django.utils import timezone
 
-from a3m import databaseFunctions
-from a3m import fileOperations
+from a3m.archivematicaFunctions import get_file_checksums
+from a3m.databaseFunctions import bulk_insert_events
 from a3m.dicts import ReplacementDict
 from a3m.dicts import setup_dicts
 from a3m.executeOrRunSubProcess import executeOrRun
+from a3m.fpr.index import rule_index
 from a3m.fpr.models import FPRule
+from a3m.main.models import BULK_CREATE_BATCH_SIZE
+from a3m.main.models import Derivation
+from a3m.main.models import Event
 from a3m.main.models import File
 from a3m.main.models import FileFormatVersion
 from a3m.main.models import FileID
@@ -23,6 +31,11 @@ SUCCESS = 0
 RULE_FAILED = 1
 NO_RULE_FOUND = 2
 
+# Weight of the normalization commands of a format group towards the
+# concurrency limit, e.g. video transcoders use several cores on their own.
+# Commands of other format groups weigh 1.
+FORMAT_GROUP_WEIGHTS = {"video": 4, "audio": 2}
+
 
 class Command:
     """
@@ -252,13 +265,108 @@ def check_manual_normalization(job, opts):
     return matches[0]
 
 
-def once_normalized(job, command, opts, replacement_dict):
-    """Updates the database if normalization completed successfully.
+class NormalizationRecords:
+    """Database records of a batch of normalizations, written by `save`.
+
+    Normalization commands run concurrently, so their results are gathered
+    here and written in bulk once they have all finished.
+    """
 
-    Callback from Command
+    def __init__(self):
+        self.files = []  # (File, disk path) tuples, sized and hashed on save.
+        self.events = []
+        self.derivations = []
+        self.file_format_versions = []
+        self.file_ids = []
+
+    def add_event(self, file_uuid, event_type, date, detail="", outcome_detail=""):
+        event = Event(
+            event_id=uuid.uuid4(),
+            file_uuid_id=file_uuid,
+            event_type=event_type,
+            event_datetime=date,
+            event_detail=detail,
+            event_outcome="",
+            event_outcome_detail=outcome_detail,
+        )
+        self.events.append(event)
+        return event
+
+    def add_derivation_event(
+        self,
+        original_uuid,
+        output_uuid,
+        event_detail_output,
+        outcome_detail_note,
+        today=None,
+    ):
+        """Add the derivation link for preservation files and the event."""
+        if today is None:
+            today = timezone.now()
+        event = self.add_event(
+            original_uuid,
+            "normalization",
+            today,
+            detail=event_detail_output,
+            outcome_detail=outcome_detail_note or "",
+        )
+        self.derivations.append(
+            Derivation(
+                source_file_id=original_uuid,
+                derived_file_id=output_uuid,
+                event_id=event.event_id,
+            )
+        )
+
+    def add_file(self, file_uuid, disk_path, location, sip_uuid, today, use):
+        """Add a file to the SIP, see `fileOperations.addFileToSIP`."""
+        file_obj = File(
+            uuid=file_uuid,
+            originallocation=location,
+            currentlocation=location,
+            enteredsystem=today,
+            filegrpuse=use,
+            sip_id=sip_uuid,
+        )
+        self.files.append((file_obj, disk_path))
+        self.add_event(file_uuid, "creation", today)
+
+    def save(self):
+        """Write the records, computing the checksums of the new files."""
+        algorithm = mcpclient_settings.DEFAULT_CHECKSUM_ALGORITHM
+        checksums = get_file_checksums(
+            [disk_path for _, disk_path in self.files], algorithm
+        )
+        for (file_obj, disk_path), checksum in zip(self.files, checksums):
+            file_obj.size = os.path.getsize(disk_path)
+            file_obj.checksum = checksum
+            file_obj.checksumtype = algorithm
+            self.add_event(
+                file_obj.uuid,
+                "message digest calculation",
+                file_obj.enteredsystem,
+                detail=f'program="python"; module="hashlib.{algorithm}()"',
+                outcome_detail=checksum,
+            )
+
+        File.objects.bulk_create(
+            [file_obj for file_obj, _ in self.files], batch_size=BULK_CREATE_BATCH_SIZE
+        )
+        bulk_insert_events(self.events)
+        Derivation.objects.bulk_create(
+            self.derivations, batch_size=BULK_CREATE_BATCH_SIZE
+        )
+        FileFormatVersion.objects.bulk_create(
+            self.file_format_versions, batch_size=BULK_CREATE_BATCH_SIZE
+        )
+        FileID.objects.bulk_create(self.file_ids, batch_size=BULK_CREATE_BATCH_SIZE)
+
+
+def once_normalized(job, records, command, opts):
+    """Records the results of a normalization that completed successfully.
 
     For preservation files, adds a normalization event, and derivation, as well
-    as updating the size and checksum for the new file in the DB.  Adds format
+    as the size and checksum for the new file in the DB.  Adds format
     information for use in the METS file to FilesIDs.
     """
     transcoded_files = []
@@ -279,7 +387,6 @@ def once_normalized(job, command, opts, replacement_dict):
         )
         command.exit_code = -2
 
-    derivation_event_uuid = str(uuid.uuid4())
     event_detail_output = 'ArchivematicaFPRCommandID="{}"'.format(
         command.fpcommand.uuid
     )
@@ -291,32 +398,22 @@ def once_normalized(job, command, opts, replacement_dict):
         # TODO Add manual normalization for files of same name mapping?
         # Add the new file to the SIP
         path_relative_to_sip = ef.replace(opts.sip_path, "%SIPDirectory%", 1)
-        fileOperations.addFileToSIP(
+        records.add_file(
+            output_file_uuid,
+            ef,
             path_relative_to_sip,
-            output_file_uuid,  # File UUID
-            opts.sip_uuid,  # SIP UUID
-            opts.task_uuid,  # Task UUID
-            today,  # Current date
-            sourceType="creation",
+            opts.sip_uuid,
+            today,
             use="preservation",
         )
 
-        # Calculate new file checksum
-        fileOperations.updateSizeAndChecksum(
-            output_file_uuid,  # File UUID, same as task UUID for preservation
-            ef,  # File path
-            today,  # Date
-            str(uuid.uuid4()),  # Event UUID, new UUID
-        )
-
         # Add derivation link and associated event
         #
         # Track both events and insert into Derivations table for
         # preservation copies
-        insert_derivation_event(
+        records.add_derivation_event(
             original_uuid=opts.file_uuid,
             output_uuid=output_file_uuid,
-            derivation_uuid=derivation_event_uuid,
             event_detail_output=event_detail_output,
             outcome_detail_note=path_relative_to_sip,
             today=today,
@@ -324,63 +421,79 @@ def once_normalized(job, command, opts, replacement_dict):
 
         # Use the format info from the normalization command
         # to save identification into the DB
-        ffv = FileFormatVersion(
-            file_uuid_id=output_file_uuid,
-            format_version=command.fpcommand.output_format,
+        records.file_format_versions.append(
+            FileFormatVersion(
+                file_uuid_id=output_file_uuid,
+                format_version=command.fpcommand.output_format,
+            )
         )
-        ffv.save()
-
-        FileID.objects.create(
-            file_id=output_file_uuid,
-            format_name=command.fpcommand.output_format.format.description,
+        records.file_ids.append(
+            FileID(
+                file_id=output_file_uuid,
+                format_name=command.fpcommand.output_format.format.description,
+            )
         )
 
 
-def once_normalized_callback(job):
-    def wrapper(*args):
-        return once_normalized(job, *args)
+def get_default_preservation_rule():
+    try:
+        return rule_index.get_rules("default_preservation")[0]
+    except IndexError:
+        raise FPRule.DoesNotExist("No default preservation rule found.")
 
-    return wrapper
 
+class Normalization:
+    """Normalization command of a file, prepared by `prepare`."""
 
-def insert_derivation_event(
-    original_uuid,
-    output_uuid,
-    derivation_uuid,
-    event_detail_output,
-    outcome_detail_note,
-    today=None,
-):
-    """Add the derivation link for preservation files and the event."""
-    if today is None:
-        today = timezone.now()
-    # Add event information to current file
-    databaseFunctions.insertIntoEvents(
-        fileUUID=original_uuid,
-        eventIdentifierUUID=derivation_uuid,
-        eventType="normalization",
-        eventDateTime=today,
-        eventDetail=event_detail_output,
-        eventOutcome="",
-        eventOutcomeDetailNote=outcome_detail_note or "",
-    )
+    def __init__(self, job, opts, command, weight=1):
+        self.job = job
+        self.opts = opts
+        self.command = command
+        self.weight = weight
+        self.error = None
 
-    # Add linking information between files
-    databaseFunctions.insertIntoDerivations(
-        sourceFileUUID=original_uuid,
-        derivedFileUUID=output_uuid,
-        relatedEventUUID=derivation_uuid,
-    )
 
+class CommandSlots:
+    """Bound the combined weight of the commands running at once.
 
-def get_default_preservation_rule():
-    return FPRule.active.get(purpose="default_preservation")
+    Commands heavier than the limit run on their own.
+    """
 
+    def __init__(self, limit):
+        self.limit = max(limit, 1)
+        self.used = 0
+        self.condition = threading.Condition()
+
+    @contextmanager
+    def slot(self, weight):
+        weight = min(max(weight, 1), self.limit)
+        with self.condition:
+            self.condition.wait_for(lambda: self.used + weight <= self.limit)
+            self.used += weight
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.used -= weight
+                self.condition.notify_all()
+
+
+def get_weight(file_format_version):
+    """Return the weight of the normalization command of a file."""
+    if file_format_version is None:
+        return 1
+    group = file_format_version.format_version.format.group
+    if group is None:
+        return 1
+    return FORMAT_GROUP_WEIGHTS.get(group.slug, 1)
 
-def main(job, opts):
-    """Find and execute normalization commands on input file."""
-    setup_dicts()
 
+def prepare(job, opts, records):
+    """Find the normalization command of the input file.
+
+    Returns a `Normalization` ready to run, or the exit code of the job when
+    there is nothing to run.
+    """
     # Find the file and itss FormatVersion (file identification)
     try:
         file_ = File.objects.get(uuid=opts.file_uuid)
@@ -425,10 +538,9 @@ def main(job, opts):
             manually_normalized_file.currentlocation,
         )
         # Add derivation link and associated event
-        insert_derivation_event(
+        records.add_derivation_event(
             original_uuid=opts.file_uuid,
             output_uuid=manually_normalized_file.uuid,
-            derivation_uuid=str(uuid.uuid4()),
             event_detail_output="manual normalization",
             outcome_detail_note=None,
         )
@@ -436,18 +548,19 @@ def main(job, opts):
 
     do_fallback = False
     try:
-        format_id = FileFormatVersion.objects.get(file_uuid=opts.file_uuid)
+        format_id = FileFormatVersion.objects.select_related(
+            "format_version__format__group"
+        ).get(file_uuid=opts.file_uuid)
     except FileFormatVersion.DoesNotExist:
         format_id = None
 
     # Look up the normalization command in the FPR
     if format_id:
         job.print_output("File format:", format_id.format_version)
-        try:
-            rule = FPRule.active.get(
-                format=format_id.format_version, purpose=FPRule.PRESERVATION
-            )
-        except FPRule.DoesNotExist:
+        rules = rule_index.get_rules(FPRule.PRESERVATION, format_id.format_version_id)
+        if rules:
+            rule = rules[0]
+        else:
             do_fallback = True
 
     # Try with default rule if no format_id or rule was found
@@ -470,11 +583,30 @@ def main(job, opts):
 
     replacement_dict = get_replacement_dict(job, opts)
 
-    cl = Command(job, command, replacement_dict, once_normalized_callback(job), opts)
-    exitstatus = cl.execute()
+    cl = Command(job, command, replacement_dict, opts=opts)
+    return Normalization(job, opts, cl, weight=get_weight(format_id))
+
 
-    if not exitstatus == 0:
-        job.print_error(f"Command {command.description} failed!")
+def run(normalization, slots):
+    """Run the normalization command once the weight of the file fits."""
+    with slots.slot(normalization.weight):
+        try:
+            normalization.command.execute()
+        except Exception as err:
+            normalization.error = err
+
+
+def finish(normalization, records):
+    """Record the results of a normalization and return its exit code."""
+    job, opts, command = normalization.job, normalization.opts, normalization.command
+    if normalization.error is not None:
+        raise normalization.error
+
+    if command.exit_code == 0:
+        once_normalized(job, records, command, opts)
+
+    if not command.exit_code == 0:
+        job.print_error(f"Command {command.fpcommand.description} failed!")
         return RULE_FAILED
 
     path = os.path.basename(opts.file_path)
@@ -495,12 +627,45 @@ def call(jobs):
         help='"service", "original", "submissionDocumentation", etc',
     )
 
+    setup_dicts()
+    records = NormalizationRecords()
+    statuses = {}
+    normalizations = []
     with transaction.atomic():
         for job in jobs:
-            with job.JobContext():
+            try:
                 opts = parser.parse_args(job.args[1:])
-                try:
-                    job.set_status(main(job, opts))
-                except Exception as e:
-                    job.print_error(str(e))
-                    job.set_status(1)
+                result = prepare(job, opts, records)
+            except Exception as e:
+                job.print_error(str(e))
+                result = 1
+            if isinstance(result, Normalization):
+                normalizations.append(result)
+            else:
+                statuses[job] = result
+
+        # Commands of independent files run concurrently, they don't touch
+        # the database.
+        slots = CommandSlots(mcpclient_settings.NORMALIZATION_CONCURRENCY)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=slots.limit) as executor:
+            for normalization in normalizations:
+                executor.submit(run, normalization, slots)
+
+        for normalization in normalizations:
+            try:
+                statuses[normalization.job] = finish(normalization, records)
+            except Exception as e:
+                normalization.job.print_error(str(e))
+                statuses[normalization.job] = 1
+
+        try:
+            with transaction.atomic():
+                records.save()
+        except Exception as e:
+            for job in jobs:
+                job.print_error(f"Error saving normalization results: {e}")
+                statuses[job] = 1
+
+        for job in jobs:
+            with job.JobContext():
+                job.set_status(statuses[job])
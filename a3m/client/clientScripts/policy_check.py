@@ -19,8 +19,7 @@ from a3m import databaseFunctions
 from a3m.dicts import replace_string_values
 from a3m.dicts import setup_dicts
 from a3m.executeOrRunSubProcess import executeOrRun
-from a3m.fpr.models import FormatVersion
-from a3m.fpr.models import FPRule
+from a3m.fpr.index import rule_index
 from a3m.main.models import Derivation
 from a3m.main.models import File
 from a3m.main.models import SIP
@@ -211,15 +210,13 @@ class PolicyChecker:
         file_uuid = self.file_uuid
         if self.is_manually_normalized_access_derivative:
             file_uuid = self._get_manually_normalized_access_derivative_file_uuid()
-        try:
-            fmt = FormatVersion.active.get(fileformatversion__file_uuid=file_uuid)
-        except FormatVersion.DoesNotExist:
-            rules = fmt = None
+        rules = None
+        fmt = rule_index.get_file_format_version(file_uuid)
         if fmt:
-            rules = FPRule.active.filter(format=fmt.uuid, purpose=self.purpose)
+            rules = rule_index.get_rules(self.purpose, fmt)
         # Check for default rules.
         if not rules:
-            rules = FPRule.active.filter(purpose=f"default_{self.purpose}")
+            rules = rule_index.get_rules(f"default_{self.purpose}")
         return rules
 
     def _execute_rule_command(self, rule):
@@ -9,10 +9,10 @@ from a3m import fileOperations
 from a3m.dicts import ReplacementDict
 from a3m.dicts import setup_dicts
 from a3m.executeOrRunSubProcess import executeOrRun
+from a3m.fpr.index import rule_index
 from a3m.fpr.models import FPRule
 from a3m.main.models import Derivation
 from a3m.main.models import File
-from a3m.main.models import FileFormatVersion
 
 
 def insert_transcription_event(status, file_uuid, rule, relative_location):
@@ -64,13 +64,10 @@ def insert_file_into_database(
 
 
 def fetch_rules_for(file_):
-    try:
-        format = FileFormatVersion.objects.get(file_uuid=file_)
-        return FPRule.objects.filter(
-            format=format.format_version, purpose="transcription"
-        )
-    except FileFormatVersion.DoesNotExist:
+    format_version = rule_index.get_file_format_version(file_.uuid, active=False)
+    if format_version is None:
         return []
+    return rule_index.get_rules(FPRule.TRANSCRIPTION, format_version)
 
 
 def fetch_rules_for_derivatives(file_):
@@ -19,9 +19,10 @@ import logging
 import os
 import uuid
 
+from django.conf import settings as mcpclient_settings
 from django.db import transaction
 
-from a3m.fileOperations import get_size_and_checksum
+from a3m.archivematicaFunctions import get_file_checksums
 from a3m.fileOperations import updateSizeAndChecksum
 from a3m.main.models import File
 
@@ -58,28 +59,25 @@ def get_sip_file_queryset(sip_uuid, filter_subdir):
     return files
 
 
-def get_size_and_checksum_for_file(file_, sip_directory, transfer_uuid):
-    """Get size and checksum for a file."""
+def get_file_path(file_, sip_directory, transfer_uuid):
+    """Get the absolute path of a file."""
     if transfer_uuid:
-        file_path = file_.currentlocation.replace(
+        return file_.currentlocation.replace(
             TRANSFER_REPLACEMENT_PATH_STRING, sip_directory
         )
-    else:
-        file_path = file_.currentlocation.replace(
-            SIP_REPLACEMENT_PATH_STRING, sip_directory
-        )
-
-    if not os.path.exists(file_path):
-        return {}
+    return file_.currentlocation.replace(SIP_REPLACEMENT_PATH_STRING, sip_directory)
 
-    fileSize, checksum, checksumType = get_size_and_checksum(file_path)
 
-    return {
-        "filePath": file_path,
-        "fileSize": fileSize,
-        "checksum": checksum,
-        "checksumType": checksumType,
-    }
+def get_size_and_checksum_for_files(file_paths, checksum_type):
+    """Get size and checksum for a list of files, hashing them concurrently."""
+    checksums = get_file_checksums(file_paths, checksum_type)
+    for file_path, checksum in zip(file_paths, checksums):
+        yield {
+            "filePath": file_path,
+            "fileSize": os.path.getsize(file_path),
+            "checksum": checksum,
+            "checksumType": checksum_type,
+        }
 
 
 def call(jobs):
@@ -100,6 +98,7 @@ def call(jobs):
         dest="event_uuid",
     )
 
+    checksum_type = mcpclient_settings.DEFAULT_CHECKSUM_ALGORITHM
     state = []
 
     for job in jobs:
@@ -116,14 +115,20 @@ def call(jobs):
             if args.sip_uuid:
                 files = get_sip_file_queryset(args.sip_uuid, args.filter_subdir)
 
+            file_uuids, file_paths = [], []
             for file_ in files:
                 if not file_:
                     continue
-                file_info = get_size_and_checksum_for_file(
-                    file_, args.sip_directory, args.transfer_uuid
-                )
-                if file_info:
-                    state.append((file_.uuid, file_info, args))
+                file_path = get_file_path(file_, args.sip_directory, args.transfer_uuid)
+                if not os.path.exists(file_path):
+                    continue
+                file_uuids.append(file_.uuid)
+                file_paths.append(file_path)
+
+            for file_uuid, file_info in zip(
+                file_uuids, get_size_and_checksum_for_files(file_paths, checksum_type)
+            ):
+                state.append((file_uuid, file_info, args))
 
             job.set_status(0)
 
@@ -20,8 +20,7 @@ from a3m import databaseFunctions
 from a3m.dicts import replace_string_values
 from a3m.dicts import setup_dicts
 from a3m.executeOrRunSubProcess import executeOrRun
-from a3m.fpr.models import FormatVersion
-from a3m.fpr.models import FPRule
+from a3m.fpr.index import rule_index
 from a3m.main.models import Derivation
 from a3m.main.models import File
 from a3m.main.models import SIP
@@ -95,15 +94,13 @@ class Validator:
 
     def _get_rules(self):
         """Return all FPR rules that apply to files of this type."""
-        try:
-            fmt = FormatVersion.active.get(fileformatversion__file_uuid=self.file_uuid)
-        except FormatVersion.DoesNotExist:
-            rules = fmt = None
+        rules = None
+        fmt = rule_index.get_file_format_version(self.file_uuid)
         if fmt:
-            rules = FPRule.active.filter(format=fmt.uuid, purpose=self.purpose)
+            rules = rule_index.get_rules(self.purpose, fmt)
         # Check default rules.
         if not rules:
-            rules = FPRule.active.filter(purpose=f"default_{self.purpose}")
+            rules = rule_index.get_rules(f"default_{self.purpose}")
         return rules
 
     def _execute_rule_command(self, rule):
@@ -42,6 +42,13 @@ class Job:
         self.output = ""
         self.error = ""
 
+        # Called with the job when it leaves its `JobContext`, so its result
+        # can be reported before the rest of the batch is done.
+        self.finished_callback = None
+
+        # Changes made to the package, see `update_package`.
+        self.package_updates = {}
+
     def dump(self):
         return (
             "\n\n\t| =============== JOB\n"
@@ -101,6 +108,19 @@ class Job:
         else:
             raise Exception("Unrecognised print file: " + str(file))
 
+    def update_package(self, **changes):
+        """Report changes made to the package to the server with the result.
+
+        The server keeps the state of the package in memory instead of reading
+        it back from the database. Known changes are ``transfer_path``,
+        ``sip_path`` and ``aip_filename``, as stored in the database, and
+        ``context``, a dict of replacement values for the following jobs.
+        """
+        context = changes.pop("context", None)
+        if context:
+            self.package_updates.setdefault("context", {}).update(context)
+        self.package_updates.update(changes)
+
     def get_exit_code(self):
         return self.int_code
 
@@ -126,3 +146,5 @@ class Job:
         finally:
             if logger:
                 logger.removeHandler(handler)
+            if self.finished_callback is not None:
+                self.finished_callback(self)
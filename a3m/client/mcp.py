@@ -48,9 +48,11 @@ task to run next).
 #
 # You should have received a copy of the GNU General Public License
 # along with Archivematica.  If not, see <http://www.gnu.org/licenses/>.
+import functools
 import importlib
 import logging
 import shlex
+import time
 
 from django.conf import settings as django_settings
 from django.db import transaction
@@ -73,14 +75,13 @@ replacement_dict = {
 
 
 @auto_close_db
-def handle_batch_task(task_name, batch_payload):
+def handle_batch_task(task_name, batch_payload, finished_callback=None):
     tasks = batch_payload["tasks"]
 
     utc_date = getUTCDate()
     jobs = []
     for task_uuid in tasks:
         task_data = tasks[task_uuid]
-        arguments = task_data["arguments"]
 
         replacements = list(replacement_dict.items()) + list(
             {
@@ -90,15 +91,24 @@ def handle_batch_task(task_name, batch_payload):
             }.items()
         )
 
-        for var, val in replacements:
-            arguments = arguments.replace(var, val)
+        if "argv" in task_data:
+            # Arguments split by the server, only values known here are left.
+            arguments = [
+                _replace(argument, replacements) if "%" in argument else argument
+                for argument in task_data["argv"]
+            ]
+        else:
+            arguments = _parse_command_line(
+                _replace(task_data["arguments"], replacements)
+            )
 
         job = Job(
             task_name,
             task_data["uuid"],
-            _parse_command_line(arguments),
+            arguments,
             caller_wants_output=task_data["wants_output"],
         )
+        job.finished_callback = finished_callback
         jobs.append(job)
 
     # Set their start times.  If we collide with the MCP Server inserting new
@@ -116,6 +126,12 @@ def handle_batch_task(task_name, batch_payload):
     return jobs
 
 
+def _replace(s, replacements):
+    for var, val in replacements:
+        s = s.replace(var, val)
+    return s
+
+
 def _parse_command_line(s):
     return [_shlex_unescape(x) for x in shlex.split(s)]
 
@@ -145,65 +161,101 @@ def fail_all_tasks(batch_payload, reason):
     except Exception as e:
         logger.exception("Failed to update tasks in DB: %s", e)
 
-    # But we can at least send an exit code back to the server.
-    return {"task_results": {task_id: {"exitCode": 1} for task_id in tasks}}
+    # But we can at least send an exit code back to the server. Results of
+    # the tasks streamed before the failure are overridden.
+    return {
+        "task_results": {task_id: {"exitCode": 1} for task_id in tasks},
+        "failed": True,
+    }
+
+
+def _write_job_result(task_name, job):
+    """Write the result of ``job`` to its task and return it for the server."""
+    logger.debug("Completed job: %s\n", job.dump())
+
+    exit_code = job.get_exit_code()
+    end_time = getUTCDate()
+
+    kwargs = {"exitcode": exit_code, "endtime": end_time}
+    if django_settings.CAPTURE_CLIENT_SCRIPT_OUTPUT or kwargs["exitcode"] > 0:
+        kwargs.update({"stdout": job.get_stdout(), "stderror": job.get_stderr()})
+    Task.objects.filter(taskuuid=job.UUID).update(**kwargs)
+
+    result = {"exitCode": exit_code, "finishedTimestamp": end_time}
+    if job.package_updates:
+        result["packageUpdates"] = job.package_updates
+
+    if job.caller_wants_output:
+        # Send back stdout/stderr so it can be written to files.
+        # Most cases don't require this (logging to the database is
+        # enough), but the ones that do are coordinated through the
+        # MCP Server so that multiple MCP Client instances don't try
+        # to write the same file at the same time.
+        result["stdout"] = job.get_stdout()
+        result["stderror"] = job.get_stderr()
+
+    if exit_code == 0:
+        metrics.job_completed(task_name)
+    else:
+        metrics.job_failed(task_name)
+
+    return result
 
 
 @auto_close_db
-def execute_command(task_name: str, batch_payload):
+def execute_command(task_name: str, batch_payload, on_task_result=None):
     """Execute the command encoded in ``batch_payload`` and return its exit
     code, standard output and standard error as a dictionary.
+
+    The time spent running the batch is returned too so the server can size
+    further batches of the same link.
+
+    If ``on_task_result`` is given, it is called with the UUID and the result
+    of each task as soon as the client script is done with it, i.e. when the
+    job leaves its `JobContext`, and the result is committed to the database.
+    The returned dictionary still includes every task. If the batch fails,
+    ``failed`` is set and every task is failed, streamed or not.
     """
     logger.debug("\n\n*** RUNNING TASK: %s", task_name)
 
+    results = {}
+
+    def job_finished(job):
+        if job.UUID in results:
+            return
+
+        def write_task_result_callback():
+            results[job.UUID] = _write_job_result(task_name, job)
+
+        retryOnFailure("Write task result", write_task_result_callback)
+        # Client scripts often run their jobs in a transaction, the result is
+        # only sent once it's committed. It is never sent if the transaction
+        # is rolled back, the task is failed with the rest of the batch.
+        transaction.on_commit(
+            functools.partial(on_task_result, job.UUID, results[job.UUID])
+        )
+
     with metrics.task_execution_time_histogram.labels(script_name=task_name).time():
         try:
-            jobs = handle_batch_task(task_name, batch_payload)
-            results = {}
+            start_time = time.monotonic()
+            jobs = handle_batch_task(
+                task_name,
+                batch_payload,
+                finished_callback=job_finished if on_task_result else None,
+            )
 
             def write_task_results_callback():
                 with transaction.atomic():
                     for job in jobs:
-                        logger.debug("Completed job: %s\n", job.dump())
-
-                        exit_code = job.get_exit_code()
-                        end_time = getUTCDate()
-
-                        kwargs = {"exitcode": exit_code, "endtime": end_time}
-                        if (
-                            django_settings.CAPTURE_CLIENT_SCRIPT_OUTPUT
-                            or kwargs["exitcode"] > 0
-                        ):
-                            kwargs.update(
-                                {
-                                    "stdout": job.get_stdout(),
-                                    "stderror": job.get_stderr(),
-                                }
-                            )
-                        Task.objects.filter(taskuuid=job.UUID).update(**kwargs)
-
-                        results[job.UUID] = {
-                            "exitCode": exit_code,
-                            "finishedTimestamp": end_time,
-                        }
-
-                        if job.caller_wants_output:
-                            # Send back stdout/stderr so it can be written to files.
-                            # Most cases don't require this (logging to the database is
-                            # enough), but the ones that do are coordinated through the
-                            # MCP Server so that multiple MCP Client instances don't try
-                            # to write the same file at the same time.
-                            results[job.UUID]["stdout"] = job.get_stdout()
-                            results[job.UUID]["stderror"] = job.get_stderr()
-
-                        if exit_code == 0:
-                            metrics.job_completed(task_name)
-                        else:
-                            metrics.job_failed(task_name)
+                        if job.UUID not in results:
+                            results[job.UUID] = _write_job_result(task_name, job)
 
             retryOnFailure("Write task results", write_task_results_callback)
 
-            return {"task_results": results}
+            return {
+                "task_results": results,
+                "duration": time.monotonic() - start_time,
+            }
         except SystemExit:
             logger.error(
                 "IMPORTANT: Task %s attempted to call exit()/quit()/sys.exit(). This module should be fixed!",
@@ -0,0 +1,308 @@
+"""
+Remote workers of `RemoteTaskBackend`.
+
+A remote worker is a stateless process, possibly on another node, that leases
+batches of tasks from the a3m server, runs them like the workers of
+`PoolTaskBackend` do and reports the results back. It needs access to the
+database and to the shared directory of the server.
+
+The worker holds a lease on the batch it runs, renewed by heartbeats. The
+server hands the batch over to another worker when the lease expires, e.g.
+because the worker died.
+
+Workers talk to the worker service of the server over gRPC, see
+``a3m/api/workerservice``. Its server side is
+`a3m.server.tasks.backends.remote_backend.BatchLeases`, which can also be
+given to `RemoteWorker` directly. The functions of this module convert the
+batches and the task results of the backends to messages and back.
+"""
+import datetime
+import logging
+import os
+import signal
+import socket
+import threading
+import uuid
+
+import grpc
+
+from a3m.api.workerservice import v1beta1 as worker_service_api
+
+logger = logging.getLogger(__name__)
+
+
+# Changes made to the package, see ``Job.update_package``.
+PACKAGE_UPDATES = ("transfer_path", "sip_path", "aip_filename")
+
+
+def encode_batch(batch_id, job_name, payload):
+    """Return the message of a batch leased by a worker."""
+    batch = worker_service_api.request_response_pb2.Batch(
+        id=batch_id, job_name=job_name
+    )
+    for task_id, task in payload["tasks"].items():
+        batch.tasks.add(
+            id=task_id,
+            created_date=task["createdDate"],
+            arguments=task["arguments"] or "",
+            argv=task.get("argv", []),
+            has_argv="argv" in task,
+            wants_output=task["wants_output"],
+            execute=task["execute"],
+        )
+    return batch
+
+
+def decode_batch(batch):
+    """Return the payload of a batch, as run by ``execute_command``."""
+    tasks = {}
+    for task in batch.tasks:
+        tasks[task.id] = {
+            "uuid": task.id,
+            "createdDate": task.created_date,
+            "arguments": task.arguments,
+            "wants_output": task.wants_output,
+            "execute": task.execute,
+        }
+        if task.has_argv:
+            tasks[task.id]["argv"] = list(task.argv)
+    return {"tasks": tasks}
+
+
+def encode_task_result(result):
+    """Return the message of a task result of ``execute_command``."""
+    message = worker_service_api.request_response_pb2.TaskResult(
+        exit_code=result["exitCode"]
+    )
+    if result.get("finishedTimestamp") is not None:
+        message.finish_time.FromDatetime(result["finishedTimestamp"])
+    if "stdout" in result:
+        message.stdout = result["stdout"]
+    if "stderror" in result:
+        message.stderr = result["stderror"]
+    if "packageUpdates" in result:
+        updates = result["packageUpdates"]
+        message.package_updates.SetInParent()
+        for name in PACKAGE_UPDATES:
+            if name in updates:
+                setattr(message.package_updates, name, updates[name])
+        message.package_updates.context.update(updates.get("context") or {})
+    return message
+
+
+def decode_task_result(message):
+    """Return the task result of ``execute_command`` sent in a message."""
+    result = {"exitCode": message.exit_code}
+    if message.HasField("finish_time"):
+        result["finishedTimestamp"] = message.finish_time.ToDatetime(
+            tzinfo=datetime.timezone.utc
+        )
+    if message.HasField("stdout"):
+        result["stdout"] = message.stdout
+    if message.HasField("stderr"):
+        result["stderror"] = message.stderr
+    if message.HasField("package_updates"):
+        updates = {
+            name: getattr(message.package_updates, name)
+            for name in PACKAGE_UPDATES
+            if message.package_updates.HasField(name)
+        }
+        if message.package_updates.context:
+            updates["context"] = dict(message.package_updates.context)
+        result["packageUpdates"] = updates
+    return result
+
+
+class WorkerServiceClient:
+    """Client of the worker service of the a3m server.
+
+    Its methods take the same arguments and return the same values as the ones
+    of `BatchLeases`.
+    """
+
+    def __init__(self, channel, rpc_timeout=30):
+        self.rpc_timeout = rpc_timeout
+        self.stub = worker_service_api.service_pb2_grpc.WorkerServiceStub(channel)
+
+    def lease(self, worker_id, resource_classes=None):
+        request = worker_service_api.request_response_pb2.LeaseRequest(
+            worker_id=worker_id, resource_classes=resource_classes or []
+        )
+        response = self.stub.Lease(request, timeout=self.rpc_timeout)
+        if not response.HasField("batch"):
+            return None
+        return {
+            "batch_id": response.batch.id,
+            "job_name": response.batch.job_name,
+            "payload": decode_batch(response.batch),
+            "lease_duration": response.lease_duration,
+        }
+
+    def heartbeat(self, worker_id, batch_ids):
+        request = worker_service_api.request_response_pb2.HeartbeatRequest(
+            worker_id=worker_id, batch_ids=batch_ids
+        )
+        response = self.stub.Heartbeat(request, timeout=self.rpc_timeout)
+        return list(response.lost_batch_ids)
+
+    def report_task_result(self, worker_id, batch_id, task_uuid, result):
+        request = worker_service_api.request_response_pb2.ReportTaskResultRequest(
+            worker_id=worker_id,
+            batch_id=batch_id,
+            task_id=task_uuid,
+            result=encode_task_result(result),
+        )
+        response = self.stub.ReportTaskResult(request, timeout=self.rpc_timeout)
+        return response.accepted
+
+    def complete(self, worker_id, batch_id, results):
+        request = worker_service_api.request_response_pb2.CompleteRequest(
+            worker_id=worker_id,
+            batch_id=batch_id,
+            failed=results.get("failed", False),
+        )
+        if "duration" in results:
+            request.duration = results["duration"]
+        for task_id, result in results["task_results"].items():
+            request.task_results[task_id].CopyFrom(encode_task_result(result))
+        response = self.stub.Complete(request, timeout=self.rpc_timeout)
+        return response.accepted
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class RemoteWorker:
+    """Run the batches leased from the server until stopped.
+
+    :param server: `WorkerServiceClient`, or `BatchLeases` when the worker runs
+        in the server process.
+    :param resource_classes: Resource classes of the workflow links the
+        worker takes batches of, all of them if not given.
+    :param poll_interval: Most seconds between lease requests while there
+        are no batches to run. Requests are sent more often at first, so
+        batches of a busy server are picked up quickly.
+    """
+
+    # Seconds to wait before trying again when the server can't be reached.
+    RETRY_DELAY = 5.0
+
+    # Seconds between the first lease requests without batches to run.
+    MIN_POLL_INTERVAL = 0.05
+
+    def __init__(
+        self, server, worker_id=None, resource_classes=None, poll_interval=1.0
+    ):
+        self.server = server
+        self.worker_id = worker_id or default_worker_id()
+        self.resource_classes = list(resource_classes) if resource_classes else None
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+
+    def run(self):
+        """Run batches until `stop` is called."""
+        logger.info("Worker %s started", self.worker_id)
+        delay = self.MIN_POLL_INTERVAL
+        while not self.stop_event.is_set():
+            try:
+                if self.run_once():
+                    delay = self.MIN_POLL_INTERVAL
+                else:
+                    self.stop_event.wait(delay)
+                    delay = min(delay * 2, self.poll_interval)
+            except grpc.RpcError as err:
+                logger.warning(
+                    "Worker %s can't reach the server: %s", self.worker_id, err
+                )
+                self.stop_event.wait(self.RETRY_DELAY)
+        logger.info("Worker %s stopped", self.worker_id)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run_once(self):
+        """Lease a batch and run it. Return whether there was one to run."""
+        lease = self.server.lease(self.worker_id, self.resource_classes)
+        if lease is None:
+            return False
+
+        batch_id = lease["batch_id"]
+        logger.debug(
+            "Worker %s leased batch %s (%s)",
+            self.worker_id,
+            batch_id,
+            lease["job_name"],
+        )
+        done = threading.Event()
+        heartbeats = threading.Thread(
+            target=self._send_heartbeats,
+            args=(batch_id, lease["lease_duration"] / 3, done),
+            name=f"heartbeat-{batch_id}",
+            daemon=True,
+        )
+        heartbeats.start()
+        try:
+            results = self._run_batch(batch_id, lease["job_name"], lease["payload"])
+        finally:
+            done.set()
+            heartbeats.join()
+        if not self.server.complete(self.worker_id, batch_id, results):
+            logger.warning(
+                "Worker %s lost the lease of batch %s, its results were dropped",
+                self.worker_id,
+                batch_id,
+            )
+        return True
+
+    def _run_batch(self, batch_id, job_name, payload):
+        from a3m.client.mcp import execute_command
+
+        def on_task_result(task_uuid, result):
+            try:
+                self.server.report_task_result(
+                    self.worker_id, batch_id, task_uuid, result
+                )
+            except grpc.RpcError as err:
+                # The result is sent again with the batch.
+                logger.debug("Task result %s not reported: %s", task_uuid, err)
+
+        return execute_command(job_name, payload, on_task_result=on_task_result)
+
+    def _send_heartbeats(self, batch_id, interval, done):
+        while not done.wait(interval):
+            try:
+                lost = self.server.heartbeat(self.worker_id, [batch_id])
+            except grpc.RpcError as err:
+                logger.warning("Heartbeat of batch %s failed: %s", batch_id, err)
+                continue
+            if lost:
+                logger.warning(
+                    "Worker %s lost the lease of batch %s", self.worker_id, batch_id
+                )
+                return
+
+
+def run_worker(address, resource_classes=None):
+    """Run a worker of the server at ``address`` in this process until a
+    termination signal is received.
+    """
+    client = WorkerServiceClient(grpc.insecure_channel(address))
+    worker = RemoteWorker(client, resource_classes=resource_classes)
+
+    def signal_handler(signo, frame):
+        logger.info("Received termination signal (%s)", signal.Signals(signo).name)
+        worker.stop()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    worker.run()
+
+
+def run_worker_process(settings_module, address, resource_classes=None):
+    """Entry point of the worker processes started by ``a3m-worker``."""
+    from a3m.client.worker import init_worker
+
+    init_worker(settings_module)
+    run_worker(address, resource_classes)
@@ -0,0 +1,54 @@
+"""
+Bootstrap of the worker processes used by `PoolTaskBackend` to run client
+scripts.
+
+Worker processes are spawned from a clean interpreter, so this module is
+imported before Django is configured and must not import models or settings
+at module level.
+"""
+import importlib
+import os
+
+import django
+
+# Queue shared with the server process where task results are streamed.
+task_results = None
+
+
+def init_worker(settings_module, results_queue=None):
+    """Prepare a worker process to run client scripts.
+
+    Django is set up once per process and the client modules are imported
+    upfront so the first batch does not pay for it.
+    """
+    global task_results
+    task_results = results_queue
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+    from django.db import connections
+
+    # Every worker opens its own connection on first use.
+    connections.close_all()
+
+    importlib.import_module("a3m.client.mcp")
+
+
+def run_batch(job_name, batch_payload):
+    """Run a batch of tasks in this worker process."""
+    from a3m.client.mcp import execute_command
+
+    if task_results is None:
+        on_task_result = None
+    else:
+
+        def on_task_result(task_uuid, result):
+            task_results.put((task_uuid, result))
+
+    return execute_command(job_name, batch_payload, on_task_result=on_task_result)
+
+
+def ping():
+    """No-op used to start worker processes ahead of the first batch."""
+    return os.getpid()
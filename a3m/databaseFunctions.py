@@ -26,6 +26,7 @@ from django.utils import timezone
 
 from a3m.common_metrics import db_retry_timer
 from a3m.main.models import Agent
+from a3m.main.models import BULK_CREATE_BATCH_SIZE
 from a3m.main.models import Derivation
 from a3m.main.models import Event
 from a3m.main.models import File
@@ -186,6 +187,35 @@ def insertIntoEvents(
     event.agents.add(*agents)
 
 
+def bulk_insert_events(events):
+    """Save many unsaved events along with the default agents.
+
+    Like `insertIntoEvents`, but the events are written with a fixed number
+    of queries. Units only relate to the default agents, so every event gets
+    those.
+
+    :param list events: Unsaved `Event` objects with their ``event_id`` set.
+    """
+    Event.objects.bulk_create(events, batch_size=BULK_CREATE_BATCH_SIZE)
+
+    # Not every database gives us the primary keys back from bulk_create.
+    event_ids = Event.objects.filter(
+        event_id__in=[event.event_id for event in events]
+    ).values_list("pk", flat=True)
+    agent_ids = Agent.objects.filter(
+        Agent.objects.default_agents_query_keywords()
+    ).values_list("pk", flat=True)
+    EventAgent = Event.agents.through
+    EventAgent.objects.bulk_create(
+        [
+            EventAgent(event_id=event_id, agent_id=agent_id)
+            for event_id in event_ids
+            for agent_id in agent_ids
+        ],
+        batch_size=BULK_CREATE_BATCH_SIZE,
+    )
+
+
 def insertIntoDerivations(sourceFileUUID, derivedFileUUID, relatedEventUUID=None):
     """Creates a new entry in the Derivations table using the supplied
     arguments. The two files in this relationship should already exist in the
@@ -16,11 +16,12 @@
 # You should have received a copy of the GNU General Public License
 # along with Archivematica.  If not, see <http://www.gnu.org/licenses/>.
 import io
-import os
 import shlex
-import subprocess  # nosec B404
 import sys
-import tempfile
+
+from django.conf import settings
+
+from a3m import process_runner
 
 
 def launchSubProcess(
@@ -30,6 +31,7 @@ def launchSubProcess(
     arguments=[],
     env_updates={},
     capture_output=False,
+    timeout=None,
 ):
     """
     Launches a subprocess using ``command``, where ``command`` is either:
@@ -38,7 +40,7 @@ def launchSubProcess(
 
     In the former case, ``command`` is first split via shlex.split() before
     being executed. No subshell will be used in either case; the commands are
-    directly execed.
+    directly execed. The process is run by `a3m.process_runner`.
 
     Keyword arguments:
     stdIn:      A string which will be fed as standard input to the executed
@@ -59,11 +61,11 @@ def launchSubProcess(
                     If `capture_output` is `False`, then that stderr is only
                     returned IF the subprocess has failed, i.e., returned a
                     non-zero exit code.
+    timeout:    Seconds after which the subprocess is killed. Defaults to
+                the ``subprocess_timeout`` setting, no timeout if unset.
     """
-    # These represent subprocess output so we use bytes until they're returned
-    stdError = b""
-    stdOut = b""
-
+    if timeout is None:
+        timeout = settings.SUBPROCESS_TIMEOUT
     try:
         # Split command strings but pass through arrays untouched
         if isinstance(command, str):
@@ -71,44 +73,19 @@ def launchSubProcess(
         else:
             command.extend(arguments)
 
-        my_env = os.environ.copy()
-        my_env["PYTHONIOENCODING"] = "utf-8"
-        if "LANG" not in my_env or not my_env["LANG"]:
-            my_env["LANG"] = "en_US.UTF-8"
-        if "LANGUAGE" not in my_env or not my_env["LANGUAGE"]:
-            my_env["LANGUAGE"] = my_env["LANG"]
-        my_env.update(env_updates)
-
         if isinstance(stdIn, str):
-            stdin_pipe = subprocess.PIPE
-            stdin_string = stdIn
+            stdin = stdIn.encode("utf8")
         elif isinstance(stdIn, io.IOBase):
-            stdin_pipe = stdIn
-            stdin_string = ""
+            stdin = stdIn
         else:
             raise Exception("stdIn must be a string or a file object")
-        if capture_output:
-            # Capture the stdout and stderr of the subprocess
-            p = subprocess.Popen(  # nosec B603
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                stdin=stdin_pipe,
-                env=my_env,
-            )
-            stdOut, stdError = p.communicate(input=stdin_string)
-        else:
-            # Ignore the stdout of the subprocess, capturing only stderr
-            with open(os.devnull, "w") as devnull:
-                p = subprocess.Popen(  # nosec B603
-                    command,
-                    stdin=stdin_pipe,
-                    env=my_env,
-                    stdout=devnull,
-                    stderr=subprocess.PIPE,
-                )
-                __, stdError = p.communicate(input=stdin_string)
-        retcode = p.returncode
+        retcode, stdOut, stdError, _ = process_runner.run_sync(
+            command,
+            stdin=stdin,
+            env_updates=env_updates,
+            capture_output=capture_output,
+            timeout=timeout,
+        )
         # If we are not capturing output and the subprocess has succeeded, set
         # its stderr to the empty string.
         if (not capture_output) and (retcode == 0):
@@ -129,28 +106,27 @@ def launchSubProcess(
 
 
 def createAndRunScript(
-    text, stdIn="", printing=False, arguments=[], env_updates={}, capture_output=True
+    text,
+    stdIn="",
+    printing=False,
+    arguments=[],
+    env_updates={},
+    capture_output=True,
+    timeout=None,
 ):
-    with tempfile.NamedTemporaryFile(
-        encoding="utf-8", mode="wt", delete=False
-    ) as tmpfile:
-        os.chmod(tmpfile.name, 0o700)
-        tmpfile.write(text)
-        tmpfile.close()
-        cmd = [tmpfile.name]
-        cmd.extend(arguments)
-
-        # Run it
-        ret = launchSubProcess(
-            cmd,
-            stdIn="",
-            printing=printing,
-            env_updates=env_updates,
-            capture_output=capture_output,
-        )
-        os.unlink(tmpfile.name)
+    # Scripts are written once per worker, see `process_runner.ScriptCache`.
+    cmd = [process_runner.script_cache.get_path(text)]
+    cmd.extend(arguments)
 
-    return ret
+    # Run it
+    return launchSubProcess(
+        cmd,
+        stdIn="",
+        printing=printing,
+        env_updates=env_updates,
+        capture_output=capture_output,
+        timeout=timeout,
+    )
 
 
 def executeOrRun(
@@ -161,6 +137,7 @@ def executeOrRun(
     arguments=[],
     env_updates={},
     capture_output=True,
+    timeout=None,
 ):
     """
     Attempts to run the provided command on the shell, with the text of
@@ -191,6 +168,8 @@ def executeOrRun(
     env_updates: Dict of changes to apply to the started process' environment.
     capture_output: Whether or not to capture output for the executed process.
                 Default is `True`.
+    timeout:    Seconds after which the executed process is killed. Defaults
+                to the ``subprocess_timeout`` setting.
     """
     if type == "command":
         return launchSubProcess(
@@ -200,6 +179,7 @@ def executeOrRun(
             arguments=arguments,
             env_updates=env_updates,
             capture_output=capture_output,
+            timeout=timeout,
         )
     if type == "bashScript":
         text = "#!/bin/bash\n" + text
@@ -210,6 +190,7 @@ def executeOrRun(
             arguments=arguments,
             env_updates=env_updates,
             capture_output=capture_output,
+            timeout=timeout,
         )
     if type == "pythonScript":
         text = "#!/usr/bin/env python\n" + text
@@ -220,6 +201,7 @@ def executeOrRun(
             arguments=arguments,
             env_updates=env_updates,
             capture_output=capture_output,
+            timeout=timeout,
         )
     if type == "as_is":
         return createAndRunScript(
@@ -229,4 +211,5 @@ def executeOrRun(
             arguments=arguments,
             env_updates=env_updates,
             capture_output=capture_output,
+            timeout=timeout,
         )
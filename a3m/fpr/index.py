@@ -0,0 +1,158 @@
+"""
+:mod:`fpr.index`
+
+In-memory index of the enabled FPR rules, shared by the client scripts of a
+process so they don't have to query the FPR tables for every file.
+
+The FPR barely changes while a3m runs. The index is loaded on first use and
+dropped whenever an FPR model is saved or deleted, or migrations are applied.
+Changes made with ``QuerySet.update`` outside migrations are not noticed.
+"""
+import threading
+import uuid
+
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_migrate
+from django.db.models.signals import post_save
+
+from a3m.fpr.models import FormatVersion
+from a3m.fpr.models import FPRule
+from a3m.main.models import FileFormatVersion
+
+
+def _to_uuid(value):
+    if isinstance(value, uuid.UUID):
+        return value
+    return uuid.UUID(str(value))
+
+
+class RuleIndex:
+    """Enabled FPR rules indexed by purpose and format version.
+
+    Rules come with their commands, including the verification and event
+    detail commands, already joined. Rules are sorted by UUID.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rules = None  # purpose: {format_version_uuid: [FPRule]}
+        self.format_versions = None  # Enabled format version UUIDs.
+
+    def invalidate(self):
+        with self.lock:
+            self.rules = None
+            self.format_versions = None
+
+    def _load(self):
+        with self.lock:
+            if self.rules is not None:
+                return self.rules, self.format_versions
+            rules = {}
+            queryset = FPRule.active.select_related(
+                "format",
+                "command",
+                "command__tool",
+                "command__output_format",
+                "command__verification_command",
+                "command__event_detail_command",
+            ).order_by("uuid")
+            for rule in queryset:
+                rules.setdefault(rule.purpose, {}).setdefault(
+                    rule.format_id, []
+                ).append(rule)
+            self.format_versions = set(
+                FormatVersion.active.values_list("uuid", flat=True)
+            )
+            self.rules = rules
+            return self.rules, self.format_versions
+
+    def get_rules(self, purpose, format_version=None):
+        """Return the enabled rules with the given purpose.
+
+        :param purpose: Purpose of the rules, e.g. ``FPRule.CHARACTERIZATION``.
+        :param format_version: UUID of the format version the rules apply to.
+            Rules for all format versions are returned if not given.
+        """
+        rules, _ = self._load()
+        by_format_version = rules.get(purpose, {})
+        if format_version is None:
+            return sorted(
+                (rule for items in by_format_version.values() for rule in items),
+                key=lambda rule: rule.uuid,
+            )
+        return list(by_format_version.get(_to_uuid(format_version), ()))
+
+    def get_format_versions(self, purpose):
+        """Return the UUIDs of the format versions with enabled rules of the
+        given purpose.
+        """
+        rules, _ = self._load()
+        return frozenset(rules.get(purpose, ()))
+
+    def get_file_format_version(self, file_uuid, active=True):
+        """Return the UUID of the format version a file is identified as.
+
+        ``None`` is returned if the file hasn't been identified, or if its
+        format version is not enabled and ``active`` is set.
+        """
+        format_version = (
+            FileFormatVersion.objects.filter(file_uuid_id=file_uuid)
+            .values_list("format_version_id", flat=True)
+            .first()
+        )
+        if format_version is None:
+            return None
+        format_version = _to_uuid(format_version)
+        if active and format_version not in self._load()[1]:
+            return None
+        return format_version
+
+    def get_file_format_versions(self, file_uuids, active=True):
+        """Return the UUIDs of the format versions many files are identified
+        as, in a single query, see `get_file_format_version`.
+
+        The result is keyed by the values of ``file_uuids``. Files for which
+        `get_file_format_version` returns ``None``, or whose value isn't a
+        UUID, are left out.
+        """
+        keys = {}
+        for value in file_uuids:
+            try:
+                keys[_to_uuid(value)] = value
+            except ValueError:
+                continue
+        first_format_versions = {}
+        queryset = (
+            FileFormatVersion.objects.filter(file_uuid_id__in=keys)
+            .order_by("pk")
+            .values_list("file_uuid_id", "format_version_id")
+        )
+        for file_uuid, format_version in queryset:
+            first_format_versions.setdefault(_to_uuid(file_uuid), format_version)
+        _, active_format_versions = self._load()
+        result = {}
+        for file_uuid, format_version in first_format_versions.items():
+            if format_version is None:
+                continue
+            format_version = _to_uuid(format_version)
+            if active and format_version not in active_format_versions:
+                continue
+            result[keys[file_uuid]] = format_version
+        return result
+
+
+rule_index = RuleIndex()
+
+
+def _invalidate_on_save(sender, **kwargs):
+    if sender._meta.app_label == "fpr":
+        rule_index.invalidate()
+
+
+def _invalidate_on_migrate(sender, **kwargs):
+    rule_index.invalidate()
+
+
+post_save.connect(_invalidate_on_save, dispatch_uid="fpr_index_post_save")
+post_delete.connect(_invalidate_on_save, dispatch_uid="fpr_index_post_delete")
+post_migrate.connect(_invalidate_on_migrate, dispatch_uid="fpr_index_post_migrate")
@@ -0,0 +1,79 @@
+"""Compute file checksums.
+
+Files are read once with large buffers and fed to every requested algorithm,
+and batches of files are hashed by a bounded pool of threads. hashlib releases
+the GIL while digesting large buffers, so threads hash files in parallel.
+"""
+import concurrent.futures
+import hashlib
+import mmap
+import os
+
+
+# Size of the buffers read from disk.
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Files of this size or larger are memory-mapped rather than read.
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# Maximum number of files hashed concurrently.
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _hash_mmap(file_, size, hashes):
+    with mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            for offset in range(0, size, READ_BUFFER_SIZE):
+                chunk = view[offset : offset + READ_BUFFER_SIZE]
+                for hash_ in hashes:
+                    hash_.update(chunk)
+                chunk.release()
+        finally:
+            view.release()
+
+
+def _hash_read(file_, hashes):
+    buffer = bytearray(READ_BUFFER_SIZE)
+    view = memoryview(buffer)
+    while True:
+        length = file_.readinto(buffer)
+        if not length:
+            break
+        for hash_ in hashes:
+            hash_.update(view[:length])
+
+
+def hash_file(path, algorithms=("sha256",), use_mmap=True):
+    """Compute the checksums of a file in a single read pass.
+
+    :param path: Path of the file.
+    :param algorithms: Names of the hashlib algorithms to use, e.g. 'md5'.
+    :param use_mmap: Memory-map files larger than ``MMAP_THRESHOLD``.
+    :return: A dict mapping each algorithm to the hex digest of the file.
+    """
+    hashes = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+    with open(path, "rb") as file_:
+        size = os.fstat(file_.fileno()).st_size
+        if use_mmap and size >= MMAP_THRESHOLD:
+            _hash_mmap(file_, size, list(hashes.values()))
+        else:
+            _hash_read(file_, list(hashes.values()))
+    return {algorithm: hash_.hexdigest() for algorithm, hash_ in hashes.items()}
+
+
+def hash_files(paths, algorithms=("sha256",), max_workers=None):
+    """Compute the checksums of many files concurrently.
+
+    Results are yielded in the order of ``paths`` as ``(path, checksums)``
+    tuples, see `hash_file`. Errors raised reading a file are raised when its
+    result is reached.
+    """
+    paths = list(paths)
+    if not paths:
+        return
+    max_workers = min(max_workers or MAX_WORKERS, len(paths))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(hash_file, path, algorithms) for path in paths]
+        for path, future in zip(paths, futures):
+            yield path, future.result()
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:48
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0002_initial_data"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sip",
+            name="status",
+            field=models.PositiveSmallIntegerField(
+                choices=[
+                    (0, "Unknown"),
+                    (1, "Failed"),
+                    (2, "Rejected"),
+                    (3, "Complete"),
+                    (4, "Processing"),
+                ],
+                default=0,
+            ),
+        ),
+    ]
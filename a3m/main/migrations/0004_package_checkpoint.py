@@ -0,0 +1,59 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:15
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0003_sip_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PackageCheckpoint",
+            fields=[
+                (
+                    "sip",
+                    models.OneToOneField(
+                        db_column="sipUUID",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="main.sip",
+                    ),
+                ),
+                ("name", models.TextField()),
+                ("url", models.TextField()),
+                ("config", models.BinaryField()),
+                ("priority", models.IntegerField(blank=True, null=True)),
+                ("stage", models.CharField(max_length=50)),
+                (
+                    "microservicechainlink",
+                    models.UUIDField(
+                        blank=True, db_column="MicroServiceChainLinksPK", null=True
+                    ),
+                ),
+                (
+                    "jobuuid",
+                    models.UUIDField(blank=True, db_column="jobUUID", null=True),
+                ),
+                (
+                    "updatedtime",
+                    models.DateTimeField(auto_now=True, db_column="updatedTime"),
+                ),
+                (
+                    "transfer",
+                    models.OneToOneField(
+                        db_column="transferUUID",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="main.transfer",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "PackageCheckpoints",
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 08:13
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0004_package_checkpoint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="skippedtasks",
+            field=models.IntegerField(db_column="skippedTasks", default=0),
+        ),
+    ]
@@ -239,6 +239,24 @@ class SIP(models.Model):
     identifiers = models.ManyToManyField("Identifier")
     diruuids = models.BooleanField(db_column="dirUUIDs", default=False)
 
+    # Processing status of the package, values match ``PackageStatus`` in the
+    # gRPC API.
+    STATUS_UNKNOWN = 0
+    STATUS_FAILED = 1
+    STATUS_REJECTED = 2
+    STATUS_COMPLETE = 3
+    STATUS_PROCESSING = 4
+    STATUS = (
+        (STATUS_UNKNOWN, _("Unknown")),
+        (STATUS_FAILED, _("Failed")),
+        (STATUS_REJECTED, _("Rejected")),
+        (STATUS_COMPLETE, _("Complete")),
+        (STATUS_PROCESSING, _("Processing")),
+    )
+    status = models.PositiveSmallIntegerField(
+        choices=STATUS, default=STATUS_UNKNOWN, blank=False
+    )
+
     objects = UnitHiddenManager()
 
     class Meta:
@@ -568,6 +586,8 @@ class Job(models.Model):
     microservicechainlink = models.UUIDField(
         null=True, blank=True, db_column="MicroServiceChainLinksPK", default=uuid.uuid4
     )
+    # Files of the job not given a task, e.g. because no FPR rule applies.
+    skippedtasks = models.IntegerField(db_column="skippedTasks", default=0)
 
     objects = JobQuerySet.as_manager()
 
@@ -628,6 +648,35 @@ class Task(models.Model):
         db_table = "Tasks"
 
 
+class PackageCheckpoint(models.Model):
+    """Position of a package in the workflow while it's being processed, so
+    that processing can be resumed after a restart.
+    """
+
+    sip = models.OneToOneField(
+        "SIP", primary_key=True, db_column="sipUUID", on_delete=models.CASCADE
+    )
+    transfer = models.OneToOneField(
+        "Transfer", db_column="transferUUID", on_delete=models.CASCADE
+    )
+    name = models.TextField()
+    url = models.TextField()
+    # Serialized ``ProcessingConfig`` of the gRPC API.
+    config = models.BinaryField()
+    priority = models.IntegerField(null=True, blank=True)
+    # Name of the ``Stage`` of the package.
+    stage = models.CharField(max_length=50)
+    # Link and job last started, if any.
+    microservicechainlink = models.UUIDField(
+        null=True, blank=True, db_column="MicroServiceChainLinksPK"
+    )
+    jobuuid = models.UUIDField(null=True, blank=True, db_column="jobUUID")
+    updatedtime = models.DateTimeField(db_column="updatedTime", auto_now=True)
+
+    class Meta:
+        db_table = "PackageCheckpoints"
+
+
 class AgentManager(models.Manager):
 
     # These are set in the 0002_initial_data.py migration of the dashboard
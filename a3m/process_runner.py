@@ -0,0 +1,235 @@
+"""Run external processes with asyncio.
+
+Client scripts spend most of their time waiting for external tools. The
+runner keeps the cost of each child low, so that scripts can run many of them
+concurrently from their threads, e.g. normalization:
+
+* The environment of the children is built once per process.
+* Their output is streamed into bounded ring buffers, so a chatty tool can't
+  exhaust the memory of the worker. When output is dropped, a truncation
+  marker is left in its place.
+* Script files are written once per worker and reused, as FPR commands run
+  the same scripts over and over.
+"""
+import asyncio
+import atexit
+import collections
+import concurrent.futures
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+# Maximum number of bytes of stdout and stderr kept, per stream.
+MAX_OUTPUT_SIZE = 64 * 1024 * 1024
+
+# Size of the chunks read from the pipes of the children.
+READ_CHUNK_SIZE = 64 * 1024
+
+
+ProcessResult = collections.namedtuple(
+    "ProcessResult", "exit_code stdout stderr timed_out"
+)
+
+
+class RingBuffer:
+    """Keep the last ``maxsize`` bytes written to it."""
+
+    def __init__(self, maxsize=MAX_OUTPUT_SIZE):
+        self.maxsize = maxsize
+        self.chunks = collections.deque()
+        self.size = 0
+        self.dropped = 0
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.size += len(data)
+        if self.maxsize is None:
+            return
+        while self.size > self.maxsize:
+            excess = self.size - self.maxsize
+            head = self.chunks[0]
+            if len(head) <= excess:
+                self.chunks.popleft()
+                self.size -= len(head)
+                self.dropped += len(head)
+            else:
+                self.chunks[0] = head[excess:]
+                self.size -= excess
+                self.dropped += excess
+
+    def getvalue(self):
+        value = b"".join(self.chunks)
+        if self.dropped:
+            # Don't start with the remains of a split UTF-8 sequence.
+            value = value.lstrip(bytes(range(0x80, 0xC0)))
+            marker = f"[... {self.dropped} bytes truncated ...]\n".encode()
+            value = marker + value
+        return value
+
+
+_environment = None
+_environment_lock = threading.Lock()
+
+
+def get_environment():
+    """Return the environment of the children, built on first use."""
+    global _environment
+    with _environment_lock:
+        if _environment is None:
+            env = os.environ.copy()
+            env["PYTHONIOENCODING"] = "utf-8"
+            if not env.get("LANG"):
+                env["LANG"] = "en_US.UTF-8"
+            if not env.get("LANGUAGE"):
+                env["LANGUAGE"] = env["LANG"]
+            _environment = env
+        return _environment
+
+
+class ScriptCache:
+    """Executable script files, keyed by the hash of their contents."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.directory = None
+        self.pid = None
+        self.paths = {}
+
+    def get_path(self, text):
+        """Return the path of an executable file with the given contents."""
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self.lock:
+            # Children of a forked worker start over with their own files.
+            if self.pid != os.getpid():
+                self.directory = tempfile.mkdtemp(prefix="a3m-scripts-")
+                self.pid = os.getpid()
+                self.paths = {}
+                atexit.register(shutil.rmtree, self.directory, True)
+            path = self.paths.get(key)
+            if path is None or not os.path.exists(path):
+                path = os.path.join(self.directory, key)
+                with tempfile.NamedTemporaryFile(
+                    encoding="utf-8", mode="wt", dir=self.directory, delete=False
+                ) as tmpfile:
+                    tmpfile.write(text)
+                os.chmod(tmpfile.name, 0o700)
+                os.replace(tmpfile.name, path)
+                self.paths[key] = path
+            return path
+
+    def clear(self):
+        with self.lock:
+            if self.directory is not None and self.pid == os.getpid():
+                shutil.rmtree(self.directory, True)
+            self.directory = None
+            self.pid = None
+            self.paths = {}
+
+
+script_cache = ScriptCache()
+
+
+async def _drain(stream, buffer):
+    while True:
+        data = await stream.read(READ_CHUNK_SIZE)
+        if not data:
+            break
+        buffer.write(data)
+
+
+async def _feed(stream, data):
+    try:
+        if data:
+            stream.write(data)
+            await stream.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # The child doesn't read its input.
+    finally:
+        stream.close()
+
+
+async def run(
+    args,
+    stdin=b"",
+    env_updates=None,
+    capture_output=True,
+    timeout=None,
+    max_output_size=MAX_OUTPUT_SIZE,
+):
+    """Run a process and collect its output.
+
+    :param args: Program and arguments of the process.
+    :param stdin: Bytes fed to the standard input of the process, or a file
+        object the process reads from.
+    :param env_updates: Dict of changes to apply to the environment.
+    :param capture_output: Whether to collect stdout. stderr is always
+        collected.
+    :param timeout: Seconds after which the process is killed.
+    :param max_output_size: Bytes of stdout and stderr kept, the beginning of
+        longer output is dropped.
+    :return: A `ProcessResult` with the output as bytes. The exit code of
+        a killed process is the negative number of the signal.
+    """
+    env = get_environment()
+    if env_updates:
+        env = {**env, **env_updates}
+    if isinstance(stdin, bytes):
+        stdin_pipe, stdin_data = asyncio.subprocess.PIPE, stdin
+    else:
+        stdin_pipe, stdin_data = stdin, None
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=stdin_pipe,
+        stdout=(
+            asyncio.subprocess.PIPE if capture_output else asyncio.subprocess.DEVNULL
+        ),
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+    )
+
+    stdout, stderr = RingBuffer(max_output_size), RingBuffer(max_output_size)
+    tasks = [_drain(process.stderr, stderr)]
+    if capture_output:
+        tasks.append(_drain(process.stdout, stdout))
+    if stdin_data is not None:
+        tasks.append(_feed(process.stdin, stdin_data))
+
+    timed_out = False
+    try:
+        await asyncio.wait_for(asyncio.gather(*tasks, process.wait()), timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        process.kill()
+        await process.wait()
+        stderr.write(f"\nProcess killed after {timeout} seconds.\n".encode())
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+
+    return ProcessResult(
+        process.returncode, stdout.getvalue(), stderr.getvalue(), timed_out
+    )
+
+
+async def run_script(text, arguments=(), **kwargs):
+    """Run the given script source, see `run`."""
+    path = script_cache.get_path(text)
+    return await run([path, *arguments], **kwargs)
+
+
+def _run_coroutine(coroutine):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    # The calling thread already runs an event loop that we can't block on.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def run_sync(args, **kwargs):
+    """Run a process from synchronous code, see `run`."""
+    return _run_coroutine(run(args, **kwargs))
@@ -15,7 +15,8 @@ It makes use of the following major abstractions:
       (in batches)
     * `packages.Package` subclasses `SIP` and `Transfer` handle package
        related logic
-    * a `concurrent.futures.ThreadPoolExecutor` handles out of process execution
+    * a `concurrent.futures.ProcessPoolExecutor` handles out of process execution
+      (or a single thread when `worker_processes` is 1)
     * `queues.PackageQueue` handles scheduling of `Job` objects for execution
       (throttled per package). The package queue is thread-safe.
     * `rpc_server.RPCServer` handles RPC requests from the dashboard, which arrive
@@ -2,6 +2,7 @@
 A base class for other Job types to inherit from.
 """
 import abc
+import asyncio
 import logging
 import uuid
 
@@ -20,7 +21,8 @@ class Job(metaclass=abc.ABCMeta):
     database.
 
     Subclasses must implement a `run` method; it will be called in a thread via
-    `executor.submit`, and should return the next job to be processed.
+    `executor.submit`, and should return the next job to be processed. Jobs
+    run from an event loop go through `run_async` instead.
     """
 
     # Mirror job model statuses, so that we can mostly avoid referencing
@@ -43,13 +45,22 @@ class Job(metaclass=abc.ABCMeta):
         # always zero for non task jobs
         self.exit_code = 0
 
+        # Last status saved to the database.
+        self.status = self.STATUS_UNKNOWN
+
+        # Job of the same link interrupted by a restart, if resumed.
+        self.resumed_job_id = None
+
+        # Files not given a task, see `FilesClientScriptJob`.
+        self.skipped_files = 0
+
     @classmethod
     @auto_close_old_connections()
     def cleanup_old_db_entries(cls):
         """Update the status of any in progress jobs.
 
-        This command is run on startup.
-        TODO: we could try to recover, instead of just failing.
+        This command is run on startup. Their packages may be resumed by new
+        jobs, see `Package.resume_packages`.
         """
         models.Job.objects.filter(currentstep=cls.STATUS_EXECUTING_COMMANDS).update(
             currentstep=cls.STATUS_FAILED
@@ -64,8 +75,19 @@ class Job(metaclass=abc.ABCMeta):
         to process.
         """
 
+    async def run_async(self, executor):
+        """
+        Run the job from an event loop and return the next job to process.
+
+        `run` is executed via ``executor`` unless overridden.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.run)
+
     @auto_close_old_connections()
     def save_to_db(self):
+        self.status = self.STATUS_EXECUTING_COMMANDS
+        self.package.save_checkpoint(self)
         return models.Job.objects.create(
             jobuuid=self.uuid,
             jobtype=self.description,
@@ -87,6 +109,7 @@ class Job(metaclass=abc.ABCMeta):
             self.uuid,
             self.exit_code,
         )
+        self.status = self.STATUS_COMPLETED_SUCCESSFULLY
         return models.Job.objects.filter(jobuuid=self.uuid).update(
             currentstep=self.STATUS_COMPLETED_SUCCESSFULLY
         )
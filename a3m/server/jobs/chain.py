@@ -50,19 +50,29 @@ class JobChain:
     Job chains are used for passing information between jobs, via:
         * context, a dict of replacement variables for tasks
         * next_link, a workflow link that can be set to redirect the job chain
+
+    Given the `WorkflowPlan` of the processing configuration of the package,
+    the chain walks the plan and never creates jobs for decision links.
+
+    Chains resuming a package after a restart start at the link of the job
+    that was interrupted, ``resumed_job_id``, which is given to the first job.
     """
 
-    def __init__(self, package, workflow, starting_link):
+    def __init__(
+        self, package, workflow, starting_link, plan=None, resumed_job_id=None
+    ):
         """Create an instance of a chain, based on the workflow chain given."""
         self.package = package
         self.workflow = workflow
+        self.plan = plan
+        self.resumed_job_id = resumed_job_id
 
         self.initial_link = starting_link
         self.current_link = None
         self.next_link = self.initial_link
 
         self.current_job = None
-        # TODO: package context hits the db, make that clearer
+        # Read from the database once per package, see `Package.context`.
         self.context = self.package.context.copy()
 
         logger.debug(
@@ -78,6 +88,12 @@ class JobChain:
         if self.next_link:
             next_link = self.next_link
             self.next_link = None
+            if self.plan is not None:
+                next_link = self.plan.resolve(next_link)
+        elif self.plan is not None:
+            next_link = self.plan.get_next_link(
+                self.current_link, self.current_job.exit_code
+            )
         else:
             try:
                 next_link = self.current_link.get_next_link(self.current_job.exit_code)
@@ -98,6 +114,9 @@ class JobChain:
         self.current_link = next_link
         job_class = get_job_class_for_link(self.current_link)
         self.current_job = job_class(self, self.current_link, self.package)
+        if self.resumed_job_id is not None:
+            self.current_job.resumed_job_id = self.resumed_job_id
+            self.resumed_job_id = None
         return self.current_job
 
     def job_completed(self):
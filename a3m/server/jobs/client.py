@@ -2,8 +2,15 @@
 Jobs remotely executed by on MCP client.
 """
 import abc
+import asyncio
+import collections
+import functools
+import itertools
 import logging
+import re
+import shlex
 
+from a3m.fpr.index import rule_index
 from a3m.main import models
 from a3m.server import metrics
 from a3m.server.db import auto_close_old_connections
@@ -24,6 +31,65 @@ def _escape_for_command_line(value):
     return value
 
 
+class CommandTemplate:
+    """A command line with placeholders, e.g. ``"%SIPUUID%" "%fileUUID%"``.
+
+    The command is parsed once so it can be rendered for every task of a job
+    without scanning it for each of the replacement values available. Values
+    are inserted in a single pass: placeholders found in the values are not
+    replaced, except for those left to MCPClient (e.g. ``%sharedPath%``).
+    """
+
+    PLACEHOLDER = re.compile(r"(%[A-Za-z][A-Za-z0-9_:]*%)")
+
+    def __init__(self, command):
+        self.command = command
+        self.segments = self._split(command)
+        # Arguments of the command line, split like MCPClient would.
+        self.argv_segments = [
+            self._split(argument) for argument in shlex.split(command)
+        ]
+        self.placeholders = frozenset(self.segments[1::2])
+
+    @classmethod
+    def _split(cls, text):
+        # Literal text at even indexes, placeholders at odd indexes.
+        return cls.PLACEHOLDER.split(text)
+
+    @staticmethod
+    def _render(segments, replacements, escape=False):
+        parts = []
+        for index, segment in enumerate(segments):
+            if index % 2:
+                try:
+                    value = str(replacements[segment])
+                except KeyError:
+                    value = segment
+                else:
+                    if escape:
+                        value = _escape_for_command_line(value)
+                parts.append(value)
+            elif segment:
+                parts.append(segment)
+        return "".join(parts)
+
+    def render(self, replacements):
+        """Return the command line, with values escaped as in the template."""
+        return self._render(self.segments, replacements, escape=True)
+
+    def render_argv(self, replacements):
+        """Return the list of arguments of the command line."""
+        return [self._render(segments, replacements) for segments in self.argv_segments]
+
+
+@functools.lru_cache(maxsize=None)
+def compile_command(command):
+    """Return the `CommandTemplate` of a command, or ``None``."""
+    if command is None:
+        return None
+    return CommandTemplate(command)
+
+
 class ClientScriptJob(Job, metaclass=abc.ABCMeta):
     """A job with one or more Tasks."""
 
@@ -41,6 +107,9 @@ class ClientScriptJob(Job, metaclass=abc.ABCMeta):
 
         self.command_replacements = {}
 
+        # Changes to the package reported by the tasks, applied by `finish`.
+        self.package_updates = []
+
     @property
     def name(self):
         """The name of the job, e.g. "normalize_v1.0".
@@ -71,68 +140,106 @@ class ClientScriptJob(Job, metaclass=abc.ABCMeta):
         """A file path to capture job stderr, as defined in the workflow."""
         return self.link.config.get("stderr_file")
 
-    @staticmethod
-    def replace_values(command, replacements):
-        """Replace variables in a string with any replacements given in a dict.
+    @auto_close_old_connections()
+    def run(self, *args, **kwargs):
+        super().run(*args, **kwargs)
 
-        A large number of replacement values are available. For more details see
-        `get_replacement_mapping` and `get_file_replacement_mapping` in the `packages`
-        module.
-        """
-        if command is None:
-            return None
+        self.start()
+        # Block until out of process tasks have completed
+        self.wait_for_task_results()
 
-        for key, replacement in replacements.items():
-            escaped_replacement = _escape_for_command_line(replacement)
-            command = command.replace(key, escaped_replacement)
+        return self.finish()
 
-        return command
+    async def run_async(self, executor):
+        """Run the job from an event loop.
 
-    @auto_close_old_connections()
-    def run(self, *args, **kwargs):
-        super().run(*args, **kwargs)
+        Database work happens in ``executor`` but no thread is held while
+        tasks run, the backend results are awaited instead. Callbacks of the
+        tasks are called once all of them are done.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self.start)
+        tasks = []
+        async for task in self.task_backend.wait_for_results_async(self):
+            self.record_task_result(task)
+            tasks.append(task)
+        return await loop.run_in_executor(executor, self.finish, tasks)
 
+    @auto_close_old_connections()
+    def start(self):
+        """Save the job and submit its tasks."""
         logger.debug("Running %s (package %s)", self.description, self.package.uuid)
 
-        # Reload the package, in case the path has changed
-        self.package.reload()
         self.save_to_db()
 
-        self.command_replacements = self.package.get_replacement_mapping()
-        if self.job_chain.context is not None:
-            self.command_replacements.update(self.job_chain.context)
+        # The mapping of the package is shared, copy it before adding to it.
+        replacements = self.package.get_replacement_mapping()
+        if self.job_chain.context:
+            replacements = dict(replacements)
+            replacements.update(self.job_chain.context)
+        self.command_replacements = replacements
 
         self.task_backend = get_task_backend()
         self.submit_tasks()
-        # Block until out of process tasks have completed
-        self.wait_for_task_results()
+
+    @auto_close_old_connections()
+    def finish(self, tasks=()):
+        """Call the callbacks of ``tasks``, save the status of the job and
+        return the next job.
+        """
+        for task in tasks:
+            self.task_completed_callback(task)
+
+        for updates in self.package_updates:
+            self.package.apply_updates(updates)
+            if updates.get("context"):
+                self.job_chain.context.update(updates["context"])
 
         self.update_status_from_exit_code()
 
         return next(self.job_chain, None)
 
-    def submit_tasks(self):
-        arguments = self.replace_values(self.arguments, self.command_replacements)
-        stdout_file = self.replace_values(self.stdout_file, self.command_replacements)
-        stderr_file = self.replace_values(self.stderr_file, self.command_replacements)
+    def create_task(self, file_replacements=None):
+        """Return a `Task` running the command of the link.
 
-        task = Task(
+        The arguments are compiled once per link, see `CommandTemplate`.
+        Replacement values of the file, if given, take priority over the ones
+        of the job, which are shared by all its tasks.
+        """
+        replacements = self.command_replacements
+        if file_replacements is not None:
+            replacements = collections.ChainMap(file_replacements, replacements)
+        arguments = compile_command(self.arguments)
+        stdout_file = compile_command(self.stdout_file)
+        stderr_file = compile_command(self.stderr_file)
+
+        return Task(
             self.execute,
-            arguments,
-            stdout_file,
-            stderr_file,
+            arguments.render(replacements) if arguments else None,
+            stdout_file.render(replacements) if stdout_file else None,
+            stderr_file.render(replacements) if stderr_file else None,
             self.command_replacements,
             wants_output=self.capture_task_output,
+            argv=arguments.render_argv(replacements) if arguments else [],
+            file_context=file_replacements,
         )
+
+    def submit_tasks(self):
+        task = self.create_task()
         self.task_backend.submit_task(self, task)
 
     def wait_for_task_results(self):
         for task in self.task_backend.wait_for_results(self):
-            # A3M-TODO: These 0s avoid comparing int with None
-            self.exit_code = max([self.exit_code or 0, task.exit_code or 0])
-            metrics.task_completed(task, self)
+            self.record_task_result(task)
             self.task_completed_callback(task)
 
+    def record_task_result(self, task):
+        # A3M-TODO: These 0s avoid comparing int with None
+        self.exit_code = max([self.exit_code or 0, task.exit_code or 0])
+        if task.package_updates:
+            self.package_updates.append(task.package_updates)
+        metrics.task_completed(task, self)
+
     @abc.abstractmethod
     def task_completed_callback(self, task):
         """Hook for child classes."""
@@ -140,6 +247,7 @@ class ClientScriptJob(Job, metaclass=abc.ABCMeta):
     @auto_close_old_connections()
     def update_status_from_exit_code(self):
         status_code = self.link.get_status_id(self.exit_code)
+        self.status = status_code
         models.Job.objects.filter(jobuuid=self.uuid).update(currentstep=status_code)
         if status_code != models.Job.STATUS_COMPLETED_SUCCESSFULLY:
             try:
@@ -172,36 +280,129 @@ class DirectoryClientScriptJob(ClientScriptJob):
 class FilesClientScriptJob(ClientScriptJob):
     """
     A job with many tasks, one per file.
+
+    When the job resumes a job interrupted by a restart, files whose task was
+    done already are not given a new one, the exit codes of the done tasks
+    count towards the exit code of the job instead.
     """
 
+    # Number of files whose format version is looked up at once when files
+    # without FPR rules are skipped.
+    FORMAT_LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Files whose task was done by the resumed job.
+        self.resumed_files = 0
+
     @property
     def filter_subdir(self):
         """Returns directory to filter files on."""
         return self.link.config.get("filter_subdir", "")
 
+    @property
+    def skip_files_without_rules(self):
+        """FPR rules the client script looks for, if the link lets files no
+        rule applies to be skipped, e.g.
+        ``{"purposes": ["characterization"], "match_format": True}``.
+        """
+        return self.link.config.get("skip_files_without_rules")
+
     def submit_tasks(self):
-        """Iterate through all matching files for the package, and submit tasks."""
-        for file_replacements in self.package.files(filter_subdir=self.filter_subdir):
-            # File replacement values take priority
-            command_replacements = self.command_replacements.copy()
-            command_replacements.update(file_replacements)
-
-            arguments = self.replace_values(self.arguments, command_replacements)
-            stdout_file = self.replace_values(self.stdout_file, command_replacements)
-            stderr_file = self.replace_values(self.stderr_file, command_replacements)
-
-            task = Task(
-                self.execute,
-                arguments,
-                stdout_file,
-                stderr_file,
-                command_replacements,
-                wants_output=self.capture_task_output,
-            )
+        """Iterate through all matching files for the package, and submit tasks.
+
+        The backend starts running tasks while files are still being listed,
+        and may block here until earlier tasks are done.
+        """
+        files = self.package.files(filter_subdir=self.filter_subdir)
+        if self.skip_files_without_rules:
+            files = self._files_with_rules(files)
+        done_tasks = self._get_resumed_exit_codes()
+        resumed_exit_code = 0
+        for file_replacements in files:
+            exit_code = done_tasks.get(str(file_replacements[r"%fileUUID%"]))
+            if exit_code is not None:
+                resumed_exit_code = max(resumed_exit_code, exit_code)
+                self.resumed_files += 1
+                continue
+            task = self.create_task(file_replacements)
             self.task_backend.submit_task(self, task)
         else:
             # Nothing to do; set exit code to success
             self.exit_code = 0
 
+        if self.resumed_files:
+            self.exit_code = max(self.exit_code or 0, resumed_exit_code)
+            logger.info(
+                "Kept the tasks of %d files done before the restart (%s, package %s)",
+                self.resumed_files,
+                self.description,
+                self.package.uuid,
+            )
+
+        if self.skipped_files:
+            logger.debug(
+                "Skipped %d files without FPR rules (%s, package %s)",
+                self.skipped_files,
+                self.description,
+                self.package.uuid,
+            )
+            metrics.tasks_skipped(self, self.skipped_files)
+            models.Job.objects.filter(jobuuid=self.uuid).update(
+                skippedtasks=self.skipped_files
+            )
+
+    def _get_resumed_exit_codes(self):
+        """Return the exit codes of the tasks the resumed job was done with,
+        keyed by file UUID.
+        """
+        if self.resumed_job_id is None:
+            return {}
+        return dict(
+            models.Task.objects.filter(
+                job_id=self.resumed_job_id,
+                endtime__isnull=False,
+                exitcode__isnull=False,
+            ).values_list("fileuuid", "exitcode")
+        )
+
+    def _files_with_rules(self, files):
+        """Leave out the files that no FPR rule of the link applies to.
+
+        The client script does nothing with them but exit successfully.
+        Rules of ``default_*`` purposes apply to every file, and so do the
+        rules of other purposes unless ``match_format`` is set. Otherwise a
+        file needs to be identified as a format version with rules.
+        """
+        config = self.skip_files_without_rules
+        match_format = config.get("match_format", False)
+        format_versions = set()
+        for purpose in config["purposes"]:
+            purpose_format_versions = rule_index.get_format_versions(purpose)
+            if purpose_format_versions and (
+                purpose.startswith("default_") or not match_format
+            ):
+                yield from files
+                return
+            format_versions.update(purpose_format_versions)
+
+        files = iter(files)
+        while True:
+            chunk = list(itertools.islice(files, self.FORMAT_LOOKUP_CHUNK_SIZE))
+            if not chunk:
+                break
+            file_format_versions = {}
+            if format_versions:
+                file_format_versions = rule_index.get_file_format_versions(
+                    [file_replacements[r"%fileUUID%"] for file_replacements in chunk]
+                )
+            for file_replacements in chunk:
+                file_uuid = file_replacements[r"%fileUUID%"]
+                if file_format_versions.get(file_uuid) in format_versions:
+                    yield file_replacements
+                else:
+                    self.skipped_files += 1
+
     def task_completed_callback(self, task):
         pass
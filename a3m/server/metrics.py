@@ -31,6 +31,12 @@ task_error_counter = Counter(
     "Number of failures processing tasks, labeled by task group, task name",
     ["task_group_name", "task_name"],
 )
+skipped_task_counter = Counter(
+    "mcpserver_skipped_task_total",
+    "Number of tasks not run because no FPR rule applies to their file, labeled by "
+    "task group, task name",
+    ["task_group_name", "task_name"],
+)
 task_success_timestamp = Gauge(
     "mcpserver_task_success_timestamp",
     "Most recent successfully processed task, labeled by task group, task name",
@@ -47,6 +53,11 @@ task_duration_histogram = Histogram(
     ["script_name"],
     buckets=TASK_DURATION_BUCKETS,
 )
+task_batch_size_gauge = Gauge(
+    "mcpserver_task_batch_size",
+    "Number of tasks sent to workers per batch, labeled by task group, task name",
+    ["task_group_name", "task_name"],
+)
 
 archivematica_info = Info("archivematica_version", "Archivematica version info")
 environment_info = Info("environment_variables", "Environment Variables")
@@ -63,6 +74,13 @@ job_queue_length_gauge = Gauge(
 package_queue_length_gauge = Gauge(
     "mcpserver_package_queue_length", "Number of queued packages"
 )
+package_queue_wait_histogram = Histogram(
+    "mcpserver_package_queue_wait_seconds",
+    "Histogram of the time packages waited to be processed in seconds, labeled by "
+    "priority class",
+    ["priority"],
+    buckets=(1, 5, 15, 30, 60, 300, 900, 1800, 3600, 7200, 14400, 43200, 86400),
+)
 
 
 def skip_if_prometheus_disabled(func):
@@ -87,9 +105,11 @@ def init_labels(workflow):
 
         task_counter.labels(task_group_name=group_name, task_name=task_name)
         task_error_counter.labels(task_group_name=group_name, task_name=task_name)
+        skipped_task_counter.labels(task_group_name=group_name, task_name=task_name)
         task_success_timestamp.labels(task_group_name=group_name, task_name=task_name)
         task_error_timestamp.labels(task_group_name=group_name, task_name=task_name)
         task_duration_histogram.labels(script_name=script_name)
+        task_batch_size_gauge.labels(task_group_name=group_name, task_name=task_name)
 
 
 @skip_if_prometheus_disabled
@@ -125,3 +145,22 @@ def task_failed(task, job):
         task_group_name=job.group, task_name=job.description
     ).inc()
     task_counter.labels(task_group_name=job.group, task_name=job.description).inc()
+
+
+@skip_if_prometheus_disabled
+def tasks_skipped(job, count):
+    skipped_task_counter.labels(
+        task_group_name=job.group, task_name=job.description
+    ).inc(count)
+
+
+@skip_if_prometheus_disabled
+def task_batch_size_changed(job, batch_size):
+    task_batch_size_gauge.labels(
+        task_group_name=job.group, task_name=job.description
+    ).set(batch_size)
+
+
+@skip_if_prometheus_disabled
+def package_dequeued(priority, wait_time):
+    package_queue_wait_histogram.labels(priority=priority).observe(wait_time)
@@ -4,14 +4,20 @@ import collections
 import functools
 import logging
 import os
+import queue
+import threading
 from dataclasses import dataclass
 from dataclasses import field
 from enum import auto
 from enum import Enum
 from typing import Optional
+from urllib.parse import unquote
+from urllib.parse import urlparse
 from uuid import uuid4
 
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from google.protobuf import timestamp_pb2
 
 from a3m.api.transferservice import v1beta1 as transfer_service_api
@@ -37,7 +43,11 @@ BASE_REPLACEMENTS = {
 
 
 def get_file_replacement_mapping(file_obj, unit_directory):
-    mapping = BASE_REPLACEMENTS.copy()
+    """Return the replacement values of a file.
+
+    Only the values specific to the file are included, the ones of the
+    package, see `Package.get_replacement_mapping`, apply to it too.
+    """
     dirname = os.path.dirname(file_obj.currentlocation)
     name, ext = os.path.splitext(file_obj.currentlocation)
     name = os.path.basename(name)
@@ -45,24 +55,20 @@ def get_file_replacement_mapping(file_obj, unit_directory):
     absolute_path = file_obj.currentlocation.replace(r"%SIPDirectory%", unit_directory)
     absolute_path = absolute_path.replace(r"%transferDirectory%", unit_directory)
 
-    mapping.update(
-        {
-            r"%fileUUID%": file_obj.pk,
-            r"%originalLocation%": file_obj.originallocation,
-            r"%currentLocation%": file_obj.currentlocation,
-            r"%fileGrpUse%": file_obj.filegrpuse,
-            r"%fileDirectory%": dirname,
-            r"%fileName%": name,
-            r"%fileExtension%": ext[1:],
-            r"%fileExtensionWithDot%": ext,
-            r"%relativeLocation%": absolute_path,
-            # TODO: standardize duplicates
-            r"%inputFile%": absolute_path,
-            r"%fileFullName%": absolute_path,
-        }
-    )
-
-    return mapping
+    return {
+        r"%fileUUID%": file_obj.pk,
+        r"%originalLocation%": file_obj.originallocation,
+        r"%currentLocation%": file_obj.currentlocation,
+        r"%fileGrpUse%": file_obj.filegrpuse,
+        r"%fileDirectory%": dirname,
+        r"%fileName%": name,
+        r"%fileExtension%": ext[1:],
+        r"%fileExtensionWithDot%": ext,
+        r"%relativeLocation%": absolute_path,
+        # TODO: standardize duplicates
+        r"%inputFile%": absolute_path,
+        r"%fileFullName%": absolute_path,
+    }
 
 
 class Stage(Enum):
@@ -78,17 +84,35 @@ class Package:
     It wraps a SIP and borrows its SIP. But it also knows about its transfer
     stage. Some methods return different values depending the stage the
     package is in.
+
+    The state of the package (paths, AIP filename and context) is kept in
+    memory. Client scripts report the changes they make, see `apply_updates`,
+    so the database is only read when packages are resumed, see
+    `resume_packages`.
+
+    Packages being processed keep a checkpoint of their position in the
+    workflow, see `save_checkpoint`. Processing is resumed from there when
+    the server is restarted, see `resume_packages`.
     """
 
-    def __init__(self, name, url, config, transfer, sip):
+    def __init__(self, name, url, config, transfer, sip, priority=None):
         self.name = name
         self.url = url
         self.config = config
         self.transfer = transfer
         self.sip = sip
+        self.priority = priority
+        # Size of the transfer source if known, see `estimate_size`.
+        self.file_count = None
+        self.byte_size = None
         self.stage = Stage.TRANSFER
         self.aip_filename = None
         self._current_path = self.transfer.currentlocation
+        self._contexts = {}  # subid: PackageContext
+        self._replacement_mapping = None
+        # Link and job interrupted by a restart, see `resume_packages`.
+        self.resumed_link_id = None
+        self.resumed_job_id = None
 
     def __repr__(self):
         return "{class_name}({uuid})".format(
@@ -97,51 +121,232 @@ class Package:
 
     @classmethod
     @auto_close_old_connections()
-    def create_package(cls, package_queue, executor, workflow, name, url, config):
-        """Launch transfer and return its object immediately."""
-        if not name:
-            raise ValueError("No transfer name provided.")
-        if not url:
-            raise ValueError("No url provided.")
-
-        transfer_id = str(uuid4())
-        transfer_dir = os.path.join(
-            _get_setting("PROCESSING_DIRECTORY"), "transfer", transfer_id, ""
+    def cleanup_old_db_entries(cls):
+        """Update the status of any packages in progress that can't be
+        resumed, i.e. without a checkpoint.
+
+        This command is run on startup.
+        """
+        models.SIP.objects.filter(
+            status=models.SIP.STATUS_PROCESSING, packagecheckpoint__isnull=True
+        ).update(status=models.SIP.STATUS_FAILED)
+
+    @classmethod
+    @auto_close_old_connections()
+    def resume_packages(cls, package_queue, executor, workflow):
+        """Resume the processing of the packages interrupted by a restart.
+
+        Packages start again at the link of the job they were running, see
+        `save_checkpoint`. Tasks of that job that were done aren't run again,
+        see `FilesClientScriptJob`. This command is run on startup, after
+        `cleanup_old_db_entries`.
+        """
+        checkpoints = models.PackageCheckpoint.objects.filter(
+            sip__status=models.SIP.STATUS_PROCESSING
+        ).select_related("sip", "transfer")
+        packages = []
+        for checkpoint in checkpoints:
+            config = transfer_service_api.request_response_pb2.ProcessingConfig()
+            config.ParseFromString(bytes(checkpoint.config))
+            package = cls(
+                checkpoint.name,
+                checkpoint.url,
+                config,
+                checkpoint.transfer,
+                checkpoint.sip,
+                checkpoint.priority,
+            )
+            package.stage = Stage[checkpoint.stage]
+            package._update_current_state()
+            if checkpoint.microservicechainlink is not None:
+                package.resumed_link_id = str(checkpoint.microservicechainlink)
+                package.resumed_job_id = checkpoint.jobuuid
+            packages.append(package)
+        if not packages:
+            return packages
+        logger.info("Resuming processing of %s packages", len(packages))
+
+        future = executor.submit(
+            Package.trigger_workflows, packages, package_queue, workflow
         )
-        transfer = models.Transfer.objects.create(
-            uuid=transfer_id, currentlocation=transfer_dir
+        future.add_done_callback(
+            functools.partial(
+                Package.trigger_workflow_done_callback,
+                ", ".join(str(package.uuid) for package in packages),
+            )
         )
-        logger.debug("Transfer object created: %s", transfer.pk)
 
-        sip_id = str(uuid4())
-        sip_dir = os.path.join(
-            _get_setting("PROCESSING_DIRECTORY"), "ingest", sip_id, ""
-        )
-        sip = models.SIP.objects.create(uuid=sip_id, currentpath=sip_dir)
-        sip.transfer_id = transfer_id
-        logger.debug("SIP object created: %s", sip.pk)
+        return packages
 
-        package = cls(name, url, config, transfer, sip)
+    @classmethod
+    def create_package(
+        cls, package_queue, executor, workflow, name, url, config, priority=None
+    ):
+        """Launch transfer and return its object immediately."""
+        return cls.create_packages(
+            package_queue, executor, workflow, [(name, url, config, priority)]
+        )[0]
+
+    @classmethod
+    @auto_close_old_connections()
+    def create_packages(cls, package_queue, executor, workflow, submissions):
+        """Launch many transfers and return their objects immediately.
+
+        ``submissions`` is a list of ``(name, url, config, priority)`` tuples,
+        see `a3m.server.scheduling` for the priorities. Nothing is
+        created unless all of them are valid. Their rows are inserted in one
+        transaction and their workflows are started together.
 
-        params = (package, package_queue, workflow)
-        future = executor.submit(Package.trigger_workflow, *params)
+        :raises queue.Full: if the packages don't fit in ``package_queue``.
+        """
+        for name, url, *_ in submissions:
+            if not name:
+                raise ValueError("No transfer name provided.")
+            if not url:
+                raise ValueError("No url provided.")
+
+        package_queue.reserve(len(submissions))
+        try:
+            packages = cls._create_packages(submissions)
+        except Exception:
+            package_queue.release(len(submissions))
+            raise
+
+        params = (packages, package_queue, workflow)
+        future = executor.submit(Package.trigger_workflows, *params, reserved=True)
         future.add_done_callback(
-            functools.partial(Package.trigger_workflow_done_callback, package.uuid)
+            functools.partial(
+                Package.trigger_workflow_done_callback,
+                ", ".join(str(package.uuid) for package in packages),
+            )
         )
 
-        return package
+        return packages
 
-    @staticmethod
-    def trigger_workflow(package, package_queue, workflow):
-        logger.debug("Package %s: starting workflow processing", package.uuid)
+    @classmethod
+    def _create_packages(cls, submissions):
+        """Create the packages of ``submissions`` and their database rows."""
+
+        processing_dir = _get_setting("PROCESSING_DIRECTORY")
+        packages = []
+        for name, url, config, priority in submissions:
+            transfer_id = str(uuid4())
+            transfer = models.Transfer(
+                uuid=transfer_id,
+                currentlocation=os.path.join(
+                    processing_dir, "transfer", transfer_id, ""
+                ),
+            )
+            sip_id = str(uuid4())
+            sip = models.SIP(
+                uuid=sip_id,
+                currentpath=os.path.join(processing_dir, "ingest", sip_id, ""),
+                status=models.SIP.STATUS_PROCESSING,
+            )
+            package = cls(name, url, config, transfer, sip, priority)
+            # Nothing to read back from the database for the new units.
+            package._contexts = {
+                transfer_id: PackageContext(),
+                sip_id: PackageContext(),
+            }
+            packages.append(package)
 
-        initiator_link = workflow.get_initiator()
-        if initiator_link is None:
-            raise ValueError("Workflow initiator not found")
+        with transaction.atomic():
+            models.Transfer.objects.bulk_create(
+                [package.transfer for package in packages]
+            )
+            models.SIP.objects.bulk_create([package.sip for package in packages])
+            models.PackageCheckpoint.objects.bulk_create(
+                [
+                    models.PackageCheckpoint(
+                        sip=package.sip,
+                        transfer=package.transfer,
+                        name=package.name,
+                        url=package.url,
+                        config=package.config.SerializeToString(),
+                        priority=package.priority,
+                        stage=package.stage.name,
+                    )
+                    for package in packages
+                ]
+            )
+            # Same as setting `SIP.transfer_id`, the SIPs are new.
+            models.UnitVariable.objects.bulk_create(
+                [
+                    models.UnitVariable(
+                        unittype="SIP",
+                        unituuid=package.sip.pk,
+                        variable="transferID",
+                        variablevalue=package.transfer.pk,
+                        microservicechainlink=None,
+                    )
+                    for package in packages
+                ]
+            )
+        logger.debug("Transfer and SIP objects created: %s", len(packages))
 
-        job_chain = JobChain(package, workflow, initiator_link)
+        return packages
 
-        package_queue.schedule_job(next(job_chain))
+    @staticmethod
+    def trigger_workflows(packages, package_queue, workflow, reserved=False):
+        """Schedule the first job of each package.
+
+        ``reserved`` says whether room was reserved for the packages in
+        ``package_queue``, see `PackageQueue.reserve`. It's released as they
+        are scheduled. Packages that don't fit in the queue are failed.
+        """
+        unscheduled = len(packages) if reserved else 0
+        try:
+            initiator_link = workflow.get_initiator()
+            if initiator_link is None:
+                raise ValueError("Workflow initiator not found")
+
+            for package in packages:
+                try:
+                    Package._trigger_workflow(
+                        package, package_queue, workflow, initiator_link
+                    )
+                finally:
+                    if reserved:
+                        package_queue.release()
+                        unscheduled -= 1
+        finally:
+            if unscheduled:
+                package_queue.release(unscheduled)
+
+    @staticmethod
+    def _trigger_workflow(package, package_queue, workflow, initiator_link):
+        logger.debug("Package %s: starting workflow processing", package.uuid)
+        plan = workflow.get_plan(package.config)
+        starting_link = initiator_link
+        if package.resumed_link_id is not None:
+            try:
+                starting_link = workflow.get_link(package.resumed_link_id)
+            except KeyError:
+                logger.warning(
+                    "Package %s: link %s not found in the workflow, "
+                    "processing can't be resumed",
+                    package.uuid,
+                    package.resumed_link_id,
+                )
+                package.save_status(models.SIP.STATUS_FAILED)
+                return
+        job_chain = JobChain(
+            package,
+            workflow,
+            starting_link,
+            plan=plan,
+            resumed_job_id=package.resumed_job_id,
+        )
+        try:
+            package_queue.schedule_job(next(job_chain))
+        except queue.Full:
+            logger.warning(
+                "Package %s: the queue is full, processing can't start",
+                package.uuid,
+            )
+            package.save_status(models.SIP.STATUS_FAILED)
+            package_queue.notify(package.uuid, None)
 
     @staticmethod
     def trigger_workflow_done_callback(package_id, future):
@@ -152,6 +357,36 @@ class Package:
         else:
             logger.info("Package processing started (%s)", package_id)
 
+    def estimate_size(self, max_files=100000):
+        """Count the files and bytes of the transfer source, if it's local.
+
+        Only used to order the packages waiting in the queue, so the count
+        stops after ``max_files`` files. The size of remote sources is left
+        unknown.
+        """
+        parsed = urlparse(self.url)
+        if parsed.scheme != "file":
+            return
+        path = unquote(parsed.path)
+        file_count = byte_size = 0
+        directories = [path]
+        try:
+            if os.path.isfile(path):
+                file_count, byte_size = 1, os.path.getsize(path)
+                directories = []
+            while directories and file_count < max_files:
+                with os.scandir(directories.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            directories.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            file_count += 1
+                            byte_size += entry.stat(follow_symlinks=False).st_size
+        except OSError as err:
+            logger.debug("Package %s: size unknown (%s)", self.uuid, err)
+            return
+        self.file_count, self.byte_size = file_count, byte_size
+
     @property
     def uuid(self):
         return self.sip.pk
@@ -173,6 +408,7 @@ class Package:
         self._current_path = value.replace(
             r"%sharedPath%", _get_setting("SHARED_DIRECTORY")
         )
+        self._replacement_mapping = None
 
     @property
     def current_path_for_db(self):
@@ -183,11 +419,32 @@ class Package:
 
     @property
     def context(self):
-        """Returns a `PackageContext` for this package."""
-        # This needs to be reloaded from the db every time, because new values
-        # could have been added by a client script.
-        # TODO: pass context changes back from client
-        return PackageContext.load_from_db(self.subid)
+        """Returns a `PackageContext` for this package.
+
+        It's read from the database once per unit, then kept up to date with
+        the values reported by client scripts, see `update_context`.
+        """
+        subid = self.subid
+        try:
+            return self._contexts[subid]
+        except KeyError:
+            context = self._contexts[subid] = PackageContext.load_from_db(subid)
+            return context
+
+    @auto_close_old_connections()
+    def update_context(self, mapping):
+        """Add replacement values to the context of the package.
+
+        The values are saved too, so they're found again after a restart.
+        """
+        self.context.update(mapping)
+        models.UnitVariable.objects.create(
+            unittype=self.unit_variable_type,
+            unituuid=self.subid,
+            variable="replacementDict",
+            variablevalue=repr(dict(mapping)),
+            microservicechainlink=None,
+        )
 
     @property
     def unit_type(self):
@@ -221,18 +478,71 @@ class Package:
     def start_ingest(self):
         """Signal this package so it becomes a SIP."""
         self.stage = Stage.INGEST
+        self._update_current_state()
 
-    @auto_close_old_connections()
-    def reload(self):
+    def apply_updates(self, updates):
+        """Apply the changes a client script made to the package.
+
+        ``updates`` is reported with the result of the task, see
+        ``Job.update_package`` in the client. Paths and the AIP filename are
+        already saved by the client script.
+        """
+        if "transfer_path" in updates:
+            self.transfer.currentlocation = updates["transfer_path"]
+        if "sip_path" in updates:
+            self.sip.currentpath = updates["sip_path"]
+        if "aip_filename" in updates:
+            self.sip.aip_filename = updates["aip_filename"]
+        if updates.get("context"):
+            self.update_context(updates["context"])
+        self._update_current_state()
+
+    def _update_current_state(self):
         if self.stage is Stage.INGEST:
-            sip = models.SIP.objects.get(uuid=self.sip.pk)
-            self.current_path = sip.currentpath
-            self.aip_filename = sip.aip_filename or ""
+            self.current_path = self.sip.currentpath
+            self.aip_filename = self.sip.aip_filename or ""
         else:
-            transfer = models.Transfer.objects.get(uuid=self.transfer.pk)
-            self.current_path = transfer.currentlocation
+            self.current_path = self.transfer.currentlocation
+
+    @auto_close_old_connections()
+    def save_checkpoint(self, job):
+        """Record that the package is running ``job``, see `resume_packages`."""
+        models.PackageCheckpoint.objects.filter(sip_id=self.uuid).update(
+            stage=self.stage.name,
+            microservicechainlink=job.link.id,
+            jobuuid=job.uuid,
+            updatedtime=timezone.now(),
+        )
+
+    @auto_close_old_connections()
+    def save_status(self, status):
+        """Persist the processing status of the package.
+
+        The checkpoint of the package is dropped, its processing is over.
+        """
+        with transaction.atomic():
+            models.SIP.objects.filter(pk=self.uuid).update(status=status)
+            models.PackageCheckpoint.objects.filter(sip_id=self.uuid).delete()
+
+    @functools.cached_property
+    def config_replacements(self):
+        """Replacement values of the processing configuration."""
+        return {
+            rf"%config:{config_attr.name}%": str(getattr(self.config, config_attr.name))
+            for config_attr in transfer_service_api.request_response_pb2.ProcessingConfig.DESCRIPTOR.fields
+        }
 
     def get_replacement_mapping(self):
+        """Return the replacement values of the package.
+
+        The mapping is built again only when the state of the package changes.
+        It's shared, callers must not modify it.
+        """
+        if self._replacement_mapping is None:
+            self._replacement_mapping = self._get_replacement_mapping()
+        return self._replacement_mapping
+
+    def _get_replacement_mapping(self):
         mapping = BASE_REPLACEMENTS.copy()
         mapping.update(
             {
@@ -251,14 +561,7 @@ class Package:
             }
         )
 
-        mapping.update(
-            {
-                rf"%config:{config_attr.name}%": str(
-                    getattr(self.config, config_attr.name)
-                )
-                for config_attr in transfer_service_api.request_response_pb2.ProcessingConfig.DESCRIPTOR.fields
-            }
-        )
+        mapping.update(self.config_replacements)
 
         if self.stage is Stage.INGEST:
             mapping.update(
@@ -393,35 +696,106 @@ class PackageStatus:
     jobs: list = field(default_factory=list)
 
 
+def get_final_status(job):
+    """Return the status of a package whose processing ended with ``job``."""
+    group = job.group.lower()
+    if "failed" in group:
+        return models.SIP.STATUS_FAILED
+    elif "reject" in group:
+        return models.SIP.STATUS_REJECTED
+    elif job.description == "a3m - Store AIP":
+        return models.SIP.STATUS_COMPLETE
+    logger.warning(
+        "Package status cannot be determined (job.type=%s, job.microservicegroup=%s)",
+        job.description,
+        job.group,
+    )
+    return models.SIP.STATUS_UNKNOWN
+
+
+class PackageStatusIndex:
+    """Status of the packages handled by this process, by package UUID.
+
+    Queued and processing packages are always indexed, while only the last
+    ``maxsize`` packages done are, older ones are looked up in the database.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.processing = {}
+        self.done = collections.OrderedDict()
+
+    def get(self, package_id):
+        """Return the `PackageStatus` of a package, or ``None``."""
+        package_id = str(package_id)
+        with self.lock:
+            entry = self.processing.get(package_id) or self.done.get(package_id)
+        if entry is None:
+            return None
+        return PackageStatus(*entry)
+
+    def set_processing(self, package_id, job=None):
+        with self.lock:
+            self.processing[str(package_id)] = (models.SIP.STATUS_PROCESSING, job)
+
+    def set_done(self, package_id, status, job=None):
+        package_id = str(package_id)
+        with self.lock:
+            self.processing.pop(package_id, None)
+            self.done[package_id] = (status, job)
+            self.done.move_to_end(package_id)
+            if len(self.done) > self.maxsize:
+                self.done.popitem(last=False)
+
+
 @auto_close_old_connections()
-def get_package_status(package_queue, package_id: str) -> PackageStatus:
-    try:
-        sip = models.SIP.objects.get(pk=package_id)
-    except models.SIP.DoesNotExist:
-        raise PackageNotFoundError
-
-    def get_latest_job(unit_id):
-        return (
-            models.Job.objects.filter(sipuuid=unit_id)
-            .order_by("-createdtime", "-createdtimedec")
-            .first()
+def get_package_jobs(package_id: str):
+    """Return the jobs of a package, in both Transfer and Ingest."""
+    sip = models.SIP.objects.get(pk=package_id)
+    jobs = []
+    for item in (
+        models.Job.objects.filter(sipuuid__in=(sip.pk, sip.transfer_id))
+        .order_by("createdtime")
+        .values(
+            "jobuuid",
+            "jobtype",
+            "currentstep",
+            "microservicegroup",
+            "microservicechainlink",
+            "currentstep",
+            "createdtime",
+            "skippedtasks",
         )
+    ):
+        start_time = timestamp_pb2.Timestamp()
+        start_time.FromDatetime(item["createdtime"])
 
-    package = package_queue.active_packages.get(package_id)
-    if package:
-        # Reminder: package.subid can be in Transfer or Ingest.
-        job = get_latest_job(package.subid)
-        return PackageStatus(
-            status=transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING,
-            job=job.jobtype if job else None,
+        jobs.append(
+            transfer_service_api.request_response_pb2.Job(
+                id=str(item["jobuuid"]),
+                name=item["jobtype"],
+                group=item["microservicegroup"],
+                link_id=str(item["microservicechainlink"]),
+                status=item["currentstep"],
+                start_time=start_time,
+                skipped_tasks=item["skippedtasks"],
+            )
         )
+    return jobs
 
-    # A3M-TODO: persist package-workflow status!
-    # It'd be much easier if a workflow instance could keep the package
-    # model(s) up to date.
 
-    # We have an inactive package, look up the status in the database.
-    job = get_latest_job(package_id)
+def _get_latest_job(unit_id):
+    return (
+        models.Job.objects.filter(sipuuid=unit_id)
+        .order_by("-createdtime", "-createdtimedec")
+        .first()
+    )
+
+
+def _infer_package_status(sip) -> PackageStatus:
+    """Work out the status of a package processed before it was persisted."""
+    job = _get_latest_job(sip.pk)
 
     # It must be an error during Transfer when Ingest activity not recorded.
     if not job:
@@ -430,7 +804,7 @@ def get_package_status(package_queue, package_id: str) -> PackageStatus:
             raise Exception(
                 "Package status cannot be determined: transfer_id is undefined"
             )
-        job = get_latest_job(sip.transfer_id)
+        job = _get_latest_job(sip.transfer_id)
         if job is None:
             return PackageStatus(
                 status=transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING
@@ -447,33 +821,35 @@ def get_package_status(package_queue, package_id: str) -> PackageStatus:
             f"Package status cannot be determined (job.currentstep={job.currentstep}, job.type={job.jobtype}, job.microservicegroup={job.microservicegroup})"
         )
 
-    package_status = PackageStatus(status=status, job=job.microservicegroup)
+    return PackageStatus(status=status, job=job.microservicegroup)
 
-    for item in (
-        models.Job.objects.filter(sipuuid__in=(sip.pk, sip.transfer_id))
-        .order_by("createdtime")
-        .values(
-            "jobuuid",
-            "jobtype",
-            "currentstep",
-            "microservicegroup",
-            "microservicechainlink",
-            "currentstep",
-            "createdtime",
-        )
-    ):
-        start_time = timestamp_pb2.Timestamp()
-        start_time.FromDatetime(item["createdtime"])
 
-        package_status.jobs.append(
-            transfer_service_api.request_response_pb2.Job(
-                id=str(item["jobuuid"]),
-                name=item["jobtype"],
-                group=item["microservicegroup"],
-                link_id=str(item["microservicechainlink"]),
-                status=item["currentstep"],
-                start_time=start_time,
+@auto_close_old_connections()
+def get_package_status(
+    package_queue, package_id: str, include_jobs: bool = False
+) -> PackageStatus:
+    """Return the status of a package.
+
+    The status of the packages handled by this process is kept in memory by
+    ``package_queue``, the database is only queried for older packages and
+    for the list of jobs when ``include_jobs`` is set.
+    """
+    package_status = package_queue.statuses.get(package_id)
+
+    if package_status is None:
+        try:
+            sip = models.SIP.objects.get(pk=package_id)
+        except models.SIP.DoesNotExist:
+            raise PackageNotFoundError
+        if sip.status == models.SIP.STATUS_UNKNOWN:
+            package_status = _infer_package_status(sip)
+        else:
+            job = _get_latest_job(sip.pk) or _get_latest_job(sip.transfer_id)
+            package_status = PackageStatus(
+                status=sip.status, job=job.microservicegroup if job else None
             )
-        )
+
+    if include_jobs:
+        package_status.jobs = get_package_jobs(package_id)
 
     return package_status
@@ -1,6 +1,8 @@
 """
 The PackageQueue class handles job queueing, as it relates to packages.
 """
+import asyncio
+import concurrent.futures
 import functools
 import logging
 import queue
@@ -10,6 +12,10 @@ import uuid
 from django.conf import settings
 
 from a3m.server import metrics
+from a3m.server.packages import get_final_status
+from a3m.server.packages import PackageStatusIndex
+from a3m.server.scheduling import get_policy
+from a3m.server.scheduling import PackageScheduler
 
 
 logger = logging.getLogger(__name__)
@@ -30,7 +36,8 @@ class PackageQueue:
     This process happens when a `Job` is scheduled via `PackageQueue.schedule_job`.
 
     1. If there are too many active packages, the `Job` is placed on a deferred
-       package queue and held until a package stops processing (packages stop
+       package queue, ordered by a scheduling policy (see the `scheduling`
+       module), and held until a package stops processing (packages stop
        processing when they reach a decision point in the workflow that hasn't
        been pre configured, or when they hit specific workflow links denoting
        SIP/Transfer completion or failure). If there is room to process the
@@ -49,6 +56,10 @@ class PackageQueue:
     5. Back in the main thread, a callback attached to the result of `Job.run`
        triggers adding the next job to the active job queue. This cycle
        continues until the workflow chain ends.
+
+    Watchers of a package, see `watch`, are notified as its jobs start and
+    finish, and when the package stops processing. The status of the packages
+    is kept in `statuses` as well.
     """
 
     # An arbitrary, large value, so we don't accept infinite packages.
@@ -61,6 +72,7 @@ class PackageQueue:
         max_concurrent_packages=settings.CONCURRENT_PACKAGES,
         max_queued_packages=MAX_QUEUED_PACKAGES,
         debug=False,
+        scheduling_policy=None,
     ):
         self.executor = executor
         self.max_concurrent_packages = max_concurrent_packages
@@ -74,7 +86,16 @@ class PackageQueue:
         self.active_packages = {}  # package uuid: Package
 
         self.job_queue = queue.Queue(maxsize=max_concurrent_packages)
-        self.queue = queue.Queue(maxsize=max_queued_packages)
+        if scheduling_policy is None:
+            scheduling_policy = get_policy(settings.SCHEDULING_POLICY)
+        self.queue = PackageScheduler(scheduling_policy, maxsize=max_queued_packages)
+        self.reserved_lock = threading.Lock()
+        self.reserved = 0  # Packages about to be scheduled, see `reserve`.
+
+        self.watchers_lock = threading.Lock()
+        self.watchers = {}  # package uuid: [queue.Queue]
+
+        self.statuses = PackageStatusIndex()
 
         if self.debug:
             logger.debug(
@@ -99,11 +120,16 @@ class PackageQueue:
                 # If there's no slot available, block until ready
                 self.job_queue.put(job, block=True)
                 metrics.job_queue_length_gauge.inc()
+                self._job_queued()
                 return
 
             # Otherwise, we need to queue the package
             active_package_count = len(self.active_packages)
 
+        # The size of a package only matters if it has to wait for others,
+        # it can take a while to estimate.
+        if active_package_count >= self.max_concurrent_packages or self.queue.qsize():
+            package.estimate_size()
         self._put_package_nowait(package, job)
 
         if self.debug:
@@ -135,6 +161,25 @@ class PackageQueue:
                 active_package_count,
             )
 
+    def reserve(self, count):
+        """Make sure that ``count`` new packages fit in the queue.
+
+        Room is kept for them until `release` is called for each, once it has
+        been scheduled.
+
+        :raises queue.Full: if they don't fit.
+        """
+        with self.reserved_lock:
+            maxsize = self.queue.maxsize
+            if 0 < maxsize < self.queue.qsize() + self.reserved + count:
+                raise queue.Full
+            self.reserved += count
+
+    def release(self, count=1):
+        """Give back the room reserved for packages, see `reserve`."""
+        with self.reserved_lock:
+            self.reserved -= count
+
     def work(self):
         """Process the package queue.
 
@@ -165,25 +210,34 @@ class PackageQueue:
         except queue.Empty:
             return
 
+        self._start_job(job)
+        result = self.executor.submit(job.run)
+        self._add_job_callbacks(job, result)
+
+        return result
+
+    def _start_job(self, job):
         metrics.job_queue_length_gauge.dec()
         metrics.active_jobs_gauge.inc()
 
-        result = self.executor.submit(job.run)
+        self.statuses.set_processing(job.package.uuid, job.description)
+        self.notify(job.package.uuid, (job, job.STATUS_EXECUTING_COMMANDS))
+
+    def _add_job_callbacks(self, job, result):
+        result.add_done_callback(functools.partial(self._notify_job_done, job))
         result.add_done_callback(self._job_completed_callback)
 
         if job.link.is_terminal:
             package_done_callback = functools.partial(
-                self._package_completed_callback, job.package, job.link.id
+                self._package_completed_callback, job
             )
             result.add_done_callback(package_done_callback)
 
-        return result
-
     def stop(self):
         """Trigger queue shutdown."""
         self.shutdown_event.set()
 
-    def _package_completed_callback(self, package, link_id, future):
+    def _package_completed_callback(self, job, future):
         """Marks the package as inactive and schedules a new package.
 
         It is assumed that a package is only complete when a terminal link is
@@ -195,11 +249,11 @@ class PackageQueue:
             logger.warning(
                 "Unexpectedly received another job on package completion. "
                 "Please verify the value of `end` in the workflow. Link %s.",
-                link_id,
+                job.link.id,
             )
             return
 
-        self.deactivate_package(package)
+        self.deactivate_package(job.package, get_final_status(job), job.group)
         self.queue_next_job()
 
     def _job_completed_callback(self, future):
@@ -216,14 +270,56 @@ class PackageQueue:
             return
         self.schedule_job(next_job)
 
+    def _notify_job_done(self, job, future):
+        if future.exception() is not None:
+            status = job.STATUS_FAILED
+        elif job.status in (job.STATUS_UNKNOWN, job.STATUS_EXECUTING_COMMANDS):
+            # The job didn't save a final status of its own.
+            status = job.STATUS_COMPLETED_SUCCESSFULLY
+        else:
+            status = job.status
+        self.notify(job.package.uuid, (job, status))
+
+    def watch(self, package_uuid):
+        """Return a queue receiving the updates of a package.
+
+        Updates are ``(job, status)`` tuples, sent when a job of the package
+        starts or finishes. ``None`` is sent when the package stops processing.
+        Call `unwatch` with the queue once done.
+        """
+        updates = queue.Queue()
+        with self.watchers_lock:
+            self.watchers.setdefault(str(package_uuid), []).append(updates)
+        return updates
+
+    def unwatch(self, package_uuid, updates):
+        """Stop sending updates to a queue returned by `watch`."""
+        with self.watchers_lock:
+            watchers = self.watchers.get(str(package_uuid), [])
+            if updates in watchers:
+                watchers.remove(updates)
+            if not watchers:
+                self.watchers.pop(str(package_uuid), None)
+
+    def notify(self, package_uuid, update):
+        """Send an update to the watchers of a package."""
+        with self.watchers_lock:
+            watchers = list(self.watchers.get(str(package_uuid), ()))
+        for updates in watchers:
+            updates.put(update)
+
+    def _job_queued(self):
+        """Hook called when a job is added to the active job queue."""
+
     def _put_package_nowait(self, package, job):
         """Queue a package and job for later processing."""
         self.queue.put_nowait(job)
         metrics.package_queue_length_gauge.inc()
+        self.statuses.set_processing(package.uuid)
 
     def _get_package_job_nowait(self):
         """Return a waiting job for an inactive package.
-        Prioritized by package type.
+        Prioritized by the scheduling policy.
         """
         try:
             job = self.queue.get_nowait()
@@ -248,8 +344,15 @@ class PackageQueue:
                     "Package %s was activated, but was already active", package.uuid
                 )
 
-    def deactivate_package(self, package):
-        """Mark a package as inactive."""
+    def deactivate_package(self, package, status=None, job=None):
+        """Mark a package as inactive.
+
+        ``status`` is the final status of the package, if known, and ``job``
+        the name of its last job.
+        """
+        if status is not None:
+            package.save_status(status)
+            self.statuses.set_done(package.uuid, status, job)
         with self.active_package_lock:
             if package.uuid in self.active_packages:
                 del self.active_packages[package.uuid]
@@ -261,6 +364,7 @@ class PackageQueue:
                     "Package %s was deactivated, but was not marked active",
                     package.uuid,
                 )
+        self.notify(package.uuid, None)
 
     def is_package_active(self, package_uuid):
         """Determine whether a package is still active."""
@@ -286,6 +390,7 @@ class PackageQueue:
         self.activate_package(package)
         self.job_queue.put_nowait(job)
         metrics.job_queue_length_gauge.inc()
+        self._job_queued()
 
         if self.debug:
             logger.debug(
@@ -295,3 +400,92 @@ class PackageQueue:
                 package.uuid,
                 self.queue.qsize(),
             )
+
+
+class AsyncPackageQueue(PackageQueue):
+    """Package queue processed by an event loop.
+
+    Jobs run as coroutines, see `Job.run_async`, so a job waiting for its
+    tasks doesn't hold a thread of the executor. The number of packages that
+    can be processed concurrently is then bound by the resources their tasks
+    use rather than by the number of threads. The executor still runs the
+    parts of the jobs that use the database, and their callbacks.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.loop = None
+        self.jobs_queued = None  # asyncio.Event
+
+    def work(self):
+        """Process the package queue in a new event loop, see `work_async`."""
+        asyncio.run(self.work_async())
+
+    async def work_async(self):
+        """Process the package queue until `stop` is called.
+
+        Unfinished jobs are cancelled when the event loop is closed.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.jobs_queued = asyncio.Event()
+        running = set()
+        try:
+            while not self.shutdown_event.is_set():
+                # Using a timeout here allows shutdown signals to fire
+                job = await self.get_job(timeout=1.0)
+                if job is None:
+                    continue
+                task = asyncio.create_task(self.process_job_async(job))
+                running.add(task)
+                task.add_done_callback(running.discard)
+        finally:
+            self.loop = None
+
+    async def get_job(self, timeout=None):
+        """Return the next job, or ``None`` if none is queued before
+        ``timeout``.
+        """
+        # Jobs queued after this point set the event again, see `_job_queued`.
+        self.jobs_queued.clear()
+        try:
+            return self.job_queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            await asyncio.wait_for(self.jobs_queued.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        try:
+            return self.job_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    async def process_job_async(self, job):
+        """Run a job and return a future with its result.
+
+        The callbacks of `process_one_job` are attached to the future.
+        """
+        self._start_job(job)
+        result = concurrent.futures.Future()
+        self._add_job_callbacks(job, result)
+
+        try:
+            next_job = await job.run_async(self.executor)
+        except Exception as err:
+            complete, value = result.set_exception, err
+        else:
+            complete, value = result.set_result, next_job
+        # Callbacks use the database, which can't be used from the event loop.
+        await asyncio.get_running_loop().run_in_executor(self.executor, complete, value)
+
+        return result
+
+    def _job_queued(self):
+        loop = self.loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self.jobs_queued.set)
+        except RuntimeError:
+            pass  # The loop was closed on shutdown.
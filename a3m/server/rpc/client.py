@@ -1,10 +1,14 @@
 import logging
+import time
 from typing import Callable
+from typing import Iterable
+from typing import Iterator
 from typing import Optional
 
-import tenacity
+from google.protobuf import field_mask_pb2
 from grpc import Channel
 from grpc import RpcError
+from grpc import StatusCode
 
 from a3m import __version__
 from a3m.api.transferservice import v1beta1 as transfer_service_api
@@ -23,6 +27,10 @@ _VERSION_METADATA_KEY = "version"
 class Client:
     """a3m gRPC API client."""
 
+    # Seconds between reads of the status of a package the server can't
+    # watch, see `wait_until_complete`.
+    POLL_INTERVAL = 1.0
+
     def __init__(
         self,
         channel: Channel,
@@ -59,46 +67,143 @@ class Client:
         url: str,
         name: str,
         config: transfer_service_api.request_response_pb2.ProcessingConfig = None,
+        priority: int = transfer_service_api.request_response_pb2.PACKAGE_PRIORITY_UNSPECIFIED,
     ):
         request = transfer_service_api.request_response_pb2.SubmitRequest(
-            name=name, url=url, config=config
+            name=name, url=url, config=config, priority=priority
         )
         return self._unary_call(self.transfer_stub.Submit, request)
 
-    def read(self, package_id: str):
-        request = transfer_service_api.request_response_pb2.ReadRequest(id=package_id)
+    def submit_many(
+        self,
+        transfers: Iterable[tuple],
+        config: transfer_service_api.request_response_pb2.ProcessingConfig = None,
+        priority: int = transfer_service_api.request_response_pb2.PACKAGE_PRIORITY_UNSPECIFIED,
+    ):
+        """Submits many transfers in a single call.
+
+        ``transfers`` are ``(url, name)`` pairs, all processed with ``config``
+        and ``priority``.
+        """
+        request = transfer_service_api.request_response_pb2.SubmitBatchRequest(
+            transfers=[
+                transfer_service_api.request_response_pb2.SubmitRequest(
+                    name=name, url=url, config=config, priority=priority
+                )
+                for url, name in transfers
+            ]
+        )
+        return self._unary_call(self.transfer_stub.SubmitBatch, request)
+
+    def read(self, package_id: str, include_jobs: bool = False):
+        request = transfer_service_api.request_response_pb2.ReadRequest(
+            id=package_id, include_jobs=include_jobs
+        )
         return self._unary_call(self.transfer_stub.Read, request)
 
+    def watch(self, package_id: str):
+        """Returns an iterator of the status updates of a package."""
+        request = transfer_service_api.request_response_pb2.WatchRequest(id=package_id)
+        logger.debug("RPC call Watch with request: %r", request)
+        return self.transfer_stub.Watch(
+            request,
+            metadata=Client.version_metadata(),
+            wait_for_ready=self.wait_for_ready,
+        )
+
     def wait_until_complete(
         self, package_id: str, spin_cb: Callable = None
     ) -> transfer_service_api.request_response_pb2.ReadResponse:
-        """Blocks until processing of a package has completed."""
-
-        def _should_continue(
-            resp: transfer_service_api.request_response_pb2.ReadResponse,
-        ):
-            return (
-                resp.status
-                == transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING
-            )
-
-        def _callback(retry_state):
+        """Blocks until processing of a package has completed.
+
+        ``spin_cb`` is called with every ``WatchResponse`` received. If the
+        server has too many watches already, the package is polled with Read
+        instead and ``spin_cb`` gets a ``WatchResponse`` for every poll.
+        """
+        while True:
+            resp = None
+            try:
+                for resp in self.watch(package_id):
+                    if spin_cb is not None:
+                        spin_cb(resp)
+            except RpcError as e:
+                if e.code() == StatusCode.RESOURCE_EXHAUSTED:
+                    logger.debug("Server has too many watches, polling instead")
+                    return self._poll_until_complete(package_id, spin_cb)
+                logger.warning("RPC call Watch got error %s", e)
+                raise
+            # Watch again if the stream ended before processing did.
+            if (
+                resp is not None
+                and resp.status
+                != transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING
+            ):
+                return transfer_service_api.request_response_pb2.ReadResponse(
+                    status=resp.status, job=resp.job, jobs=resp.jobs
+                )
+
+    def _poll_until_complete(self, package_id, spin_cb=None):
+        processing = transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING
+        while True:
+            resp = self.read(package_id)
             if spin_cb is not None:
-                spin_cb(retry_state)
+                spin_cb(
+                    transfer_service_api.request_response_pb2.WatchResponse(
+                        status=resp.status, job=resp.job
+                    )
+                )
+            if resp.status != processing:
+                # Include the jobs, as the last response of Watch does.
+                return self.read(package_id, include_jobs=True)
+            time.sleep(self.POLL_INTERVAL)
 
-        @tenacity.retry(
-            wait=tenacity.wait_fixed(1),
-            retry=tenacity.retry_if_result(_should_continue),
-            after=_callback,
+    @staticmethod
+    def _task_filter(failed: bool, filename_prefix: str):
+        return transfer_service_api.request_response_pb2.TaskFilter(
+            failed=failed, filename_prefix=filename_prefix
         )
-        def _poll():
-            """Retries while the package is processing."""
-            return self.read(package_id)
 
-        return _poll()
+    def list_tasks(
+        self,
+        job_id: str,
+        page_size: int = 0,
+        page_token: str = "",
+        failed: bool = False,
+        filename_prefix: str = "",
+        fields: Optional[Iterable[str]] = None,
+    ):
+        """Returns a page of the tasks of a job.
 
-    def list_tasks(self, job_id: str):
+        Use ``failed`` and ``filename_prefix`` to filter the tasks, and
+        ``fields`` to list the task fields wanted, e.g. to leave out stdout and
+        stderr.
+        """
         request = transfer_service_api.request_response_pb2.ListTasksRequest(
-            job_id=job_id
+            job_id=job_id,
+            page_size=page_size,
+            page_token=page_token,
+            filter=self._task_filter(failed, filename_prefix),
+            read_mask=field_mask_pb2.FieldMask(paths=fields or ()),
         )
         return self._unary_call(self.transfer_stub.ListTasks, request)
+
+    def stream_tasks(
+        self,
+        job_id: str,
+        failed: bool = False,
+        filename_prefix: str = "",
+        fields: Optional[Iterable[str]] = None,
+    ) -> Iterator[transfer_service_api.request_response_pb2.Task]:
+        """Yields all the tasks of a job, see `list_tasks`."""
+        request = transfer_service_api.request_response_pb2.StreamTasksRequest(
+            job_id=job_id,
+            filter=self._task_filter(failed, filename_prefix),
+            read_mask=field_mask_pb2.FieldMask(paths=fields or ()),
+        )
+        logger.debug("RPC call StreamTasks with request: %r", request)
+        for resp in self.transfer_stub.StreamTasks(
+            request,
+            metadata=Client.version_metadata(),
+            wait_for_ready=self.wait_for_ready,
+        ):
+            yield from resp.tasks
@@ -10,6 +10,8 @@ Start and run MCPServer.
 structure, and default processing configs added.
 5. Any in progress Job and Task entries in the database are marked as errors,
 as they are presumed to have been the result of a shutdown while processing.
+Packages with a checkpoint are resumed from it, the others are marked as
+failed.
 6. If Prometheus metrics are enabled, an thread is started to serve metrics for
 scraping.
 7. A `PackageQueue` (see the `queues` module) is initialized.
@@ -18,7 +20,11 @@ threads are started to handle gearman "RPC" requests from the dashboard.
 9. A watched directory thread is started to observe changes in any of the
 watched dirs as set in the workflow.
 10. The `PackageQueue.work` processing loop is started on the main thread.
+
+With ``use_asyncio``, the gRPC server is a `grpc.aio` server and the queue an
+`AsyncPackageQueue`, both running on an event loop in a thread of their own.
 """
+import asyncio
 import concurrent.futures
 import enum
 import logging
@@ -36,9 +42,12 @@ from a3m.server import metrics
 from a3m.server import shared_dirs
 from a3m.server.db import migrate
 from a3m.server.jobs import Job
+from a3m.server.packages import Package
+from a3m.server.queues import AsyncPackageQueue
 from a3m.server.queues import PackageQueue
 from a3m.server.tasks import Task
 from a3m.server.tasks.backends import get_task_backend
+from a3m.server.tasks.backends import RemoteTaskBackend
 from a3m.server.tasks.backends import TaskBackend
 from a3m.server.transfer_service import TransferService
 from a3m.server.workflow import load_default_workflow
@@ -60,6 +69,14 @@ class Server:
     It runs the gRPC API server and the workflow engine, using independent pools
     of threads. It accepts a :class:`a3m.server.workflow.Workflow` which can be
     customized as needed.
+
+    With ``use_asyncio``, both run on an event loop instead: jobs waiting for
+    their tasks don't hold threads and RPCs are served by `grpc.aio`. The pools
+    of threads still run the database work and the RPC handlers.
+
+    With the remote task backend, the worker service is served on
+    ``worker_bind_address`` by a gRPC server of its own, see
+    `RemoteTaskBackend`.
     """
 
     def __init__(
@@ -72,6 +89,9 @@ class Server:
         queue_executor: concurrent.futures.ThreadPoolExecutor,
         grpc_executor: concurrent.futures.ThreadPoolExecutor,
         debug: bool = False,
+        use_asyncio: bool = False,
+        max_watches: Optional[int] = None,
+        worker_bind_address: Optional[str] = None,
     ):
         self.stage = ServerStage.STOPPED
         self.lock = threading.RLock()
@@ -83,21 +103,43 @@ class Server:
         self.workflow = workflow
         self.queue_executor = queue_executor
         self.queue_shutdown_event = threading.Event()
-        self.queue = PackageQueue(
+        queue_class = AsyncPackageQueue if use_asyncio else PackageQueue
+        self.queue = queue_class(
             self.queue_executor,
             self.queue_shutdown_event,
             max_concurrent_packages=max_concurrent_packages,
             debug=debug,
         )
         self.grpc_executor = grpc_executor
-        self.grpc_server = grpc.server(grpc_executor)
+        if use_asyncio:
+            self.loop = asyncio.new_event_loop()
+            self.grpc_server = self.loop.run_until_complete(
+                self._create_aio_server(grpc_executor)
+            )
+        else:
+            self.loop = None
+            self.grpc_server = grpc.server(grpc_executor)
         self.grpc_port = self.grpc_server.add_insecure_port(bind_address)
 
-        self._mount_services()
-
-    def _mount_services(self):
+        self._mount_services(max_watches)
+
+        # Remote workers lease their batches from a server of their own, so
+        # that the worker service isn't exposed with the public API.
+        self.worker_server = None
+        self.worker_port = None
+        task_backend = get_task_backend()
+        if isinstance(task_backend, RemoteTaskBackend):
+            if not worker_bind_address:
+                raise ValueError("The remote task backend needs a worker bind address.")
+            self.worker_server = grpc.server(
+                concurrent.futures.ThreadPoolExecutor(thread_name_prefix="worker-rpc")
+            )
+            self.worker_port = self.worker_server.add_insecure_port(worker_bind_address)
+            task_backend.add_worker_service(self.worker_server)
+
+    def _mount_services(self, max_watches=None):
         transfer_service = TransferService(
-            self.workflow, self.queue, self.queue_executor
+            self.workflow, self.queue, self.queue_executor, max_watches
         )
         transfer_service_api.service_pb2_grpc.add_TransferServiceServicer_to_server(
             transfer_service, self.grpc_server
@@ -120,9 +162,38 @@ class Server:
 
             self.stage = ServerStage.STARTED
 
+            if self.worker_server is not None:
+                self.worker_server.start()
+
+            if self.loop is not None:
+                threading.Thread(target=self._run_loop).start()
+                return
+
             threading.Thread(target=self.queue.work).start()
             threading.Thread(target=self.grpc_server.start).start()
 
+    @staticmethod
+    async def _create_aio_server(grpc_executor):
+        # Handlers are not coroutines, they run in the executor.
+        return grpc.aio.server(migration_thread_pool=grpc_executor)
+
+    async def _serve(self):
+        await self.grpc_server.start()
+        await self.queue.work_async()
+
+    def _run_loop(self):
+        """Run the event loop until the queue stops, then close it."""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        finally:
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
     def wait_for_termination(self, timeout=None):
         """Blocks current thread until the server stops."""
         while not self.termination_event.is_set():
@@ -143,7 +214,14 @@ class Server:
             def _stop():
                 logger.info("Shutting down...")
 
-                self.grpc_server.stop(grace)
+                if self.loop is not None:
+                    asyncio.run_coroutine_threadsafe(
+                        self.grpc_server.stop(grace), self.loop
+                    ).result()
+                else:
+                    self.grpc_server.stop(grace)
+                if self.worker_server is not None:
+                    self.worker_server.stop(grace)
                 self.queue_shutdown_event.set()
                 self.queue.wait_for_termination()
                 get_task_backend().shutdown(wait=False)
@@ -166,11 +244,14 @@ def create_server(
     queue_workers,
     grpc_workers,
     debug=False,
+    use_asyncio=False,
+    worker_bind_address=None,
 ):
     """Create a3m server ready to use.
 
     It bootstraps some bits locally needed, like the database, the local
-    processing directory or the pool of threads. It wraps
+    processing directory or the pool of threads, and resumes the packages
+    interrupted by the last shutdown. It wraps
     :class:`a3m.server.runner.Server`.
     """
     workflow = load_default_workflow()
@@ -182,11 +263,12 @@ def create_server(
 
     Job.cleanup_old_db_entries()
     Task.cleanup_old_db_entries()
+    Package.cleanup_old_db_entries()
 
     metrics.init_labels(workflow)
     metrics.start_prometheus_server()
 
-    return Server(
+    server = Server(
         bind_address,
         server_credentials,
         workflow,
@@ -195,8 +277,17 @@ def create_server(
         concurrent.futures.ThreadPoolExecutor(max_workers=queue_workers),
         concurrent.futures.ThreadPoolExecutor(max_workers=grpc_workers),
         debug,
+        use_asyncio,
+        # Watches hold their RPC thread, keep half of them for other calls.
+        max_watches=max(grpc_workers // 2, 1),
+        worker_bind_address=worker_bind_address,
     )
 
+    # Their jobs wait in the queue until the server is started.
+    Package.resume_packages(server.queue, server.queue_executor, workflow)
+
+    return server
+
 
 def update_agents():
     """Create or update software and organization agents."""
@@ -0,0 +1,139 @@
+"""
+Scheduling of the packages waiting to be processed.
+
+`PackageQueue` holds packages back while ``max_concurrent_packages`` of them
+are active. A `SchedulingPolicy` decides which of the waiting packages goes
+next by giving each a score when it's queued, lower scores go first.
+
+Scores are expressed as points in time so that packages age: a package waiting
+long enough is eventually ahead of any package queued after it, whatever their
+priority and size.
+"""
+import heapq
+import itertools
+import queue
+import threading
+import time
+
+from a3m.api.transferservice import v1beta1 as transfer_service_api
+from a3m.server import metrics
+
+
+PRIORITY_LOW = transfer_service_api.request_response_pb2.PACKAGE_PRIORITY_LOW
+PRIORITY_NORMAL = transfer_service_api.request_response_pb2.PACKAGE_PRIORITY_NORMAL
+PRIORITY_HIGH = transfer_service_api.request_response_pb2.PACKAGE_PRIORITY_HIGH
+
+PRIORITY_NAMES = {
+    PRIORITY_LOW: "low",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_HIGH: "high",
+}
+
+
+def get_priority(value):
+    """Return the priority class of a package, normal if unspecified."""
+    if value in PRIORITY_NAMES:
+        return value
+    return PRIORITY_NORMAL
+
+
+class SchedulingPolicy:
+    """First in, first out."""
+
+    def score(self, package, queued_at):
+        return queued_at
+
+
+class FairSharePolicy(SchedulingPolicy):
+    """Weighted fair share between priority classes, small packages first.
+
+    A package is scheduled as if it had been queued later, by a delay given by
+    its priority class and by an estimate of how long it takes to process. The
+    delays are bounded, which is what prevents starvation.
+    """
+
+    # Seconds a package is held back by its priority class.
+    PRIORITY_DELAYS = {
+        PRIORITY_HIGH: 0,
+        PRIORITY_NORMAL: 5 * 60,
+        PRIORITY_LOW: 30 * 60,
+    }
+
+    # Rough processing cost of each file and byte of a package, in seconds.
+    SECONDS_PER_FILE = 0.5
+    SECONDS_PER_BYTE = 1 / (50 * 1024 * 1024)
+
+    # Bound of the delay given by the size of a package, and the delay of
+    # packages of unknown size.
+    MAX_SIZE_DELAY = 60 * 60
+    UNKNOWN_SIZE_DELAY = 5 * 60
+
+    def estimate_duration(self, package):
+        if package.file_count is None:
+            return self.UNKNOWN_SIZE_DELAY
+        duration = (
+            package.file_count * self.SECONDS_PER_FILE
+            + package.byte_size * self.SECONDS_PER_BYTE
+        )
+        return min(duration, self.MAX_SIZE_DELAY)
+
+    def score(self, package, queued_at):
+        return (
+            queued_at
+            + self.PRIORITY_DELAYS[get_priority(package.priority)]
+            + self.estimate_duration(package)
+        )
+
+
+POLICIES = {
+    "fifo": SchedulingPolicy,
+    "fair_share": FairSharePolicy,
+}
+
+
+def get_policy(name):
+    """Return a new instance of the scheduling policy with the given name."""
+    try:
+        return POLICIES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown scheduling policy: {name}")
+
+
+class PackageScheduler:
+    """Jobs of the packages waiting to be processed, ordered by a policy.
+
+    It quacks like the ``queue.Queue`` it replaces in `PackageQueue`, but only
+    provides the non-blocking methods.
+    """
+
+    def __init__(self, policy=None, maxsize=0):
+        if policy is None:
+            policy = SchedulingPolicy()
+        self.policy = policy
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.heap = []  # (score, sequence, queued_at, job)
+        # Ties are broken by the order of arrival.
+        self.sequence = itertools.count()
+
+    def qsize(self):
+        with self.lock:
+            return len(self.heap)
+
+    def put_nowait(self, job):
+        queued_at = time.time()
+        score = self.policy.score(job.package, queued_at)
+        with self.lock:
+            if 0 < self.maxsize <= len(self.heap):
+                raise queue.Full
+            heapq.heappush(self.heap, (score, next(self.sequence), queued_at, job))
+
+    def get_nowait(self):
+        with self.lock:
+            try:
+                _, _, queued_at, job = heapq.heappop(self.heap)
+            except IndexError:
+                raise queue.Empty
+        priority = PRIORITY_NAMES[get_priority(job.package.priority)]
+        metrics.package_dequeued(priority, time.time() - queued_at)
+        return job
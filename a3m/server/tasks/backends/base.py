@@ -1,4 +1,5 @@
 import abc
+import asyncio
 
 from django.conf import settings
 
@@ -30,5 +31,14 @@ class TaskBackend(metaclass=abc.ABCMeta):
         they were submitted.
         """
 
+    async def wait_for_results_async(self, job):
+        """Asynchronous generator version of `wait_for_results`.
+
+        Backends should override it so waiting doesn't hold a thread, by
+        default results are collected in a thread and yielded at the end.
+        """
+        for task in await asyncio.to_thread(list, self.wait_for_results(job)):
+            yield task
+
     def shutdown(self, wait=True):
         """Shut down the backend."""
@@ -2,98 +2,302 @@
 Built-in task backend. Submits `Task` objects to a local pool of processes for
 processing, and returns results.
 """
-import concurrent
+import asyncio
+import collections
+import concurrent.futures
+import functools
 import logging
+import multiprocessing
+import os
+import queue
+import threading
 import uuid
+from concurrent.futures.process import BrokenProcessPool
 
+from django.conf import settings
+
+from a3m.client import worker
 from a3m.client.mcp import execute_command
+from a3m.client.mcp import fail_all_tasks
 from a3m.client.metrics import init_counter_labels
 from a3m.server import metrics
 from a3m.server.db import auto_close_old_connections
 from a3m.server.jobs import Job
 from a3m.server.tasks.backends.base import TaskBackend
 from a3m.server.tasks.task import Task
+from a3m.server.workflow import DEFAULT_RESOURCE_CLASS
 
 
 logger = logging.getLogger(__name__)
 
 
+@auto_close_old_connections()
+def run_batch(job_name: str, batch_payload, task_results=None):
+    """Run a batch of tasks in a thread of the server process."""
+    if task_results is None:
+        on_task_result = None
+    else:
+
+        def on_task_result(task_uuid, result):
+            task_results.put((task_uuid, result))
+
+    return execute_command(job_name, batch_payload, on_task_result=on_task_result)
+
+
+def parse_resource_class_workers(value):
+    """Parse the workers of each resource class, e.g. ``io=8, cpu=2``."""
+    workers = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, count = item.partition("=")
+        try:
+            workers[name.strip()] = max(int(count), 1)
+        except ValueError:
+            raise ValueError(f"Invalid number of workers of resource class: {item}")
+    return workers
+
+
+def _wake_up(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ResultsQueue:
+    """Queue of the results of a job, fed by other threads.
+
+    Results can be waited for from a thread, see `get`, or from an event
+    loop, see `get_async`, without holding a thread while waiting.
+    """
+
+    def __init__(self):
+        self.items = collections.deque()
+        self.not_empty = threading.Condition()
+        self.waiter = None  # (loop, asyncio.Future)
+
+    def put(self, item):
+        with self.not_empty:
+            self.items.append(item)
+            self.not_empty.notify()
+            waiter, self.waiter = self.waiter, None
+        if waiter is not None:
+            loop, future = waiter
+            loop.call_soon_threadsafe(_wake_up, future)
+
+    def get(self):
+        with self.not_empty:
+            while not self.items:
+                self.not_empty.wait()
+            return self.items.popleft()
+
+    async def get_async(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.not_empty:
+                if self.items:
+                    return self.items.popleft()
+                future = loop.create_future()
+                self.waiter = (loop, future)
+            await future
+
+
 class PoolTaskBatch:
     def __init__(self):
         self.uuid: uuid.UUID = uuid.uuid4()
         self.tasks: list[Task] = []
         self.future = None
+        # Where task results and the batch itself, once it's done, are
+        # delivered for `PoolTaskBackend.wait_for_results` to pick up.
+        self.results_queue = None
+        self.streamed_tasks = set()
+        self.finished = False
 
     def __len__(self):
         return len(self.tasks)
 
     def serialize_task(self, task: Task):
-        return {
+        data = {
             "uuid": str(task.uuid),
             "createdDate": task.start_timestamp.isoformat(" "),
             "arguments": task.arguments,
             "wants_output": task.wants_output,
             "execute": task.execute,
         }
+        if task.argv is not None:
+            data["argv"] = task.argv
+        return data
 
     def add_task(self, task: Task):
         self.tasks.append(task)
 
-    @auto_close_old_connections()
-    def run(self, job_name: str, batch_payload):
-        result = execute_command(job_name, batch_payload)
-        return self, result
-
-    def submit(self, executor, job):
+    def submit(self, executor, job, runner=run_batch):
         data = {
             "tasks": {str(task.uuid): self.serialize_task(task) for task in self.tasks}
         }
 
-        self.future = executor.submit(self.run, job.name, data)
+        self.future = executor.submit(runner, job.name, data)
+        if self.results_queue is not None:
+            self.future.add_done_callback(lambda future: self.results_queue.put(self))
 
         logger.debug("Submitted pool job %s (%s)", self.uuid, job.name)
 
+    def get_results(self):
+        """Return the results of the batch once it has been processed.
+
+        A worker process that dies (e.g. killed by the OOM killer) takes its
+        batch down with it, in which case all of its tasks are failed.
+        """
+        try:
+            return self.future.result()
+        except Exception as err:
+            logger.error("Pool job %s failed: %s", self.uuid, err)
+            return fail_all_tasks(
+                {"tasks": {str(task.uuid): None for task in self.tasks}}, err
+            )
+
     def save(self, job):
         Task.bulk_log(self.tasks, job)
 
+    def update_task_result(self, task, task_result):
+        task.exit_code = task_result["exitCode"]
+        task.stdout = task_result.get("stdout", "")
+        task.stderr = task_result.get("stderr", "")
+        task.finished_timestamp = task_result.get("finishedTimestamp")
+        task.package_updates = task_result.get("packageUpdates")
+        task.write_output()
+
+        task.done = True
+
+        logger.debug("Task %s finished! Result %s", task.uuid, task_result["exitCode"])
+
+    def stream_task_result(self, task, task_result):
+        """Update a task from its streamed result, unless already done."""
+        task_id = str(task.uuid)
+        if self.finished or task_id in self.streamed_tasks:
+            return False
+        self.streamed_tasks.add(task_id)
+        self.update_task_result(task, task_result)
+        return True
+
     def update_task_results(self, results):
+        """Update the tasks that haven't streamed their results yet and return
+        them.
+
+        If the batch failed, the client failed all its tasks in the database.
+        Streamed tasks take the failed result too but aren't returned again,
+        they've already been handed over to their job.
+        """
+        self.finished = True
         result = results["task_results"]
+        failed = results.get("failed", False)
+        tasks = []
         for task in self.tasks:
             task_id = str(task.uuid)
-            task_result = result[task_id]
-            task.exit_code = task_result["exitCode"]
-            task.stdout = task_result.get("stdout", "")
-            task.stderr = task_result.get("stderr", "")
-            task.finished_timestamp = task_result.get("finishedTimestamp")
-            task.write_output()
-
-            task.done = True
-
-            logger.debug(
-                "Task %s finished! Result %s", task_id, task_result["exitCode"]
-            )
-
-            yield task
+            if task_id not in self.streamed_tasks:
+                self.update_task_result(task, result[task_id])
+                tasks.append(task)
+            elif failed:
+                task.exit_code = result[task_id]["exitCode"]
+                task.stderr = result[task_id].get("stderr", "")
+        return tasks
 
 
 class PoolTaskBackend(TaskBackend):
     """Submits tasks to the pool.
 
-    Tasks are batched into BATCH_SIZE groups (default 128) and sent to the
-    client. This adds some complexity but saves a lot of overhead.
+    Tasks are batched into groups of up to BATCH_SIZE (default 128) and sent
+    to the client. This adds some complexity but saves a lot of overhead.
+
+    The size of the batches is chosen per workflow link from a rolling
+    estimate of the time each task takes, so that cheap links get large
+    batches and expensive ones get small batches that spread evenly across
+    workers instead of keeping one of them busy long after the others are
+    done.
+
+    With ``worker_processes`` greater than one, batches are run in parallel by
+    a pool of worker processes, each with Django set up and its own database
+    connection. Otherwise batches run one at a time in a thread of the server
+    process.
+
+    Workers stream the result of each task through a shared queue as soon as
+    the client script is done with it, so tasks are marked as done while the
+    rest of their batch is still running. A dispatcher thread hands them over
+    to the job waiting for them, which may wait from a thread or from an event
+    loop.
+
+    Batches are logged and submitted as soon as they are full, so the job can
+    keep enumerating files while the first batches run. Each job has at most
+    ``MAX_IN_FLIGHT_BATCHES_PER_WORKER`` unfinished batches per worker,
+    `submit_task` blocks until one of them is done beyond that.
+
+    Each resource class of workflow links, e.g. ``io`` or ``cpu``, has its own
+    workers so that jobs of one class don't queue behind jobs of another.
+    Classes have ``worker_processes`` workers unless ``resource_class_workers``
+    says otherwise. The workers of the default class start with the backend,
+    the others when their class is first used. Resource classes need worker
+    processes: when batches run in the server process every class shares its
+    single thread, so that client scripts keep writing to the database one at
+    a time.
     """
 
-    def __init__(self):
+    # How long we'd like a batch to run for. Once we know how long tasks of a
+    # link take, batches are sized to roughly match this target.
+    TARGET_BATCH_DURATION = 10.0
+
+    # Weight given to the latest observation in the rolling estimate of the
+    # task duration of each link.
+    TASK_DURATION_SMOOTHING = 0.3
+
+    # Unfinished batches a job may have per worker before `submit_task`
+    # blocks. Enough to keep every worker busy while the job waits.
+    MAX_IN_FLIGHT_BATCHES_PER_WORKER = 2
+
+    def __init__(self, worker_processes=None, resource_class_workers=None):
         init_counter_labels()
 
-        # Having multiple threads would be equivalent to deploying multiple
-        # MCPClient instances in Archivematica which is known to be problematic.
-        # Let's stick to one for now.
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        if worker_processes is None:
+            worker_processes = settings.WORKER_PROCESSES
+        self.worker_processes = max(worker_processes, 1)
+        if resource_class_workers is None:
+            resource_class_workers = parse_resource_class_workers(
+                settings.RESOURCE_CLASS_WORKERS
+            )
+        self.resource_class_workers = resource_class_workers
+
+        self._setup_batch_runner()
+
+        self.executor_lock = threading.Lock()
+        self.executors = {}  # resource_class: Executor
+        with self.executor_lock:
+            self._get_executor(DEFAULT_RESOURCE_CLASS)
 
         self.current_task_batches = {}  # job_uuid: PoolTaskBatch
         self.pending_jobs = {}  # job_uuid: List[PoolTaskBatch]
-        self.batches_to_submit = {}  # job_uuid: List[PoolTaskBatch]
+        self.results_queues = {}  # job_uuid: ResultsQueue
+        self.in_flight_batches = {}  # job_uuid: threading.BoundedSemaphore
+        self.task_durations = {}  # link_id: float
+        self.running_tasks = {}  # task_uuid: (PoolTaskBatch, Task)
+
+        self.dispatcher = threading.Thread(
+            target=self._dispatch_task_results, name="task-results", daemon=True
+        )
+        self.dispatcher.start()
+
+    def _setup_batch_runner(self):
+        """Create the function running the batches and the queue the results
+        of their tasks are streamed to.
+        """
+        # Worker processes cannot import the server modules, they get their
+        # own entry point.
+        self.mp_context = multiprocessing.get_context("spawn")
+        if self.worker_processes > 1:
+            self.task_results = self.mp_context.Queue()
+            self.batch_runner = worker.run_batch
+        else:
+            self.task_results = queue.Queue()
+            self.batch_runner = functools.partial(
+                run_batch, task_results=self.task_results
+            )
 
     def submit_task(self, job: Job, task: Task):
         current_task_batch = self._get_current_task_batch(job.uuid)
@@ -102,27 +306,162 @@ class PoolTaskBackend(TaskBackend):
 
         current_task_batch.add_task(task)
 
-        # If we've hit TASK_BATCH_SIZE, save the batch
-        if (len(current_task_batch) % self.TASK_BATCH_SIZE) == 0:
+        # If we've hit the batch size of the link, run the batch
+        if len(current_task_batch) >= self.get_batch_size(job):
             self._save_batch(job, current_task_batch)
 
+    @property
+    def executor(self):
+        """Executor of the default resource class."""
+        return self.executors[DEFAULT_RESOURCE_CLASS]
+
+    def get_workers(self, resource_class):
+        """Return the number of workers of the given resource class."""
+        return self.resource_class_workers.get(resource_class, self.worker_processes)
+
+    def get_max_in_flight_batches(self, resource_class):
+        return self.MAX_IN_FLIGHT_BATCHES_PER_WORKER * self.get_workers(resource_class)
+
     def wait_for_results(self, job):
-        self._submit_batches(job)
+        results_queue, pending_batches = self._start_waiting(job)
+
+        # Yield tasks as their results are streamed, until all batches are
+        # complete. Tasks that didn't stream their result are updated once
+        # their batch is done.
+        while pending_batches:
+            tasks, batch_done = self._handle_result(job, results_queue.get())
+            yield from tasks
+            pending_batches -= batch_done
+
+    async def wait_for_results_async(self, job):
+        # Submitting the last batch logs its tasks to the database.
+        results_queue, pending_batches = await asyncio.to_thread(
+            self._start_waiting, job
+        )
+        while pending_batches:
+            item = await results_queue.get_async()
+            tasks, batch_done = self._handle_result(job, item)
+            for task in tasks:
+                yield task
+            pending_batches -= batch_done
+
+    def _start_waiting(self, job):
+        """Submit what's left of the current batch of the job.
+
+        Return the queue of its results and the number of batches to wait for.
+        """
+        current_task_batch = self.current_task_batches.get(job.uuid)
+        if current_task_batch:
+            self._save_batch(job, current_task_batch)
+        results_queue = self.results_queues.pop(job.uuid, None)
+        self.in_flight_batches.pop(job.uuid, None)
+        pending_batches = len(self.pending_jobs.pop(job.uuid, ()))
+        return results_queue, pending_batches
+
+    def _handle_result(self, job, item):
+        """Return the tasks done by an item of the results queue of the job,
+        and whether the item was a whole batch.
+        """
+        if isinstance(item, PoolTaskBatch):
+            batch = item
+            results = batch.get_results()
+            if "duration" in results:
+                self._observe_batch_duration(job, len(batch), results["duration"])
+            tasks = batch.update_task_results(results)
+            if results.get("failed", False):
+                # Streamed tasks were failed too, the job has seen them already.
+                exit_codes = [task.exit_code or 0 for task in batch.tasks]
+                job.exit_code = max([job.exit_code or 0, *exit_codes])
+            for task in batch.tasks:
+                self.running_tasks.pop(str(task.uuid), None)
+            metrics.gearman_active_jobs_gauge.dec()
+            return tasks, True
+
+        batch, task, task_result = item
+        if batch.stream_task_result(task, task_result):
+            return [task], False
+        return [], False
+
+    def get_batch_size(self, job):
+        """Return the number of tasks to send per batch for the given job.
+
+        Links we haven't seen run yet use ``TASK_BATCH_SIZE``, which is also
+        the upper bound.
+        """
         try:
-            pending_batches = self.pending_jobs[job.uuid]
+            task_duration = self.task_durations[job.link.id]
         except KeyError:
-            # No batches submitted
+            return self.TASK_BATCH_SIZE
+        if task_duration <= 0:
+            return self.TASK_BATCH_SIZE
+        batch_size = int(self.TARGET_BATCH_DURATION / task_duration)
+        return min(max(batch_size, 1), self.TASK_BATCH_SIZE)
+
+    def _observe_batch_duration(self, job, task_count, duration):
+        if task_count == 0:
             return
+        task_duration = duration / task_count
+        previous = self.task_durations.get(job.link.id)
+        if previous is not None:
+            task_duration = (
+                self.TASK_DURATION_SMOOTHING * task_duration
+                + (1 - self.TASK_DURATION_SMOOTHING) * previous
+            )
+        self.task_durations[job.link.id] = task_duration
 
-        # Wait for all batches to complete.
-        futures = [item.future for item in pending_batches]
-        for future in concurrent.futures.as_completed(futures):
-            batch, results = future.result()
-            yield from batch.update_task_results(results)
-            metrics.gearman_active_jobs_gauge.dec()
+        metrics.task_batch_size_changed(job, self.get_batch_size(job))
 
-        # Once we've gotten results for all job tasks, clear the batches
-        del self.pending_jobs[job.uuid]
+    def _get_executor(self, resource_class):
+        """Return the executor of the given resource class, called with
+        ``executor_lock`` held.
+        """
+        try:
+            return self.executors[resource_class]
+        except KeyError:
+            executor = self.executors[resource_class] = self._create_executor(
+                resource_class
+            )
+            return executor
+
+    def _create_executor(self, resource_class):
+        if self.worker_processes == 1:
+            return self._get_thread_executor(resource_class)
+
+        workers = self.get_workers(resource_class)
+
+        # Forking a process that runs gRPC threads is unsafe, start workers
+        # from a clean interpreter instead.
+        settings_module = os.environ.get(
+            "DJANGO_SETTINGS_MODULE", "a3m.settings.common"
+        )
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=self.mp_context,
+            initializer=worker.init_worker,
+            initargs=(settings_module, self.task_results),
+        )
+        # Start the workers now rather than when the first batch arrives.
+        for _ in range(workers):
+            executor.submit(worker.ping)
+
+        logger.debug(
+            "Started %d worker processes of resource class %s", workers, resource_class
+        )
+
+        return executor
+
+    def _get_thread_executor(self, resource_class):
+        if resource_class in self.resource_class_workers:
+            logger.warning(
+                "Ignoring the workers of resource class %s, they need "
+                "worker_processes greater than one",
+                resource_class,
+            )
+        if resource_class != DEFAULT_RESOURCE_CLASS:
+            return self.executors[DEFAULT_RESOURCE_CLASS]
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="worker"
+        )
 
     def _get_current_task_batch(self, job_uuid) -> PoolTaskBatch:
         try:
@@ -132,28 +471,56 @@ class PoolTaskBackend(TaskBackend):
             return self.current_task_batches[job_uuid]
 
     def _save_batch(self, job, task_batch):
-        task_batch.save(job)
-        if job.uuid not in self.batches_to_submit:
-            self.batches_to_submit[job.uuid] = []
-        self.batches_to_submit[job.uuid].append(task_batch)
         del self.current_task_batches[job.uuid]
-
-    def _submit_batches(self, job: Job):
-        # Check if we have anything for this job that hasn't been saved
-        current_task_batch = self._get_current_task_batch(job.uuid)
-        if len(current_task_batch) > 0:
-            self._save_batch(job, current_task_batch)
-
-        # Submit all saved batches
-        if job.uuid in self.batches_to_submit:
-            for task_batch in self.batches_to_submit[job.uuid]:
-                self._submit_batch(job, task_batch)
+        task_batch.save(job)
+        self._submit_batch(job, task_batch)
+
+    def _dispatch_task_results(self):
+        """Route the results streamed by the workers to the waiting jobs."""
+        while True:
+            item = self.task_results.get()
+            if item is None:
+                break
+            task_uuid, task_result = item
+            try:
+                batch, task = self.running_tasks[task_uuid]
+            except KeyError:
+                # The batch is done already.
+                continue
+            batch.results_queue.put((batch, task, task_result))
 
     def _submit_batch(self, job, task_batch):
         if len(task_batch) == 0:
             return
 
-        task_batch.submit(self.executor, job)
+        resource_class = job.link.resource_class
+        if job.uuid not in self.results_queues:
+            self.results_queues[job.uuid] = ResultsQueue()
+            self.in_flight_batches[job.uuid] = threading.BoundedSemaphore(
+                self.get_max_in_flight_batches(resource_class)
+            )
+        in_flight_batches = self.in_flight_batches[job.uuid]
+        # Blocks while the job has too many unfinished batches.
+        in_flight_batches.acquire()
+
+        task_batch.results_queue = self.results_queues[job.uuid]
+        for task in task_batch.tasks:
+            self.running_tasks[str(task.uuid)] = (task_batch, task)
+
+        with self.executor_lock:
+            executor = self._get_executor(resource_class)
+            try:
+                task_batch.submit(executor, job, self.batch_runner)
+            except BrokenProcessPool:
+                logger.warning(
+                    "Worker process pool of resource class %s is broken, restarting it",
+                    resource_class,
+                )
+                executor.shutdown(wait=False)
+                del self.executors[resource_class]
+                executor = self._get_executor(resource_class)
+                task_batch.submit(executor, job, self.batch_runner)
+        task_batch.future.add_done_callback(lambda future: in_flight_batches.release())
 
         metrics.gearman_active_jobs_gauge.inc()
         metrics.gearman_pending_jobs_gauge.dec()
@@ -163,4 +530,9 @@ class PoolTaskBackend(TaskBackend):
         self.pending_jobs[job.uuid].append(task_batch)
 
     def shutdown(self, wait=True):
-        self.executor.shutdown(wait)
+        with self.executor_lock:
+            executors = list(self.executors.values())
+        # Resource classes may share an executor.
+        for executor in set(executors):
+            executor.shutdown(wait)
+        self.task_results.put(None)
@@ -0,0 +1,338 @@
+"""
+Task backend handing batches over to remote workers, see
+`a3m.client.remote_worker`, so that tasks can run on other nodes.
+"""
+import collections
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+from a3m.api.workerservice import v1beta1 as worker_service_api
+from a3m.client import remote_worker
+from a3m.server.tasks.backends.pool_backend import PoolTaskBackend
+
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerLostError(Exception):
+    """The workers running a batch kept losing its lease."""
+
+
+class RemoteBatch:
+    """A batch waiting for a remote worker, or leased by one."""
+
+    def __init__(self, resource_class, job_name, payload):
+        self.uuid = str(uuid.uuid4())
+        self.resource_class = resource_class
+        self.job_name = job_name
+        self.payload = payload
+        self.future = concurrent.futures.Future()
+        self.worker_id = None
+        self.expires_at = None
+        self.attempts = 0
+        # Results reported by the workers so far, by task UUID.
+        self.results = {}
+
+    def get_payload(self):
+        """Return the payload of the tasks whose results are missing."""
+        tasks = self.payload["tasks"]
+        if self.results:
+            tasks = {
+                task_id: task
+                for task_id, task in tasks.items()
+                if task_id not in self.results
+            }
+        return {"tasks": tasks}
+
+
+class BatchLeases:
+    """Batches of `RemoteTaskBackend` and the leases of the workers running
+    them.
+
+    A worker leases a batch for ``lease_duration`` seconds and renews the
+    lease with heartbeats. Results of tasks count towards the lease too. Once
+    expired, the batch goes back to the front of the queue with the tasks
+    whose results are missing. A batch lost ``MAX_ATTEMPTS`` times fails.
+
+    Only the worker holding the lease of a batch can report its results.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, task_results, lease_duration):
+        self.task_results = task_results
+        self.lease_duration = lease_duration
+        self.lock = threading.Lock()
+        self.waiting = collections.deque()  # RemoteBatch
+        self.leased = {}  # batch_uuid: RemoteBatch
+        self.closed = False
+
+    def submit(self, resource_class, job_name, payload):
+        """Queue a batch and return a future with its results."""
+        batch = RemoteBatch(resource_class, job_name, payload)
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Cannot submit batches after shutdown.")
+            self.waiting.append(batch)
+        return batch.future
+
+    def lease(self, worker_id, resource_classes=None):
+        """Lease the next batch of the given resource classes, if any.
+
+        Workers poll, RPC threads are not held while they wait for batches.
+        """
+        with self.lock:
+            batch = None if self.closed else self._pop_waiting(resource_classes)
+            if batch is None:
+                return None
+            batch.worker_id = worker_id
+            batch.attempts += 1
+            batch.expires_at = time.monotonic() + self.lease_duration
+            self.leased[batch.uuid] = batch
+            payload = batch.get_payload()
+
+        return {
+            "batch_id": batch.uuid,
+            "job_name": batch.job_name,
+            "payload": payload,
+            "lease_duration": self.lease_duration,
+        }
+
+    def _pop_waiting(self, resource_classes):
+        for batch in self.waiting:
+            if resource_classes is None or batch.resource_class in resource_classes:
+                self.waiting.remove(batch)
+                return batch
+        return None
+
+    def _get_leased(self, worker_id, batch_id):
+        """Return the batch if the worker holds its lease, renewing it.
+
+        Called with ``lock`` held.
+        """
+        batch = self.leased.get(batch_id)
+        if batch is None or batch.worker_id != worker_id:
+            return None
+        batch.expires_at = time.monotonic() + self.lease_duration
+        return batch
+
+    def heartbeat(self, worker_id, batch_ids):
+        """Renew the leases of a worker, return the batches it lost."""
+        with self.lock:
+            return [
+                batch_id
+                for batch_id in batch_ids
+                if self._get_leased(worker_id, batch_id) is None
+            ]
+
+    def report_task_result(self, worker_id, batch_id, task_uuid, result):
+        """Record the result of a task, as soon as it's done."""
+        with self.lock:
+            batch = self._get_leased(worker_id, batch_id)
+            if batch is None or task_uuid in batch.results:
+                return False
+            if task_uuid not in batch.payload["tasks"]:
+                logger.warning(
+                    "Worker %s reported task %s, not part of batch %s",
+                    worker_id,
+                    task_uuid,
+                    batch_id,
+                )
+                return False
+            batch.results[task_uuid] = result
+        self.task_results.put((task_uuid, result))
+        return True
+
+    def complete(self, worker_id, batch_id, results):
+        """Record the results of a batch, see ``execute_command``.
+
+        Results of tasks that aren't part of the batch are dropped.
+        """
+        with self.lock:
+            batch = self._get_leased(worker_id, batch_id)
+            if batch is None:
+                return False
+            del self.leased[batch_id]
+        task_results = {}
+        for task_uuid, result in results["task_results"].items():
+            if task_uuid in batch.payload["tasks"]:
+                task_results[task_uuid] = result
+            else:
+                logger.warning(
+                    "Worker %s reported task %s, not part of batch %s",
+                    worker_id,
+                    task_uuid,
+                    batch_id,
+                )
+        if batch.attempts > 1:
+            # It only covers part of the batch.
+            results.pop("duration", None)
+        results["task_results"] = {**batch.results, **task_results}
+        batch.future.set_result(results)
+        return True
+
+    def expire_leases(self):
+        """Take the batches back from the workers whose leases expired."""
+        now = time.monotonic()
+        done, failed = [], []
+        with self.lock:
+            for batch in list(self.leased.values()):
+                if batch.expires_at > now:
+                    continue
+                del self.leased[batch.uuid]
+                logger.warning(
+                    "Worker %s lost the lease of batch %s (%s)",
+                    batch.worker_id,
+                    batch.uuid,
+                    batch.job_name,
+                )
+                batch.worker_id = None
+                if not batch.get_payload()["tasks"]:
+                    done.append(batch)
+                elif batch.attempts >= self.MAX_ATTEMPTS:
+                    failed.append(batch)
+                else:
+                    self.waiting.appendleft(batch)
+        for batch in done:
+            batch.future.set_result({"task_results": batch.results})
+        for batch in failed:
+            batch.future.set_exception(
+                WorkerLostError(
+                    f"Batch {batch.uuid} was lost by {batch.attempts} workers."
+                )
+            )
+
+    def close(self):
+        """Stop handing batches out."""
+        with self.lock:
+            self.closed = True
+
+
+class RemoteExecutor:
+    """Batches of a resource class, run by remote workers.
+
+    It quacks like the executors of `PoolTaskBackend`, the function given to
+    `submit` is run by the workers instead.
+    """
+
+    def __init__(self, leases, resource_class):
+        self.leases = leases
+        self.resource_class = resource_class
+
+    def submit(self, fn, job_name, batch_payload):
+        return self.leases.submit(self.resource_class, job_name, batch_payload)
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class RemoteTaskBackend(PoolTaskBackend):
+    """Submits tasks to remote workers.
+
+    Tasks are batched like in `PoolTaskBackend` but batches wait in the
+    server until a worker leases them, see `BatchLeases`. Workers connect to
+    the worker service, added to a gRPC server with `add_worker_service`, and
+    stream the results of the tasks back.
+
+    Leases expire after ``lease_duration`` seconds without news from their
+    worker. ``worker_processes`` and ``resource_class_workers`` bound the
+    batches of a job in flight, as they do in `PoolTaskBackend`; they
+    should match the number of remote workers.
+    """
+
+    def __init__(self, lease_duration=None, **kwargs):
+        if lease_duration is None:
+            lease_duration = settings.REMOTE_LEASE_DURATION
+        self.lease_duration = lease_duration
+
+        super().__init__(**kwargs)
+
+        self.reaper_stopped = threading.Event()
+        self.reaper = threading.Thread(
+            target=self._reap_leases, name="lease-reaper", daemon=True
+        )
+        self.reaper.start()
+
+    def _setup_batch_runner(self):
+        self.task_results = queue.Queue()
+        self.batch_runner = None
+        self.leases = BatchLeases(self.task_results, self.lease_duration)
+
+    def _create_executor(self, resource_class):
+        return RemoteExecutor(self.leases, resource_class)
+
+    def _reap_leases(self):
+        while not self.reaper_stopped.wait(max(self.lease_duration / 4, 0.1)):
+            self.leases.expire_leases()
+
+    def add_worker_service(self, server):
+        """Serve the batches to the workers from the given gRPC server."""
+        worker_service_api.service_pb2_grpc.add_WorkerServiceServicer_to_server(
+            WorkerService(self.leases), server
+        )
+
+    def shutdown(self, wait=True):
+        self.reaper_stopped.set()
+        self.leases.close()
+        super().shutdown(wait)
+
+
+class WorkerService(worker_service_api.service_pb2_grpc.WorkerServiceServicer):
+    """Serves the batches of `BatchLeases` to the remote workers, see
+    `a3m.client.remote_worker.WorkerServiceClient`.
+    """
+
+    def __init__(self, leases):
+        self.leases = leases
+
+    def Lease(self, request, context):
+        lease = self.leases.lease(
+            request.worker_id, list(request.resource_classes) or None
+        )
+        if lease is None:
+            return worker_service_api.request_response_pb2.LeaseResponse()
+        return worker_service_api.request_response_pb2.LeaseResponse(
+            batch=remote_worker.encode_batch(
+                lease["batch_id"], lease["job_name"], lease["payload"]
+            ),
+            lease_duration=lease["lease_duration"],
+        )
+
+    def Heartbeat(self, request, context):
+        lost = self.leases.heartbeat(request.worker_id, list(request.batch_ids))
+        return worker_service_api.request_response_pb2.HeartbeatResponse(
+            lost_batch_ids=lost
+        )
+
+    def ReportTaskResult(self, request, context):
+        accepted = self.leases.report_task_result(
+            request.worker_id,
+            request.batch_id,
+            request.task_id,
+            remote_worker.decode_task_result(request.result),
+        )
+        return worker_service_api.request_response_pb2.ReportTaskResultResponse(
+            accepted=accepted
+        )
+
+    def Complete(self, request, context):
+        results = {
+            "task_results": {
+                task_id: remote_worker.decode_task_result(result)
+                for task_id, result in request.task_results.items()
+            }
+        }
+        if request.HasField("duration"):
+            results["duration"] = request.duration
+        if request.failed:
+            results["failed"] = True
+        accepted = self.leases.complete(request.worker_id, request.batch_id, results)
+        return worker_service_api.request_response_pb2.CompleteResponse(
+            accepted=accepted
+        )
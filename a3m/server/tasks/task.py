@@ -4,12 +4,13 @@ Stored in the `Task` model.
 
 Tasks are passed to MCPClient for processing.
 """
+import collections
+import datetime
 import logging
 import os
+import time
 import uuid
 
-from django.utils import timezone
-
 from a3m.main import models
 from a3m.server.db import auto_close_old_connections
 
@@ -23,8 +24,32 @@ class Task:
 
     Tasks are processed out of process by a `TaskBackend`, which passes them to
     MCPClient.
+
+    Jobs with one task per file keep all of them in memory until the job is
+    done, so tasks are kept small: the replacement values of the job are
+    shared by its tasks, which only hold the values of their file, and output
+    is dropped once written to disk.
     """
 
+    __slots__ = (
+        "uuid",
+        "done",
+        "execute",
+        "arguments",
+        "argv",
+        "stdout_file_path",
+        "stderr_file_path",
+        "job_context",
+        "file_context",
+        "wants_output",
+        "exit_code",
+        "stdout",
+        "stderr",
+        "created",
+        "finished_timestamp",
+        "package_updates",
+    )
+
     def __init__(
         self,
         execute,
@@ -33,22 +58,30 @@ class Task:
         stderr_file_path,
         context,
         wants_output=False,
+        argv=None,
+        file_context=None,
     ):
         self.uuid = uuid.uuid4()
         self.done = False
         self.execute = execute
         self.arguments = arguments
+        # Arguments already split, MCPClient parses ``arguments`` otherwise.
+        self.argv = argv
         self.stdout_file_path = stdout_file_path
         self.stderr_file_path = stderr_file_path
-        self.context = context
+        # Replacement values of the job and, taking priority, of the file.
+        self.job_context = context
+        self.file_context = file_context
 
         self.wants_output = any([wants_output, stdout_file_path, stderr_file_path])
 
         self.exit_code = None
         self.stdout = ""
         self.stderr = ""
+        # Changes made to the package by the client script, if any.
+        self.package_updates = None
 
-        self.start_timestamp = timezone.now()
+        self.created = time.time()
         self.finished_timestamp = None
 
     def __repr__(self):
@@ -56,13 +89,23 @@ class Task:
             self.uuid, self.execute, self.arguments, self.start_timestamp, self.done
         )
 
+    @property
+    def context(self):
+        if self.file_context is None:
+            return self.job_context
+        return collections.ChainMap(self.file_context, self.job_context)
+
+    @property
+    def start_timestamp(self):
+        return datetime.datetime.fromtimestamp(self.created, datetime.timezone.utc)
+
     @classmethod
     @auto_close_old_connections()
     def cleanup_old_db_entries(cls):
         """Update the status of any in progress tasks.
 
-        This command is run on startup.
-        TODO: we could try to recover, instead of just failing.
+        This command is run on startup. Tasks that were done are kept, jobs
+        resumed after a restart don't run them again.
         """
         models.Task.objects.filter(exitcode=None).update(
             exitcode=-1, stderror="MCP shut down while processing."
@@ -78,11 +121,10 @@ class Task:
     def to_db_model(self, job):
         """Returns an instance of the `Task` Django model."""
         job_uuid = job.uuid
-        file_uuid = self.context.get(r"%fileUUID%", "")
+        context = self.context
+        file_uuid = context.get(r"%fileUUID%", "")
         task_exec = job.link.config.get("execute")
-        file_name = os.path.basename(
-            os.path.abspath(self.context[r"%relativeLocation%"])
-        )
+        file_name = os.path.basename(os.path.abspath(context[r"%relativeLocation%"]))
 
         return models.Task(
             taskuuid=self.uuid,
@@ -111,8 +153,13 @@ class Task:
         """
         Write the stdout/stderror we got from MCP Client out to files,
         if necessary.
+
+        The output is dropped afterwards, MCP Client saves it with the task in
+        the database already.
         """
         if self.stdout_file_path and self.stdout:
             self._write_file_to_disk(self.stdout_file_path, self.stdout)
         if self.stderr_file_path and self.stderr:
             self._write_file_to_disk(self.stderr_file_path, self.stderr)
+        self.stdout = ""
+        self.stderr = ""
@@ -1,11 +1,18 @@
+import base64
+import binascii
 import logging
+import queue
+import threading
 
+import grpc
 from google.protobuf import timestamp_pb2
 from google.rpc import code_pb2
 
 from a3m.api.transferservice import v1beta1 as transfer_service_api
+from a3m.main.models import Job
 from a3m.main.models import Task
 from a3m.server import shared_dirs
+from a3m.server.packages import get_package_jobs
 from a3m.server.packages import get_package_status
 from a3m.server.packages import Package
 from a3m.server.packages import PackageNotFoundError
@@ -13,11 +20,101 @@ from a3m.server.packages import PackageNotFoundError
 logger = logging.getLogger(__name__)
 
 
+# Task fields of the API, by the name of the model fields they're read from.
+TASK_FIELDS = {
+    "id": "taskuuid",
+    "file_id": "fileuuid",
+    "exit_code": "exitcode",
+    "filename": "filename",
+    "execution": "execution",
+    "arguments": "arguments",
+    "stdout": "stdout",
+    "stderr": "stderror",
+    "start_time": "starttime",
+    "end_time": "endtime",
+}
+
+
+def _job_message(job, status):
+    start_time = timestamp_pb2.Timestamp()
+    start_time.FromDatetime(job.created_at)
+    return transfer_service_api.request_response_pb2.Job(
+        id=str(job.uuid),
+        name=job.description,
+        group=job.group,
+        link_id=str(job.link.id),
+        status=status,
+        start_time=start_time,
+        skipped_tasks=job.skipped_files,
+    )
+
+
+def _task_message(item, fields):
+    task = transfer_service_api.request_response_pb2.Task()
+    for field in fields:
+        value = item[TASK_FIELDS[field]]
+        if value is None:
+            continue
+        if field in ("start_time", "end_time"):
+            getattr(task, field).FromDatetime(value)
+        else:
+            setattr(task, field, value)
+    return task
+
+
+def _get_tasks(job_id, task_filter, read_mask):
+    """Return the tasks of a job, as dicts, and the fields to send.
+
+    :raises ValueError: if the mask refers to unknown fields.
+    """
+    fields = list(read_mask.paths) or list(TASK_FIELDS)
+    unknown = set(fields) - set(TASK_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown task fields: {', '.join(sorted(unknown))}")
+    queryset = Task.objects.filter(job_id=job_id)
+    if task_filter.failed:
+        queryset = queryset.filter(exitcode__isnull=False).exclude(exitcode=0)
+    if task_filter.filename_prefix:
+        queryset = queryset.filter(filename__startswith=task_filter.filename_prefix)
+    # Loading stdout and stderr is avoided unless they are asked for.
+    columns = {"taskuuid"} | {TASK_FIELDS[field] for field in fields}
+    return queryset.order_by("taskuuid").values(*columns), fields
+
+
+def _encode_page_token(task_id):
+    return base64.urlsafe_b64encode(task_id.encode()).decode()
+
+
+def _decode_page_token(page_token):
+    try:
+        return base64.urlsafe_b64decode(page_token.encode()).decode()
+    except (binascii.Error, UnicodeError):
+        raise ValueError("Invalid page token")
+
+
 class TransferService(transfer_service_api.service_pb2_grpc.TransferServiceServicer):
-    def __init__(self, workflow, package_queue, executor):
+
+    # Seconds between checks of the status of a watched package when no
+    # updates are received, e.g. while it waits in the queue.
+    WATCH_REFRESH_SECS = 10
+
+    # Number of tasks returned by ListTasks by default, and at most.
+    DEFAULT_PAGE_SIZE = 1000
+    MAX_PAGE_SIZE = 10000
+
+    # Number of tasks sent in each StreamTasks response.
+    STREAM_CHUNK_SIZE = 100
+
+    def __init__(self, workflow, package_queue, executor, max_watches=None):
         self.workflow = workflow
         self.package_queue = package_queue
         self.executor = executor
+        # Each watch holds an RPC thread until its package is done, watches
+        # beyond ``max_watches`` are turned down so that other calls, e.g.
+        # Submit, are still served. Clients poll Read instead.
+        self.watch_slots = (
+            threading.BoundedSemaphore(max_watches) if max_watches else None
+        )
 
     def Submit(self, request, context):
         try:
@@ -28,7 +125,10 @@ class TransferService(transfer_service_api.service_pb2_grpc.TransferServiceServi
                 request.name,
                 request.url,
                 request.config,
+                request.priority,
             )
+        except queue.Full:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many packages")
         except Exception as err:
             logger.warning("TransferService.Submit handler error: %s", err)
             context.abort(code_pb2.INTERNAL, "Unknown error")
@@ -36,9 +136,34 @@ class TransferService(transfer_service_api.service_pb2_grpc.TransferServiceServi
             id=str(package.uuid)
         )
 
+    def SubmitBatch(self, request, context):
+        try:
+            packages = Package.create_packages(
+                self.package_queue,
+                self.executor,
+                self.workflow,
+                [
+                    (item.name, item.url, item.config, item.priority)
+                    for item in request.transfers
+                ],
+            )
+        except ValueError as err:
+            context.abort(code_pb2.INVALID_ARGUMENT, str(err))
+        except queue.Full:
+            # Nothing was created.
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many packages")
+        except Exception as err:
+            logger.warning("TransferService.SubmitBatch handler error: %s", err)
+            context.abort(code_pb2.INTERNAL, "Unknown error")
+        return transfer_service_api.request_response_pb2.SubmitBatchResponse(
+            ids=[str(package.uuid) for package in packages]
+        )
+
     def Read(self, request, context):
         try:
-            package_status = get_package_status(self.package_queue, request.id)
+            package_status = get_package_status(
+                self.package_queue, request.id, include_jobs=request.include_jobs
+            )
         except PackageNotFoundError:
             context.abort(code_pb2.NOT_FOUND, "Package not found")
         except Exception as err:
@@ -53,31 +178,127 @@ class TransferService(transfer_service_api.service_pb2_grpc.TransferServiceServi
             resp.jobs.extend(package_status.jobs)
         return resp
 
+    def Watch(self, request, context):
+        if self.watch_slots is not None and not self.watch_slots.acquire(
+            blocking=False
+        ):
+            # Clients check the code, servers only send the ones of grpc.
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many watches")
+        try:
+            yield from self._watch(request, context)
+        finally:
+            if self.watch_slots is not None:
+                self.watch_slots.release()
+
+    def _watch(self, request, context):
+        updates = self.package_queue.watch(request.id)
+
+        # Stop waiting as soon as the RPC terminates, e.g. when the client
+        # goes away. Unlike `is_active`, callbacks are supported by the
+        # contexts of both threaded and asyncio servers.
+        terminated = threading.Event()
+
+        def on_termination():
+            terminated.set()
+            updates.put(None)
+
+        context.add_callback(on_termination)
+        try:
+            try:
+                package_status = get_package_status(
+                    self.package_queue, request.id, include_jobs=True
+                )
+            except PackageNotFoundError:
+                context.abort(code_pb2.NOT_FOUND, "Package not found")
+            except Exception as err:
+                logger.warning("TransferService.Watch handler error: %s", err)
+                context.abort(code_pb2.INTERNAL, "Unknown error")
+            yield transfer_service_api.request_response_pb2.WatchResponse(
+                status=package_status.status,
+                job=package_status.job,
+                jobs=package_status.jobs,
+            )
+            processing = (
+                transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING
+            )
+            while package_status.status == processing:
+                try:
+                    update = updates.get(timeout=self.WATCH_REFRESH_SECS)
+                except queue.Empty:
+                    update = None
+                if terminated.is_set():
+                    break
+                if update is not None:
+                    job, status = update
+                    yield transfer_service_api.request_response_pb2.WatchResponse(
+                        status=processing,
+                        job=job.description,
+                        jobs=[_job_message(job, status)],
+                    )
+                    continue
+                try:
+                    package_status = get_package_status(self.package_queue, request.id)
+                    if package_status.status != processing:
+                        package_status.jobs = get_package_jobs(request.id)
+                except Exception as err:
+                    logger.warning("TransferService.Watch handler error: %s", err)
+                    context.abort(code_pb2.INTERNAL, "Unknown error")
+                if package_status.status != processing:
+                    yield transfer_service_api.request_response_pb2.WatchResponse(
+                        status=package_status.status,
+                        job=package_status.job,
+                        jobs=package_status.jobs,
+                    )
+        finally:
+            self.package_queue.unwatch(request.id, updates)
+
     def ListTasks(self, request, context):
         if not request.job_id:
             context.abort(code_pb2.INVALID_ARGUMENT, "job_id is mandatory")
-        resp = transfer_service_api.request_response_pb2.ListTasksResponse()
-        for item in Task.objects.filter(job_id=request.job_id):
-            start_time = timestamp_pb2.Timestamp()
-            start_time.FromDatetime(item.starttime)
-            end_time = timestamp_pb2.Timestamp()
-            end_time.FromDatetime(item.endtime)
-            resp.tasks.append(
-                transfer_service_api.request_response_pb2.Task(
-                    id=item.pk,
-                    file_id=item.fileuuid,
-                    exit_code=item.exitcode,
-                    filename=item.filename,
-                    execution=item.execution,
-                    arguments=item.arguments,
-                    stdout=item.stdout,
-                    stderr=item.stderror,
-                    start_time=start_time,
-                    end_time=end_time,
-                )
+        if request.page_size < 0:
+            context.abort(code_pb2.INVALID_ARGUMENT, "page_size must be positive")
+        page_size = min(request.page_size or self.DEFAULT_PAGE_SIZE, self.MAX_PAGE_SIZE)
+        try:
+            queryset, fields = _get_tasks(
+                request.job_id, request.filter, request.read_mask
             )
+            if request.page_token:
+                queryset = queryset.filter(
+                    taskuuid__gt=_decode_page_token(request.page_token)
+                )
+        except ValueError as err:
+            context.abort(code_pb2.INVALID_ARGUMENT, str(err))
+        items = list(queryset[: page_size + 1])
+        resp = transfer_service_api.request_response_pb2.ListTasksResponse(
+            skipped_tasks=Job.objects.filter(jobuuid=request.job_id)
+            .values_list("skippedtasks", flat=True)
+            .first()
+            or 0
+        )
+        for item in items[:page_size]:
+            resp.tasks.append(_task_message(item, fields))
+        if len(items) > page_size:
+            resp.next_page_token = _encode_page_token(items[page_size - 1]["taskuuid"])
         return resp
 
+    def StreamTasks(self, request, context):
+        if not request.job_id:
+            context.abort(code_pb2.INVALID_ARGUMENT, "job_id is mandatory")
+        try:
+            queryset, fields = _get_tasks(
+                request.job_id, request.filter, request.read_mask
+            )
+        except ValueError as err:
+            context.abort(code_pb2.INVALID_ARGUMENT, str(err))
+        resp = transfer_service_api.request_response_pb2.StreamTasksResponse()
+        for item in queryset.iterator(chunk_size=self.STREAM_CHUNK_SIZE):
+            resp.tasks.append(_task_message(item, fields))
+            if len(resp.tasks) == self.STREAM_CHUNK_SIZE:
+                yield resp
+                resp = transfer_service_api.request_response_pb2.StreamTasksResponse()
+        if resp.tasks:
+            yield resp
+
     def Empty(self, request, context):
         # TODO: Add check: files should not be deleted if a3m is currently processing.
         resp = transfer_service_api.request_response_pb2.EmptyResponse()
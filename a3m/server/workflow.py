@@ -15,6 +15,7 @@ sets.
 """
 import json
 import os
+import threading
 
 from jsonschema import FormatChecker
 from jsonschema import validate
@@ -32,6 +33,10 @@ ASSETS_DIR = os.path.join(
 
 DEFAULT_WORKFLOW = os.path.join(ASSETS_DIR, "workflow.json")
 
+# Resource class of the links that don't declare one. Client scripts of each
+# class are run by their own set of workers, see ``PoolTaskBackend``.
+DEFAULT_RESOURCE_CLASS = "default"
+
 
 def _invert_job_statuses():
     """Return an inverted dict of job statuses, i.e. indexed by labels."""
@@ -53,6 +58,8 @@ class Workflow:
     def __init__(self, parsed_obj):
         self._src = parsed_obj
         self._decode_links()
+        self._plans = {}  # Values of decision_attrs: WorkflowPlan
+        self._plans_lock = threading.Lock()
 
     def __str__(self):
         return f"Links {len(self.links)}"
@@ -61,6 +68,16 @@ class Workflow:
         self.links = {}
         for link_id, link_obj in self._src["links"].items():
             self.links[link_id] = Link(link_id, link_obj, self)
+        # Processing configuration attributes read by decision links.
+        self.decision_attrs = tuple(
+            sorted(
+                {
+                    link.config["config_attr"]
+                    for link in self.links.values()
+                    if link.is_decision
+                }
+            )
+        )
 
     def get_links(self):
         return self.links
@@ -73,6 +90,73 @@ class Workflow:
             if link.is_initiator:
                 return link
 
+    def get_plan(self, config):
+        """Return the `WorkflowPlan` of a processing configuration.
+
+        Plans only depend on the attributes of the configuration read by
+        decision links, they are compiled once per set of values.
+        """
+        key = tuple(getattr(config, attr, None) for attr in self.decision_attrs)
+        with self._plans_lock:
+            try:
+                return self._plans[key]
+            except KeyError:
+                plan = self._plans[key] = WorkflowPlan(self, config)
+                return plan
+
+
+class WorkflowPlan:
+    """The workflow as it runs for a given processing configuration.
+
+    Decision links choose the next link from the processing configuration
+    alone. A plan resolves them when it's compiled and folds them into the
+    links leading to them, so walking the plan never stops at a decision.
+    """
+
+    def __init__(self, workflow, config):
+        self.workflow = workflow
+        self.choices = {}  # Decision link_id: Link, None if the chain ends.
+        for link in workflow.get_links().values():
+            if link.is_decision:
+                self.choices[link.id] = self._follow_decisions(link, config)
+        self.next_links = {}  # link_id: ({exit_code: Link}, fallback Link)
+        for link in workflow.get_links().values():
+            if link.is_decision:
+                continue
+            self.next_links[link.id] = (
+                {
+                    code: self.resolve(item["link_id"])
+                    for code, item in link["exit_codes"].items()
+                },
+                self.resolve(link["fallback_link_id"]),
+            )
+
+    def _follow_decisions(self, link, config):
+        seen = set()
+        while link is not None and link.is_decision:
+            if link.id in seen:
+                raise ValueError(f"Loop of decision links at link {link.id}")
+            seen.add(link.id)
+            link = self.workflow.links.get(link.get_choice(config))
+        return link
+
+    def resolve(self, link):
+        """Return the link that runs in place of the given link or link ID.
+
+        That's the link itself unless it's a decision link. ``None`` means
+        the chain ends.
+        """
+        if not isinstance(link, Link):
+            link = self.workflow.links.get(link)
+        if link is not None and link.is_decision:
+            return self.choices[link.id]
+        return link
+
+    def get_next_link(self, link, code):
+        """Return the link that runs after ``link`` exits with ``code``."""
+        exit_codes, fallback = self.next_links[link.id]
+        return exit_codes.get(str(code), fallback)
+
 
 class BaseLink:
     def __str__(self):
@@ -142,6 +226,16 @@ class Link(BaseLink):
         """Check if the link is indicated as a terminal link."""
         return self._src.get("end", False)
 
+    @property
+    def is_decision(self):
+        """Check if the link only chooses the next link to run."""
+        return self.config["@manager"] == "linkTaskManagerChoice"
+
+    @property
+    def resource_class(self):
+        """Resource class of the client script the link runs, e.g. ``io``."""
+        return self._src.get("resource_class", DEFAULT_RESOURCE_CLASS)
+
     def get_next_link(self, code):
         code = str(code)
         try:
@@ -150,6 +244,18 @@ class Link(BaseLink):
             link_id = self._src["fallback_link_id"]
         return self._workflow.get_link(link_id)
 
+    def get_choice(self, config):
+        """Return the ID of the link a decision link chooses given a
+        processing configuration, or ``None``.
+        """
+        config_value = getattr(config, self.config["config_attr"], None)
+        if config_value is None:
+            config_value = self.config["default"]
+        for item in self.config["choices"]:
+            if item["value"] == config_value:
+                return item["link_id"]
+        return None
+
     def get_status_id(self, code):
         """Return the expected Job status ID given an exit code."""
         code = str(code)
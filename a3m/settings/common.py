@@ -14,13 +14,50 @@ from a3m.appconfig import Config
 CONFIG_MAPPING = {
     "debug": {"section": "a3m", "option": "debug", "type": "boolean"},
     "batch_size": {"section": "a3m", "option": "batch_size", "type": "int"},
+    "worker_processes": {
+        "section": "a3m",
+        "option": "worker_processes",
+        "type": "int",
+    },
     "concurrent_packages": {
         "section": "a3m",
         "option": "concurrent_packages",
         "type": "int",
     },
+    "normalization_concurrency": {
+        "section": "a3m",
+        "option": "normalization_concurrency",
+        "type": "int",
+    },
     "rpc_threads": {"section": "a3m", "option": "rpc_threads", "type": "int"},
     "worker_threads": {"section": "a3m", "option": "worker_threads", "type": "int"},
+    "asyncio": {"section": "a3m", "option": "asyncio", "type": "boolean"},
+    "scheduling_policy": {
+        "section": "a3m",
+        "option": "scheduling_policy",
+        "type": "string",
+    },
+    "resource_class_workers": {
+        "section": "a3m",
+        "option": "resource_class_workers",
+        "type": "string",
+    },
+    "task_backend": {"section": "a3m", "option": "task_backend", "type": "string"},
+    "remote_lease_duration": {
+        "section": "a3m",
+        "option": "remote_lease_duration",
+        "type": "float",
+    },
+    "worker_bind_address": {
+        "section": "a3m",
+        "option": "worker_bind_address",
+        "type": "string",
+    },
+    "subprocess_timeout": {
+        "section": "a3m",
+        "option": "subprocess_timeout",
+        "type": "float",
+    },
     "shared_directory": {
         "section": "a3m",
         "option": "shared_directory",
@@ -141,6 +178,13 @@ CONFIG_DEFAULTS = """[a3m]
 debug = False
 batch_size = 128
 rpc_threads = 4
+asyncio = False
+scheduling_policy = fair_share  ; Options: fair_share or fifo
+resource_class_workers =  ; e.g. io=8, cpu=2
+task_backend = pool  ; Options: pool or remote
+remote_lease_duration = 60  ; Seconds
+worker_bind_address = 127.0.0.1:7001  ; Worker service, remote task backend only
+subprocess_timeout = 0  ; Seconds, 0 for no limit
 prometheus_bind_address =
 prometheus_bind_port =
 time_zone = UTC
@@ -300,6 +344,15 @@ else:
     logging.config.dictConfig(LOGGING)
 
 
+def worker_processes_default():
+    """Default to CPU count, or to a single in-process worker with SQLite."""
+    if "sqlite" in DATABASES["default"]["ENGINE"]:
+        # Client scripts write to the database heavily, more writers would
+        # only contend for the SQLite lock.
+        return 1
+    return multiprocessing.cpu_count()
+
+
 def concurrent_packages_default():
     """Default to 1/2 of CPU count, rounded up."""
     if "sqlite" in DATABASES["default"]["ENGINE"]:
@@ -310,12 +363,28 @@ def concurrent_packages_default():
     return int(math.ceil(cpu_count / 2))
 
 
+def normalization_concurrency_default():
+    """Share the CPUs between the worker processes."""
+    return max(multiprocessing.cpu_count() // max(WORKER_PROCESSES, 1), 1)
+
+
 BATCH_SIZE = config.get("batch_size")
+WORKER_PROCESSES = config.get("worker_processes", default=worker_processes_default())
+NORMALIZATION_CONCURRENCY = config.get(
+    "normalization_concurrency", default=normalization_concurrency_default()
+)
 CONCURRENT_PACKAGES = config.get(
     "concurrent_packages", default=concurrent_packages_default()
 )
 RPC_THREADS = config.get("rpc_threads")
 WORKER_THREADS = config.get("worker_threads", default=multiprocessing.cpu_count() + 1)
+ASYNCIO = config.get("asyncio")
+SCHEDULING_POLICY = config.get("scheduling_policy")
+RESOURCE_CLASS_WORKERS = config.get("resource_class_workers")
+TASK_BACKEND = config.get("task_backend")
+REMOTE_LEASE_DURATION = config.get("remote_lease_duration")
+WORKER_BIND_ADDRESS = config.get("worker_bind_address")
+SUBPROCESS_TIMEOUT = config.get("subprocess_timeout") or None
 REMOVABLE_FILES = config.get("removable_files")
 CLAMAV_SERVER = config.get("clamav_server")
 CLAMAV_PASS_BY_STREAM = config.get("clamav_pass_by_stream")
@@ -2,7 +2,13 @@ import uuid
 
 import pytest
 
+from a3m.client.clientScripts import identify_file_format as identify_file_format_module
+from a3m.client.clientScripts.identify_file_format import call
+from a3m.client.clientScripts.identify_file_format import identification_cache
 from a3m.client.clientScripts.identify_file_format import identify_file_format
+from a3m.client.clientScripts.identify_file_format import identify_paths
+from a3m.client.job import Job
+from a3m.main.models import Agent
 from a3m.main.models import Event
 from a3m.main.models import File
 from a3m.main.models import FileFormatVersion
@@ -71,3 +77,98 @@ def test_identify_file_format(file_obj, file_path):
         format_name="Python Script File",
         format_registry_key="fmt/938",
     )
+
+
+def test_call_identifies_files_in_bulk(
+    transfer, tmp_path, file_path, django_assert_max_num_queries
+):
+    for pk in (
+        Agent.objects.DEFAULT_SYSTEM_AGENT_PK,
+        Agent.objects.DEFAULT_ORGANIZATION_AGENT_PK,
+    ):
+        Agent.objects.create(pk=pk)
+    file_objs = []
+    for item in range(10):
+        file_obj_path = "".join(
+            [transfer.currentlocation, str(file_path.relative_to(tmp_path))]
+        )
+        file_objs.append(
+            File.objects.create(
+                uuid=uuid.uuid4(),
+                transfer=transfer,
+                originallocation=file_obj_path,
+                currentlocation=file_obj_path,
+            )
+        )
+    jobs = [
+        Job(
+            "identify_file_format",
+            str(uuid.uuid4()),
+            [str(file_path), str(file_obj.uuid)],
+        )
+        for file_obj in file_objs
+    ]
+    jobs.append(
+        Job("identify_file_format", str(uuid.uuid4()), [str(file_path), "missing"])
+    )
+
+    with django_assert_max_num_queries(15):
+        call(jobs)
+
+    assert [job.get_exit_code() for job in jobs] == [0] * 10 + [1]
+    assert FileID.objects.filter(format_registry_key="fmt/938").count() == 10
+    assert (
+        Event.objects.filter(
+            event_type="format identification", event_outcome="Positive"
+        )
+        .filter(agents__pk=Agent.objects.DEFAULT_SYSTEM_AGENT_PK)
+        .count()
+        == 10
+    )
+
+    # Nothing is identified twice when re-identification is disabled.
+    for job in jobs[:10]:
+        job.args.append("--disable-reidentify")
+    call(jobs[:10])
+
+    assert FileID.objects.count() == 10
+
+
+def test_identify_paths_caches_results(tmp_path, file_path, mocker):
+    identification_cache.clear()
+    other_path = tmp_path / "other.py"
+    other_path.write_text("print('hello')")
+    missing_path = tmp_path / "missing.py"
+    scan = mocker.spy(identify_file_format_module, "_scan")
+
+    results = identify_paths([str(file_path), str(other_path), str(missing_path)])
+
+    assert results[str(file_path)] == "fmt/938"
+    assert results[str(other_path)] == "fmt/938"
+    assert isinstance(results[str(missing_path)], OSError)
+    scan.assert_called_once_with([str(file_path), str(other_path)])
+
+    # Unchanged files are not scanned again, modified files are.
+    other_path.write_text("print('hello, world')")
+    results = identify_paths([str(file_path), str(other_path)])
+
+    assert results == {str(file_path): "fmt/938", str(other_path): "fmt/938"}
+    scan.assert_called_with([str(other_path)])
+
+
+def test_scan_matches_results_by_filename(mocker):
+    mocker.patch(
+        "a3m.client.clientScripts.identify_file_format.pygfried.identify_many",
+        return_value={
+            "files": [
+                {"filename": "/b", "errors": "", "matches": [{"id": "fmt/2"}]},
+                {"filename": "/a", "errors": "", "matches": [{"id": "fmt/1"}]},
+            ]
+        },
+    )
+
+    results = identify_file_format_module._scan(["/a", "/b", "/c"])
+
+    assert results["/a"] == "fmt/1"
+    assert results["/b"] == "fmt/2"
+    assert isinstance(results["/c"], Exception)
@@ -32,3 +32,15 @@ def test_job_encoding():
     assert job.UUID in job_dump
     assert stderr in job_dump
     assert stdout in job_dump
+
+
+def test_job_update_package():
+    job = Job(name="somejob", uuid=str(uuid4()), args=[])
+
+    job.update_package(sip_path="%sharedPath%sip/", context={"%a%": "1"})
+    job.update_package(context={"%b%": "2"})
+
+    assert job.package_updates == {
+        "sip_path": "%sharedPath%sip/",
+        "context": {"%a%": "1", "%b%": "2"},
+    }
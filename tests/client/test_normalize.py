@@ -0,0 +1,162 @@
+import threading
+import time
+import uuid
+
+import pytest
+from django.utils import timezone
+
+from a3m.client.clientScripts.normalize import call
+from a3m.client.clientScripts.normalize import CommandSlots
+from a3m.client.clientScripts.normalize import NormalizationRecords
+from a3m.client.job import Job
+from a3m.fpr.models import FormatVersion
+from a3m.fpr.models import FPCommand
+from a3m.fpr.models import FPRule
+from a3m.main.models import Agent
+from a3m.main.models import Derivation
+from a3m.main.models import Event
+from a3m.main.models import File
+from a3m.main.models import FileFormatVersion
+from a3m.main.models import SIP
+
+
+def test_command_slots_bound_concurrent_weight():
+    slots = CommandSlots(4)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def run(weight):
+        with slots.slot(weight):
+            with lock:
+                running.append(min(weight, slots.limit))
+                peak.append(sum(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(min(weight, slots.limit))
+
+    threads = [
+        threading.Thread(target=run, args=(weight,))
+        for weight in (1, 2, 4, 1, 8, 1, 2, 1)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(peak) == len(threads)
+    assert max(peak) <= 4
+    assert slots.used == 0
+
+
+@pytest.fixture()
+def sip(db):
+    for pk in (
+        Agent.objects.DEFAULT_SYSTEM_AGENT_PK,
+        Agent.objects.DEFAULT_ORGANIZATION_AGENT_PK,
+    ):
+        Agent.objects.create(pk=pk)
+    return SIP.objects.create(uuid=uuid.uuid4(), currentpath=r"%sharedPath%")
+
+
+def test_normalization_records_save(sip, tmp_path, settings):
+    settings.DEFAULT_CHECKSUM_ALGORITHM = "md5"
+    original = File.objects.create(
+        uuid=uuid.uuid4(), sip=sip, currentlocation="%SIPDirectory%objects/a.png"
+    )
+    output_uuid = str(uuid.uuid4())
+    output_path = tmp_path / "a.tif"
+    output_path.write_bytes(b"tiff")
+    today = timezone.now()
+
+    records = NormalizationRecords()
+    records.add_file(
+        output_uuid,
+        str(output_path),
+        "%SIPDirectory%objects/a.tif",
+        sip.uuid,
+        today,
+        use="preservation",
+    )
+    records.add_derivation_event(
+        original_uuid=original.uuid,
+        output_uuid=output_uuid,
+        event_detail_output="detail",
+        outcome_detail_note="%SIPDirectory%objects/a.tif",
+        today=today,
+    )
+    records.save()
+
+    output = File.objects.get(uuid=output_uuid)
+    assert output.filegrpuse == "preservation"
+    assert output.size == 4
+    assert output.checksum == "ba75e603168423a985abe2d8c2e3c4d5"
+    assert output.checksumtype == "md5"
+    assert set(
+        Event.objects.filter(file_uuid=output).values_list("event_type", flat=True)
+    ) == {"creation", "message digest calculation"}
+    derivation = Derivation.objects.get(source_file=original, derived_file=output)
+    assert derivation.event.event_type == "normalization"
+    assert derivation.event.agents.count() == 2
+
+
+def test_call_normalizes_files_in_bulk(sip, tmp_path, settings):
+    settings.NORMALIZATION_CONCURRENCY = 2
+    sip.currentpath = f"{tmp_path}/"
+    sip.save()
+    objects_dir = tmp_path / "objects"
+    objects_dir.mkdir()
+    format_version = FormatVersion.active.get(pronom_id="fmt/938")
+    command = FPCommand.objects.create(
+        description="Copy",
+        command='cp "%inputFile%" "%outputFilePath%.py"',
+        script_type="command",
+        output_location="%outputFilePath%.py",
+        output_format=format_version,
+        command_usage="normalization",
+    )
+    FPRule.objects.filter(purpose=FPRule.PRESERVATION, format=format_version).update(
+        enabled=False
+    )
+    FPRule.objects.create(
+        purpose=FPRule.PRESERVATION, command=command, format=format_version
+    )
+
+    jobs = []
+    for name in ("a", "b", "c", "d", "e"):
+        path = objects_dir / f"{name}.py"
+        path.write_text(name)
+        original = File.objects.create(
+            uuid=uuid.uuid4(),
+            sip=sip,
+            currentlocation=f"%SIPDirectory%objects/{name}.py",
+            originallocation=f"%SIPDirectory%objects/{name}.py",
+            filegrpuse="original",
+        )
+        FileFormatVersion.objects.create(
+            file_uuid=original, format_version=format_version
+        )
+        jobs.append(
+            Job(
+                "normalize",
+                str(uuid.uuid4()),
+                [
+                    str(original.uuid),
+                    str(path),
+                    f"{tmp_path}/",
+                    str(sip.uuid),
+                    str(uuid.uuid4()),
+                    "original",
+                ],
+            )
+        )
+
+    call(jobs)
+
+    assert [job.get_exit_code() for job in jobs] == [0] * 5
+    outputs = File.objects.filter(filegrpuse="preservation")
+    assert outputs.count() == 5
+    assert Derivation.objects.filter(derived_file__in=outputs).count() == 5
+    for output in outputs:
+        assert output.checksum
+        assert output.fileformatversion_set.get().format_version == format_version
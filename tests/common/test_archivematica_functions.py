@@ -0,0 +1,76 @@
+import hashlib
+
+import pytest
+
+from a3m import archivematicaFunctions
+from a3m.archivematicaFunctions import ChecksumCache
+from a3m.archivematicaFunctions import get_file_checksum
+from a3m.archivematicaFunctions import get_file_checksums
+
+
+@pytest.fixture
+def checksum_cache(mocker):
+    cache = ChecksumCache(maxsize=2)
+    mocker.patch.object(archivematicaFunctions, "checksum_cache", cache)
+    return cache
+
+
+def test_get_file_checksum_is_cached(tmp_path, mocker, checksum_cache):
+    hash_file = mocker.spy(archivematicaFunctions, "hash_file")
+    path = tmp_path / "file"
+    path.write_bytes(b"foo")
+
+    assert get_file_checksum(str(path)) == hashlib.sha256(b"foo").hexdigest()
+    assert get_file_checksum(str(path)) == hashlib.sha256(b"foo").hexdigest()
+    assert hash_file.call_count == 1
+
+    # Other algorithms get their own entries.
+    assert get_file_checksum(str(path), "md5") == hashlib.md5(b"foo").hexdigest()
+    assert hash_file.call_count == 2
+
+    # Changing the file invalidates its entries.
+    path.write_bytes(b"foobar")
+    assert get_file_checksum(str(path)) == hashlib.sha256(b"foobar").hexdigest()
+    assert hash_file.call_count == 3
+
+
+def test_get_file_checksum_survives_moves(tmp_path, mocker, checksum_cache):
+    hash_file = mocker.spy(archivematicaFunctions, "hash_file")
+    path = tmp_path / "file"
+    path.write_bytes(b"foo")
+    get_file_checksum(str(path))
+
+    moved = tmp_path / "moved"
+    path.rename(moved)
+
+    assert get_file_checksum(str(moved)) == hashlib.sha256(b"foo").hexdigest()
+    assert hash_file.call_count == 1
+
+
+def test_get_file_checksums_reuses_cache(tmp_path, mocker, checksum_cache):
+    paths = []
+    for index in range(2):
+        path = tmp_path / f"file{index}"
+        path.write_bytes(b"foo%d" % index)
+        paths.append(str(path))
+    get_file_checksum(paths[0])
+    hash_files = mocker.spy(archivematicaFunctions, "hash_files")
+
+    assert get_file_checksums(paths) == [
+        hashlib.sha256(b"foo0").hexdigest(),
+        hashlib.sha256(b"foo1").hexdigest(),
+    ]
+    assert hash_files.call_args.args[0] == [paths[1]]
+
+
+def test_checksum_cache_evicts_least_recently_used():
+    cache = ChecksumCache(maxsize=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
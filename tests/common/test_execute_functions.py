@@ -54,3 +54,12 @@ def test_capture_output():
     )
     assert std_out.strip() == "out"
     assert std_err.strip() == "error"
+
+
+def test_subprocess_timeout_setting(settings):
+    settings.SUBPROCESS_TIMEOUT = 0.1
+
+    ret, std_out, std_err = execsub.executeOrRun("command", ["sleep", "10"])
+
+    assert ret < 0
+    assert "Process killed after 0.1 seconds." in std_err
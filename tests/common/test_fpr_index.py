@@ -0,0 +1,92 @@
+import uuid
+
+import pytest
+
+from a3m.fpr.index import rule_index
+from a3m.fpr.models import FormatVersion
+from a3m.fpr.models import FPCommand
+from a3m.fpr.models import FPRule
+from a3m.main.models import File
+from a3m.main.models import FileFormatVersion
+
+
+@pytest.fixture
+def format_version(db):
+    rule_index.invalidate()
+    return FormatVersion.active.get(pronom_id="fmt/938")
+
+
+@pytest.fixture
+def rule(format_version):
+    command = FPCommand.objects.create(
+        description="Validate Python script",
+        command="python -m py_compile %fileFullName%",
+        script_type="command",
+        command_usage="validation",
+    )
+    return FPRule.objects.create(
+        purpose=FPRule.VALIDATION, command=command, format=format_version
+    )
+
+
+def test_get_rules(format_version, rule):
+    assert rule_index.get_rules(FPRule.VALIDATION, format_version.uuid) == [rule]
+    assert rule_index.get_rules(FPRule.VALIDATION, str(format_version.uuid)) == [rule]
+    assert rule in rule_index.get_rules(FPRule.VALIDATION)
+    assert rule_index.get_rules(FPRule.THUMBNAIL, format_version.uuid) == []
+
+
+def test_get_rules_does_not_query_again(
+    format_version, rule, django_assert_num_queries
+):
+    rule_index.get_rules(FPRule.VALIDATION, format_version.uuid)
+
+    with django_assert_num_queries(0):
+        rules = rule_index.get_rules(FPRule.VALIDATION, format_version.uuid)
+        assert rules[0].command.description == "Validate Python script"
+
+
+def test_index_is_refreshed_when_rules_change(format_version, rule):
+    assert rule_index.get_rules(FPRule.VALIDATION, format_version.uuid) == [rule]
+
+    rule.enabled = False
+    rule.save()
+
+    assert rule_index.get_rules(FPRule.VALIDATION, format_version.uuid) == []
+
+
+def test_get_file_format_version(format_version):
+    file_obj = File.objects.create(uuid=uuid.uuid4())
+    assert rule_index.get_file_format_version(file_obj.uuid) is None
+
+    FileFormatVersion.objects.create(file_uuid=file_obj, format_version=format_version)
+    assert rule_index.get_file_format_version(file_obj.uuid) == format_version.uuid
+
+    format_version.enabled = False
+    format_version.save()
+    assert rule_index.get_file_format_version(file_obj.uuid) is None
+    assert (
+        rule_index.get_file_format_version(file_obj.uuid, active=False)
+        == format_version.uuid
+    )
+
+
+def test_get_format_versions(format_version, rule):
+    assert format_version.uuid in rule_index.get_format_versions(FPRule.VALIDATION)
+    assert rule_index.get_format_versions("unknown") == frozenset()
+
+
+def test_get_file_format_versions(format_version, django_assert_num_queries):
+    identified = File.objects.create(uuid=uuid.uuid4())
+    FileFormatVersion.objects.create(
+        file_uuid=identified, format_version=format_version
+    )
+    unidentified = File.objects.create(uuid=uuid.uuid4())
+    rule_index.get_rules(FPRule.VALIDATION)
+
+    with django_assert_num_queries(1):
+        result = rule_index.get_file_format_versions(
+            [str(identified.uuid), str(unidentified.uuid), "None"]
+        )
+
+    assert result == {str(identified.uuid): format_version.uuid}
@@ -0,0 +1,48 @@
+import hashlib
+
+import pytest
+
+from a3m import hashing
+
+
+CONTENTS = b"abcdefghij" * 100000
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for index in range(5):
+        path = tmp_path / f"file{index}"
+        path.write_bytes(CONTENTS[: index * 100000])
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize("mmap_threshold", [1, 10**9], ids=["mmap", "read"])
+def test_hash_file(files, mocker, mmap_threshold):
+    mocker.patch.object(hashing, "MMAP_THRESHOLD", mmap_threshold)
+    mocker.patch.object(hashing, "READ_BUFFER_SIZE", 4096)
+
+    for path in files:
+        with open(path, "rb") as file_:
+            contents = file_.read()
+        assert hashing.hash_file(path, ("md5", "sha1", "sha256", "sha512")) == {
+            "md5": hashlib.md5(contents).hexdigest(),
+            "sha1": hashlib.sha1(contents).hexdigest(),
+            "sha256": hashlib.sha256(contents).hexdigest(),
+            "sha512": hashlib.sha512(contents).hexdigest(),
+        }
+
+
+def test_hash_files(files):
+    results = list(hashing.hash_files(files, ("sha256",), max_workers=2))
+
+    assert [path for path, checksums in results] == files
+    assert [checksums for path, checksums in results] == [
+        hashing.hash_file(path) for path in files
+    ]
+
+
+def test_hash_files_raises_errors(files):
+    with pytest.raises(FileNotFoundError):
+        list(hashing.hash_files(files + ["/nonexistent"]))
@@ -0,0 +1,52 @@
+import os
+import time
+
+from a3m import process_runner
+
+
+def test_ring_buffer_keeps_the_end_of_the_output():
+    buffer = process_runner.RingBuffer(10)
+    for chunk in (b"abcd", b"efgh", b"ijkl", b"mnop"):
+        buffer.write(chunk)
+
+    assert buffer.getvalue() == b"[... 6 bytes truncated ...]\nghijklmnop"
+
+
+def test_run_sync_collects_output():
+    result = process_runner.run_sync(
+        ["sh", "-c", 'cat; echo "$A3M_TEST" >&2; exit 3'],
+        stdin=b"input",
+        env_updates={"A3M_TEST": "value"},
+    )
+
+    assert result == (3, b"input", b"value\n", False)
+
+
+def test_run_sync_truncates_output():
+    result = process_runner.run_sync(["sh", "-c", "seq 1 10000"], max_output_size=100)
+
+    assert result.stdout.startswith(b"[... ")
+    assert result.stdout.endswith(b"9999\n10000\n")
+
+
+def test_run_sync_kills_processes_after_timeout():
+    start = time.monotonic()
+    result = process_runner.run_sync(["sleep", "10"], timeout=0.1)
+
+    assert time.monotonic() - start < 5
+    assert result.timed_out
+    assert result.exit_code < 0
+    assert b"Process killed after 0.1 seconds." in result.stderr
+
+
+def test_script_cache_reuses_files(tmp_path):
+    cache = process_runner.ScriptCache()
+    path = cache.get_path("#!/bin/sh\necho hello\n")
+
+    assert cache.get_path("#!/bin/sh\necho hello\n") == path
+    assert cache.get_path("#!/bin/sh\necho bye\n") != path
+    assert os.access(path, os.X_OK)
+    assert process_runner.run_sync([path]).stdout == b"hello\n"
+
+    cache.clear()
+    assert not os.path.exists(path)
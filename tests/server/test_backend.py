@@ -1,9 +1,26 @@
+import asyncio
+import concurrent.futures
+import datetime
+import queue
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import grpc
 import pytest
 
+from a3m.api.workerservice import v1beta1 as worker_service_api
+from a3m.client import worker
+from a3m.client.remote_worker import RemoteWorker
+from a3m.client.remote_worker import WorkerServiceClient
 from a3m.server.jobs import Job
 from a3m.server.tasks import get_task_backend
+from a3m.server.tasks import PoolTaskBackend
+from a3m.server.tasks import RemoteTaskBackend
 from a3m.server.tasks import Task
 from a3m.server.tasks import TaskBackend
+from a3m.server.tasks.backends.remote_backend import BatchLeases
+from a3m.server.tasks.backends.remote_backend import WorkerLostError
+from a3m.server.tasks.backends.remote_backend import WorkerService
 
 
 class MockJob(Job):
@@ -32,6 +49,22 @@ def simple_task(request):
     )
 
 
+@pytest.fixture
+def mock_execute_command(mocker):
+    """Run batches with a mock of ``execute_command`` and keep tasks off the
+    database and the disk. Tests set its ``side_effect``.
+    """
+    mocker.patch("a3m.server.tasks.backends.pool_backend.Task.bulk_log")
+    mocker.patch("a3m.server.tasks.backends.pool_backend.Task.write_output")
+    mocker.patch("a3m.server.tasks.backends.pool_backend.init_counter_labels")
+    execute_command = mocker.patch(
+        "a3m.server.tasks.backends.pool_backend.execute_command"
+    )
+    # Remote workers import it from the client.
+    mocker.patch("a3m.client.mcp.execute_command", new=execute_command)
+    return execute_command
+
+
 def format_result(task_results):
     """Accepts task results as a tuple of (uuid, result_dict)."""
     response = {"task_results": {}}
@@ -53,7 +86,7 @@ def test_multiple_batches(simple_job, simple_task, mocker):
     mocker.patch("a3m.server.tasks.backends.pool_backend.init_counter_labels")
     mocker.patch.object(TaskBackend, "TASK_BATCH_SIZE", 2)
 
-    def execute_command(task_name: str, batch_payload):
+    def execute_command(task_name: str, batch_payload, on_task_result=None):
         assert task_name == "test_v0.0"
         return {
             "task_results": {
@@ -85,3 +118,458 @@ def test_multiple_batches(simple_job, simple_task, mocker):
     assert results[1].exit_code == 0
     assert results[2].done is True
     assert results[2].exit_code == 0
+
+
+def test_worker_processes(mocker):
+    mocker.patch("a3m.server.tasks.backends.pool_backend.init_counter_labels")
+    executor_cls = mocker.patch("concurrent.futures.ProcessPoolExecutor")
+
+    backend = PoolTaskBackend(worker_processes=4)
+
+    assert backend.executor is executor_cls.return_value
+    assert executor_cls.call_args.kwargs["max_workers"] == 4
+    assert executor_cls.call_args.kwargs["initializer"] is worker.init_worker
+    assert backend.batch_runner is worker.run_batch
+    assert backend.executor.submit.call_count == 4  # Pre-warmed.
+
+
+@pytest.mark.django_db
+def test_broken_worker_fails_batch(simple_job, mocker, mock_execute_command):
+    mocker.patch(
+        "a3m.server.tasks.backends.pool_backend.run_batch",
+        side_effect=BrokenProcessPool("worker died"),
+    )
+
+    backend = PoolTaskBackend(worker_processes=1)
+    for item in range(2):
+        backend.submit_task(
+            simple_job,
+            Task("command", "", None, None, {r"%relativeLocation%": "testfile"}),
+        )
+
+    results = list(backend.wait_for_results(simple_job))
+
+    assert len(results) == 2
+    assert all(task.done and task.exit_code == 1 for task in results)
+
+
+def test_batch_size_follows_task_duration(simple_job, mocker, mock_execute_command):
+    mocker.patch.object(TaskBackend, "TASK_BATCH_SIZE", 8)
+
+    def execute_command(task_name: str, batch_payload, on_task_result=None):
+        return {
+            "task_results": {
+                task_id: {"exitCode": 0} for task_id in batch_payload["tasks"]
+            },
+            "duration": 4.0 * len(batch_payload["tasks"]),
+        }
+
+    mock_execute_command.side_effect = execute_command
+
+    backend = PoolTaskBackend(worker_processes=1)
+    assert backend.get_batch_size(simple_job) == 8
+
+    for item in range(8):
+        backend.submit_task(
+            simple_job,
+            Task("command", "", None, None, {r"%relativeLocation%": "testfile"}),
+        )
+    list(backend.wait_for_results(simple_job))
+    assert mock_execute_command.call_count == 1
+
+    # Tasks take 4 seconds each, we can fit two of them in a batch.
+    assert backend.get_batch_size(simple_job) == 2
+
+    for item in range(8):
+        backend.submit_task(
+            simple_job,
+            Task("command", "", None, None, {r"%relativeLocation%": "testfile"}),
+        )
+    list(backend.wait_for_results(simple_job))
+    assert mock_execute_command.call_count == 5
+
+
+def test_streamed_task_results(simple_job, mock_execute_command):
+    batch_may_finish = threading.Event()
+
+    def execute_command(task_name: str, batch_payload, on_task_result=None):
+        task_ids = list(batch_payload["tasks"])
+        on_task_result(task_ids[0], {"exitCode": 0})
+        batch_may_finish.wait(timeout=5)
+        return {"task_results": {task_id: {"exitCode": 1} for task_id in task_ids}}
+
+    mock_execute_command.side_effect = execute_command
+
+    backend = PoolTaskBackend(worker_processes=1)
+    tasks = [
+        Task("command", "", None, None, {r"%relativeLocation%": "testfile"})
+        for item in range(3)
+    ]
+    for task in tasks:
+        backend.submit_task(simple_job, task)
+
+    results = backend.wait_for_results(simple_job)
+
+    # The first task is done while the batch is still running.
+    first = next(results)
+    assert first is tasks[0]
+    assert first.done is True
+    assert first.exit_code == 0
+    assert not batch_may_finish.is_set()
+
+    batch_may_finish.set()
+    rest = list(results)
+
+    assert rest == tasks[1:]
+    assert all(task.done and task.exit_code == 1 for task in rest)
+
+    backend.shutdown()
+
+
+def test_failed_batch_overrides_streamed_results(
+    simple_job, mocker, mock_execute_command
+):
+    batch_may_finish = threading.Event()
+
+    def execute_command(task_name: str, batch_payload, on_task_result=None):
+        task_ids = list(batch_payload["tasks"])
+        on_task_result(task_ids[0], {"exitCode": 0})
+        batch_may_finish.wait(timeout=5)
+        raise Exception("Client script crashed")
+
+    mock_execute_command.side_effect = execute_command
+    mocker.patch(
+        "a3m.server.tasks.backends.pool_backend.fail_all_tasks",
+        side_effect=lambda payload, reason: {
+            "task_results": {task_id: {"exitCode": 1} for task_id in payload["tasks"]},
+            "failed": True,
+        },
+    )
+
+    backend = PoolTaskBackend(worker_processes=1)
+    tasks = [
+        Task("command", "", None, None, {r"%relativeLocation%": "testfile"})
+        for item in range(3)
+    ]
+    for task in tasks:
+        backend.submit_task(simple_job, task)
+
+    results = backend.wait_for_results(simple_job)
+    first = next(results)
+    assert first is tasks[0]
+    assert first.exit_code == 0
+
+    batch_may_finish.set()
+    rest = list(results)
+
+    # The streamed task is failed with the rest of the batch, each task is
+    # yielded once.
+    assert rest == tasks[1:]
+    assert all(task.done and task.exit_code == 1 for task in tasks)
+    assert simple_job.exit_code == 1
+    assert Task.write_output.call_count == 3
+
+    backend.shutdown()
+
+
+def test_wait_for_results_async(simple_job, mock_execute_command):
+    batch_may_finish = threading.Event()
+
+    def execute_command(task_name: str, batch_payload, on_task_result=None):
+        task_ids = list(batch_payload["tasks"])
+        on_task_result(task_ids[0], {"exitCode": 0})
+        batch_may_finish.wait(timeout=5)
+        return {"task_results": {task_id: {"exitCode": 1} for task_id in task_ids}}
+
+    mock_execute_command.side_effect = execute_command
+
+    backend = PoolTaskBackend(worker_processes=1)
+    tasks = [
+        Task("command", "", None, None, {r"%relativeLocation%": "testfile"})
+        for item in range(3)
+    ]
+    for task in tasks:
+        backend.submit_task(simple_job, task)
+
+    async def main():
+        results = backend.wait_for_results_async(simple_job)
+
+        # The event loop is free while the batch is running.
+        first = await asyncio.wait_for(results.__anext__(), 1.0)
+        assert first is tasks[0]
+        assert first.exit_code == 0
+        assert not batch_may_finish.is_set()
+
+        batch_may_finish.set()
+        return [task async for task in results]
+
+    rest = asyncio.run(main())
+
+    assert rest == tasks[1:]
+    assert all(task.done and task.exit_code == 1 for task in rest)
+
+    backend.shutdown()
+
+
+def test_full_batches_run_while_tasks_are_submitted(
+    simple_job, mocker, mock_execute_command
+):
+    mocker.patch.object(TaskBackend, "TASK_BATCH_SIZE", 1)
+    mocker.patch.object(PoolTaskBackend, "MAX_IN_FLIGHT_BATCHES_PER_WORKER", 2)
+    batch_started = threading.Event()
+    batch_may_finish = threading.Event()
+
+    def execute_command(task_name: str, batch_payload, on_task_result=None):
+        batch_started.set()
+        batch_may_finish.wait(timeout=5)
+        return {
+            "task_results": {
+                task_id: {"exitCode": 0} for task_id in batch_payload["tasks"]
+            }
+        }
+
+    mock_execute_command.side_effect = execute_command
+
+    backend = PoolTaskBackend(worker_processes=1)
+    for item in range(2):
+        backend.submit_task(
+            simple_job,
+            Task("command", "", None, None, {r"%relativeLocation%": "testfile"}),
+        )
+
+    # The first batch runs before the job waits for results.
+    assert batch_started.wait(timeout=5)
+
+    # Two batches are in flight already, the next one waits for them.
+    submitted = threading.Event()
+
+    def submit():
+        backend.submit_task(
+            simple_job,
+            Task("command", "", None, None, {r"%relativeLocation%": "testfile"}),
+        )
+        submitted.set()
+
+    submitter = threading.Thread(target=submit)
+    submitter.start()
+    assert not submitted.wait(timeout=0.2)
+
+    batch_may_finish.set()
+    submitter.join(timeout=5)
+    assert submitted.is_set()
+
+    results = list(backend.wait_for_results(simple_job))
+    assert len(results) == 3
+    assert all(task.done and task.exit_code == 0 for task in results)
+
+    backend.shutdown()
+
+
+def test_resource_classes_run_in_their_own_workers(mocker):
+    mocker.patch("a3m.server.tasks.backends.pool_backend.init_counter_labels")
+    executor = mocker.patch("concurrent.futures.ProcessPoolExecutor")
+
+    backend = PoolTaskBackend(worker_processes=3, resource_class_workers={"io": 2})
+    with backend.executor_lock:
+        backend._get_executor("io")
+        backend._get_executor("cpu")
+
+    assert [call.kwargs["max_workers"] for call in executor.call_args_list] == [
+        3,
+        2,
+        3,
+    ]
+    assert backend.get_max_in_flight_batches("io") == 4
+
+    backend.shutdown()
+
+
+def test_resource_classes_share_the_server_thread(mocker, mock_execute_command):
+    running = []
+
+    def execute_command(task_name: str, batch_payload, on_task_result=None):
+        running.append(task_name)
+        assert running == [task_name]
+        running.remove(task_name)
+        return {
+            "task_results": {
+                task_id: {"exitCode": 0} for task_id in batch_payload["tasks"]
+            }
+        }
+
+    mock_execute_command.side_effect = execute_command
+    cpu_job = MockJob(mocker.Mock(), mocker.Mock(), mocker.Mock(), name="compress")
+    cpu_job.link.resource_class = "cpu"
+    io_job = MockJob(mocker.Mock(), mocker.Mock(), mocker.Mock(), name="move")
+    io_job.link.resource_class = "io"
+
+    backend = PoolTaskBackend(worker_processes=1, resource_class_workers={"io": 2})
+    for job in (cpu_job, io_job):
+        backend.submit_task(
+            job, Task("command", "", None, None, {r"%relativeLocation%": "testfile"})
+        )
+
+    # Client scripts write to the database one at a time.
+    for job in (io_job, cpu_job):
+        assert [task.exit_code for task in backend.wait_for_results(job)] == [0]
+    assert backend.executors["io"] is backend.executors["cpu"] is backend.executor
+    assert backend.executor._max_workers == 1
+
+    backend.shutdown()
+
+
+def test_remote_workers_run_batches(simple_job, mocker, mock_execute_command):
+    mocker.patch.object(TaskBackend, "TASK_BATCH_SIZE", 2)
+
+    def execute_command(task_name: str, batch_payload, on_task_result=None):
+        # The first task is streamed, the batch reports the same result.
+        task_ids = list(batch_payload["tasks"])
+        results = {task_id: {"exitCode": 1} for task_id in task_ids}
+        results[task_ids[0]] = {"exitCode": 0}
+        on_task_result(task_ids[0], results[task_ids[0]])
+        return {"task_results": results}
+
+    mock_execute_command.side_effect = execute_command
+
+    backend = RemoteTaskBackend(worker_processes=2, lease_duration=60)
+    tasks = [
+        Task("command", "", None, None, {r"%relativeLocation%": "testfile"})
+        for item in range(3)
+    ]
+    for task in tasks:
+        backend.submit_task(simple_job, task)
+
+    worker = RemoteWorker(backend.leases, poll_interval=0.01)
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    try:
+        results = list(backend.wait_for_results(simple_job))
+    finally:
+        worker.stop()
+        thread.join()
+
+    assert sorted(task.exit_code for task in results) == [0, 0, 1]
+    assert all(task.done for task in tasks)
+
+    backend.shutdown()
+
+
+def test_expired_leases_are_handed_over():
+    task_results = queue.Queue()
+    leases = BatchLeases(task_results, lease_duration=0)
+    payload = {"tasks": {task_id: {} for task_id in ("a", "b", "c")}}
+    future = leases.submit("default", "test_v0.0", payload)
+
+    lease = leases.lease("worker1")
+    assert lease["payload"] == payload
+    assert leases.lease("worker2") is None
+    assert leases.report_task_result("worker1", lease["batch_id"], "a", {"exitCode": 0})
+    assert task_results.get_nowait() == ("a", {"exitCode": 0})
+
+    # The worker died, the batch is handed over with the tasks left.
+    leases.expire_leases()
+    assert leases.heartbeat("worker1", [lease["batch_id"]]) == [lease["batch_id"]]
+    assert not leases.report_task_result(
+        "worker1", lease["batch_id"], "b", {"exitCode": 0}
+    )
+    lease = leases.lease("worker2", ["default"])
+    assert list(lease["payload"]["tasks"]) == ["b", "c"]
+    assert leases.complete(
+        "worker2",
+        lease["batch_id"],
+        {"task_results": {"b": {"exitCode": 1}, "c": {"exitCode": 0}}, "duration": 1},
+    )
+
+    assert future.result(timeout=1) == {
+        "task_results": {
+            "a": {"exitCode": 0},
+            "b": {"exitCode": 1},
+            "c": {"exitCode": 0},
+        }
+    }
+
+
+def test_batches_lost_too_many_times_fail():
+    leases = BatchLeases(queue.Queue(), lease_duration=0)
+    future = leases.submit("cpu", "test_v0.0", {"tasks": {"a": {}}})
+
+    assert leases.lease("worker1", ["io"]) is None
+    for attempt in range(BatchLeases.MAX_ATTEMPTS):
+        assert leases.lease(f"worker{attempt}", ["cpu"]) is not None
+        leases.expire_leases()
+
+    with pytest.raises(WorkerLostError):
+        future.result(timeout=1)
+    assert leases.lease("worker1") is None
+
+
+def test_workers_only_report_tasks_of_their_batch():
+    task_results = queue.Queue()
+    leases = BatchLeases(task_results, lease_duration=60)
+    future = leases.submit("default", "test_v0.0", {"tasks": {"a": {}}})
+    leases.submit("default", "test_v0.0", {"tasks": {"b": {}}})
+
+    lease = leases.lease("worker1")
+    assert not leases.report_task_result(
+        "worker1", lease["batch_id"], "b", {"exitCode": 0}
+    )
+    assert task_results.empty()
+
+    assert leases.complete(
+        "worker1",
+        lease["batch_id"],
+        {"task_results": {"a": {"exitCode": 0}, "b": {"exitCode": 0}}},
+    )
+    assert future.result(timeout=1) == {"task_results": {"a": {"exitCode": 0}}}
+
+
+def test_worker_service():
+    leases = BatchLeases(queue.Queue(), lease_duration=60)
+    payload = {
+        "tasks": {
+            "a": {
+                "uuid": "a",
+                "createdDate": "2026-10-17 07:00:00+00:00",
+                "arguments": '"%SIPDirectory%" "file"',
+                "argv": ["%SIPDirectory%", "file"],
+                "wants_output": True,
+                "execute": "test_v0.0",
+            }
+        }
+    }
+    future = leases.submit("default", "test_v0.0", payload)
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=1))
+    worker_service_api.service_pb2_grpc.add_WorkerServiceServicer_to_server(
+        WorkerService(leases), server
+    )
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    finished = datetime.datetime.now(datetime.timezone.utc)
+    try:
+        with grpc.insecure_channel(f"127.0.0.1:{port}") as channel:
+            client = WorkerServiceClient(channel)
+            lease = client.lease("worker1", ["default"])
+            assert lease["payload"] == payload
+            assert lease["lease_duration"] == 60
+            assert client.heartbeat("worker1", [lease["batch_id"]]) == []
+            result = {
+                "exitCode": 0,
+                "finishedTimestamp": finished,
+                "stdout": "out",
+                "stderror": "",
+                "packageUpdates": {
+                    "sip_path": "%sharedPath%sip/",
+                    "context": {"%choice%": "value"},
+                },
+            }
+            assert client.report_task_result("worker1", lease["batch_id"], "a", result)
+            assert client.complete(
+                "worker1",
+                lease["batch_id"],
+                {"task_results": {"a": result}, "duration": 1.5},
+            )
+            assert client.lease("worker1") is None
+    finally:
+        server.stop(None)
+
+    assert future.result(timeout=1) == {"task_results": {"a": result}, "duration": 1.5}
@@ -204,3 +204,24 @@ def test_workflow_integration(
 
     # Workflow is over; we're done
     assert package_queue.job_queue.qsize() == 0
+
+
+def test_job_chain_walks_the_plan(mocker, workflow):
+    package = mocker.Mock(config=ProcessingConfig())
+    plan = workflow.get_plan(package.config)
+    job_chain = JobChain(package, workflow, workflow.get_initiator(), plan=plan)
+
+    links = []
+    for job in job_chain:
+        links.append(job.link.id)
+        job.exit_code = 0
+
+    # The decision link is folded into the plan, no job runs it.
+    assert links == [
+        "3b5dd6a5-b951-4e44-b00d-1180e5557beb",
+        "47bf2a2c-8d72-4f36-96d0-53b53a2bbc3f",
+        "5678bbab-c0ea-4b3c-9de9-addc92d0de50",
+        "c38f7b32-6f0c-48a5-a5f6-6dbe97ca75ba",
+        "de6eb412-0029-4dbd-9bfa-7311697d6012",
+        "f8e4c1ee-3e43-4caa-a664-f6b6bd8f156e",
+    ]
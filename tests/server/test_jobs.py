@@ -0,0 +1,192 @@
+import collections
+import tracemalloc
+import uuid
+
+import pytest
+from django.utils import timezone
+
+from a3m.api.transferservice.v1beta1 import request_response_pb2
+from a3m.client.mcp import _parse_command_line
+from a3m.main import models
+from a3m.server.jobs.client import CommandTemplate
+from a3m.server.jobs.client import FilesClientScriptJob
+from a3m.server.packages import get_package_jobs
+from a3m.server.tasks import Task
+from a3m.server.transfer_service import TransferService
+
+
+ARGUMENTS = (
+    '"%relativeLocation%" "%fileUUID%" --date "%date%" "%SIPDirectory%%SIPName%"'
+)
+
+
+def test_command_template_renders_arguments():
+    replacements = collections.ChainMap(
+        {r"%relativeLocation%": '/tmp/a "b" \\ `c`.txt', r"%fileUUID%": "uuid"},
+        {r"%SIPDirectory%": "/sip/", r"%SIPName%": "name", r"%fileUUID%": "None"},
+    )
+    template = CommandTemplate(ARGUMENTS)
+
+    assert template.placeholders == {
+        r"%relativeLocation%",
+        r"%fileUUID%",
+        r"%date%",
+        r"%SIPDirectory%",
+        r"%SIPName%",
+    }
+    # Values are escaped for the command line, as it's stored in the database.
+    assert (
+        template.render(replacements)
+        == r'"/tmp/a \"b\" \\ \`c\`.txt" "uuid" --date "%date%" "/sip/name"'
+    )
+    # Same as the arguments MCPClient would parse, without the round trip.
+    assert template.render_argv(replacements) == _parse_command_line(
+        template.render(replacements)
+    )
+    assert template.render_argv(replacements) == [
+        '/tmp/a "b" \\ `c`.txt',
+        "uuid",
+        "--date",
+        "%date%",
+        "/sip/name",
+    ]
+
+
+def test_tasks_share_the_job_context():
+    job_context = {rf"%config:option{i}%": f"value{i}" for i in range(40)}
+    job_context.update({r"%SIPDirectory%": "/sip/", r"%SIPName%": "name"})
+    template = CommandTemplate(ARGUMENTS)
+
+    def create_task(index):
+        file_context = {
+            r"%fileUUID%": f"{index:036d}",
+            r"%relativeLocation%": f"/sip/objects/file{index}.txt",
+            r"%fileName%": f"file{index}",
+            r"%fileExtension%": "txt",
+        }
+        replacements = collections.ChainMap(file_context, job_context)
+        return Task(
+            "command",
+            template.render(replacements),
+            None,
+            None,
+            job_context,
+            argv=template.render_argv(replacements),
+            file_context=file_context,
+        )
+
+    count = 10000
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tasks = [create_task(index) for index in range(count)]
+        size = (tracemalloc.get_traced_memory()[0] - before) / count
+    finally:
+        tracemalloc.stop()
+
+    assert tasks[0].context[r"%fileUUID%"] == "0" * 36
+    assert tasks[0].context[r"%SIPName%"] == "name"
+    assert all(task.job_context is job_context for task in tasks)
+    # Copying the job context into every task took about 2.7 KiB per task.
+    assert size < 1536
+
+
+@pytest.mark.django_db(transaction=True)
+def test_files_without_rules_are_skipped(mocker):
+    rule_index = mocker.patch("a3m.server.jobs.client.rule_index")
+    tasks_skipped = mocker.patch("a3m.server.metrics.tasks_skipped")
+    format_version = uuid.uuid4()
+    rule_index.get_format_versions.side_effect = lambda purpose: (
+        frozenset([format_version]) if purpose == "characterization" else frozenset()
+    )
+    files = [{r"%fileUUID%": str(uuid.uuid4())} for _ in range(3)]
+    files.append({r"%fileUUID%": "None"})
+    rule_index.get_file_format_versions.return_value = {
+        files[0][r"%fileUUID%"]: format_version,
+        files[1][r"%fileUUID%"]: uuid.uuid4(),
+    }
+    link = mocker.Mock(
+        config={
+            "execute": "characterize_file",
+            "skip_files_without_rules": {
+                "purposes": ["characterization"],
+                "match_format": True,
+            },
+        }
+    )
+    package = mocker.Mock(**{"files.return_value": iter(files)})
+    job = FilesClientScriptJob(mocker.Mock(), link, package)
+    job.task_backend = mocker.Mock()
+    sip = models.SIP.objects.create(uuid=str(uuid.uuid4()))
+    models.Job.objects.create(
+        jobuuid=job.uuid, sipuuid=sip.pk, createdtime=timezone.now()
+    )
+
+    job.submit_tasks()
+
+    rule_index.get_file_format_versions.assert_called_once_with(
+        [item[r"%fileUUID%"] for item in files]
+    )
+    (task_call,) = job.task_backend.submit_task.call_args_list
+    assert task_call.args[1].file_context is files[0]
+    assert job.skipped_files == 3
+    tasks_skipped.assert_called_once_with(job, 3)
+    # The count outlives the job, in Read and ListTasks.
+    (job_message,) = get_package_jobs(sip.pk)
+    assert job_message.skipped_tasks == 3
+    resp = TransferService(None, None, None).ListTasks(
+        request_response_pb2.ListTasksRequest(job_id=str(job.uuid)), mocker.Mock()
+    )
+    assert resp.skipped_tasks == 3
+
+
+def test_files_are_not_skipped_with_default_rules(mocker):
+    rule_index = mocker.patch("a3m.server.jobs.client.rule_index")
+    rule_index.get_format_versions.return_value = frozenset([uuid.uuid4()])
+    link = mocker.Mock(
+        config={
+            "execute": "validate_file",
+            "skip_files_without_rules": {
+                "purposes": ["validation", "default_validation"],
+                "match_format": True,
+            },
+        }
+    )
+    package = mocker.Mock(**{"files.return_value": iter([{r"%fileUUID%": "None"}])})
+    job = FilesClientScriptJob(mocker.Mock(), link, package)
+    job.task_backend = mocker.Mock()
+
+    job.submit_tasks()
+
+    rule_index.get_file_format_versions.assert_not_called()
+    assert job.task_backend.submit_task.call_count == 1
+    assert job.skipped_files == 0
+
+
+@pytest.mark.django_db
+def test_resumed_job_only_runs_unfinished_tasks(mocker):
+    resumed_job = models.Job.objects.create(
+        createdtime=timezone.now(), currentstep=models.Job.STATUS_FAILED
+    )
+    files = [{r"%fileUUID%": str(uuid.uuid4())} for _ in range(3)]
+    for file_replacements, exit_code in zip(files, (0, 2, None)):
+        models.Task.objects.create(
+            taskuuid=str(uuid.uuid4()),
+            job=resumed_job,
+            createdtime=timezone.now(),
+            fileuuid=file_replacements[r"%fileUUID%"],
+            endtime=timezone.now() if exit_code is not None else None,
+            exitcode=exit_code,
+        )
+    link = mocker.Mock(config={"execute": "normalize_v1.0"})
+    package = mocker.Mock(**{"files.return_value": iter(files)})
+    job = FilesClientScriptJob(mocker.Mock(), link, package)
+    job.resumed_job_id = resumed_job.jobuuid
+    job.task_backend = mocker.Mock()
+
+    job.submit_tasks()
+
+    (task_call,) = job.task_backend.submit_task.call_args_list
+    assert task_call.args[1].file_context is files[2]
+    assert job.resumed_files == 2
+    assert job.exit_code == 2
@@ -8,7 +8,11 @@ import pytest
 
 from a3m.api.transferservice.v1beta1.request_response_pb2 import ProcessingConfig
 from a3m.main import models
+from a3m.server.packages import get_final_status
+from a3m.server.packages import get_package_status
 from a3m.server.packages import Package
+from a3m.server.packages import PackageContext
+from a3m.server.packages import PackageStatus
 from a3m.server.queues import PackageQueue
 from a3m.server.workflow import load as load_workflow
 
@@ -184,3 +188,205 @@ def test_package_files_with_non_ascii_names(tmp_path, package):
     assert result[0]["%fileUUID%"] == str(kwargs["uuid"])
     assert result[0]["%currentLocation%"] == kwargs["currentlocation"]
     assert result[0]["%fileGrpUse%"] == kwargs["filegrpuse"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_get_package_status(package_queue, mocker, django_assert_num_queries):
+    sip = models.SIP.objects.create(
+        uuid=str(uuid.uuid4()), status=models.SIP.STATUS_PROCESSING
+    )
+    package = Package(
+        "name",
+        "file:///tmp/foobar.gz",
+        ProcessingConfig(),
+        models.Transfer.objects.create(uuid=uuid.uuid4()),
+        sip,
+    )
+    package_queue.statuses.set_processing(package.uuid, "Remove hidden files")
+
+    with django_assert_num_queries(0):
+        package_status = get_package_status(package_queue, package.uuid)
+
+    assert package_status == PackageStatus(
+        status=models.SIP.STATUS_PROCESSING, job="Remove hidden files"
+    )
+
+    job = mocker.Mock(group="Failed transfer", description="Move to failed")
+    package_queue.activate_package(package)
+    package_queue.deactivate_package(package, get_final_status(job), job.group)
+
+    with django_assert_num_queries(0):
+        package_status = get_package_status(package_queue, package.uuid)
+
+    assert package_status.status == models.SIP.STATUS_FAILED
+    sip.refresh_from_db()
+    assert sip.status == models.SIP.STATUS_FAILED
+
+    # Packages unknown to the queue are looked up in the database.
+    package_status = get_package_status(
+        PackageQueue(package_queue.executor), package.uuid, include_jobs=True
+    )
+
+    assert package_status == PackageStatus(status=models.SIP.STATUS_FAILED)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_packages(
+    package_queue, workflow, mocker, django_assert_max_num_queries
+):
+    executor = mocker.Mock()
+    submissions = [
+        (f"name{index}", f"file:///tmp/{index}.gz", ProcessingConfig(), None)
+        for index in range(10)
+    ]
+
+    with django_assert_max_num_queries(6):
+        packages = Package.create_packages(
+            package_queue, executor, workflow, submissions
+        )
+
+    assert [package.name for package in packages] == [item[0] for item in submissions]
+    assert models.Transfer.objects.count() == 10
+    assert models.SIP.objects.filter(status=models.SIP.STATUS_PROCESSING).count() == 10
+    assert models.SIP.objects.get(pk=packages[0].uuid).transfer_id == str(
+        packages[0].transfer.pk
+    )
+    assert models.PackageCheckpoint.objects.count() == 10
+    executor.submit.assert_called_once_with(
+        Package.trigger_workflows, packages, package_queue, workflow, reserved=True
+    )
+    assert package_queue.reserved == 10
+
+    # Nothing is created if any of the submissions is invalid.
+    with pytest.raises(ValueError):
+        Package.create_packages(
+            package_queue, executor, workflow, submissions + [("name", "", None, None)]
+        )
+    assert models.Transfer.objects.count() == 10
+
+
+@pytest.mark.django_db(transaction=True)
+def test_packages_that_do_not_fit_in_the_queue_fail(workflow, mocker):
+    executor = mocker.Mock()
+    package_queue = PackageQueue(
+        executor, threading.Event(), max_concurrent_packages=1, max_queued_packages=2
+    )
+    packages = Package.create_packages(
+        package_queue,
+        executor,
+        workflow,
+        [
+            (f"name{index}", "file:///tmp/foobar.gz", ProcessingConfig(), None)
+            for index in range(2)
+        ],
+    )
+    # Only one of them fits once they're scheduled, e.g. because resumed
+    # packages took the room meanwhile.
+    package_queue.queue.maxsize = 1
+    package_queue.active_packages["other"] = mocker.Mock()
+    watched = package_queue.watch(packages[1].uuid)
+
+    Package.trigger_workflows(packages, package_queue, workflow, reserved=True)
+
+    assert package_queue.queue.qsize() == 1
+    assert models.SIP.objects.get(pk=packages[1].uuid).status == (
+        models.SIP.STATUS_FAILED
+    )
+    assert watched.get(timeout=1) is None
+    assert package_queue.reserved == 0
+
+
+def test_estimate_size(tmp_path, mocker):
+    # Escaped in the URL of the package.
+    source = tmp_path / "source dir"
+    (source / "subdir").mkdir(parents=True)
+    (source / "file1.txt").write_text("12345")
+    (source / "subdir" / "file2.txt").write_text("123")
+
+    package = Package("name", source.as_uri(), None, mocker.Mock(), mocker.Mock())
+    package.estimate_size()
+
+    assert (package.file_count, package.byte_size) == (2, 8)
+
+    package.estimate_size(max_files=1)
+
+    assert package.file_count == 1
+
+    package = Package(
+        "name", "https://example.com/transfer.zip", None, mocker.Mock(), mocker.Mock()
+    )
+    package.estimate_size()
+
+    assert package.file_count is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_package_state_is_kept_in_memory(package, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        assert len(package.context) == 0
+        mapping = package.get_replacement_mapping()
+        assert package.get_replacement_mapping() is mapping
+
+    package.apply_updates(
+        {
+            "transfer_path": "%sharedPath%moved/transfer/",
+            "sip_path": "%sharedPath%moved/sip/",
+            "aip_filename": "aip.7z",
+            "context": {r"%choice%": "value"},
+        }
+    )
+
+    mapping = package.get_replacement_mapping()
+    assert mapping[r"%transferDirectory%"].endswith("/moved/transfer/")
+    assert package.context[r"%choice%"] == "value"
+
+    package.start_ingest()
+
+    mapping = package.get_replacement_mapping()
+    assert mapping[r"%SIPDirectory%"].endswith("/moved/sip/")
+    assert mapping[r"%AIPFilename%"] == "aip.7z"
+
+    # Context values are saved, so they're found again after a restart.
+    context = PackageContext.load_from_db(package.transfer.pk)
+    assert context[r"%choice%"] == "value"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_packages_are_resumed_after_restart(package_queue, workflow, mocker):
+    executor = mocker.Mock()
+    config = ProcessingConfig(normalize=True)
+    resumed, interrupted, done = Package.create_packages(
+        package_queue,
+        executor,
+        workflow,
+        [(f"name{index}", "file:///tmp/foobar.gz", config, 1) for index in range(3)],
+    )
+    link = next(link for link in workflow.get_links().values() if not link.is_initiator)
+    resumed.start_ingest()
+    resumed.save_checkpoint(mocker.Mock(link=link, uuid=uuid.uuid4()))
+    models.PackageCheckpoint.objects.filter(sip_id=interrupted.uuid).delete()
+    done.save_status(models.SIP.STATUS_COMPLETE)
+
+    Package.cleanup_old_db_entries()
+    packages = Package.resume_packages(package_queue, executor, workflow)
+
+    assert models.SIP.objects.get(pk=interrupted.uuid).status == (
+        models.SIP.STATUS_FAILED
+    )
+    (package,) = packages
+    assert package.uuid == resumed.uuid
+    assert (package.name, package.priority) == ("name0", 1)
+    assert package.config == config
+    assert package.stage is resumed.stage
+    assert package.current_path == resumed.current_path
+    assert package.resumed_link_id == link.id
+    executor.submit.assert_called_with(
+        Package.trigger_workflows, packages, package_queue, workflow
+    )
+
+    package_queue = mocker.Mock()
+    Package.trigger_workflows(packages, package_queue, workflow)
+
+    (job,), _ = package_queue.schedule_job.call_args
+    assert job.link is link
+    assert job.resumed_job_id == package.resumed_job_id
@@ -1,3 +1,4 @@
+import asyncio
 import concurrent.futures
 import os
 import queue
@@ -9,6 +10,7 @@ import pytest
 from a3m.api.transferservice.v1beta1.request_response_pb2 import ProcessingConfig
 from a3m.server.jobs import Job
 from a3m.server.packages import Package
+from a3m.server.queues import AsyncPackageQueue
 from a3m.server.queues import PackageQueue
 from a3m.server.workflow import Link
 
@@ -27,6 +29,12 @@ class MockJob(Job):
         self.job_ran.set()
 
 
+class WaitingJob(MockJob):
+    async def run_async(self, executor):
+        self.job_ran.set()
+        await self.may_finish.wait()
+
+
 @pytest.fixture(scope="module")
 def simple_executor(request):
     return concurrent.futures.ThreadPoolExecutor(max_workers=1)
@@ -112,6 +120,8 @@ def test_active_transfer_limit(
 ):
     test_job1 = MockJob(mocker.Mock(), workflow_link, package)
     test_job2 = MockJob(mocker.Mock(), workflow_link, package_2)
+    mocker.patch.object(package, "estimate_size")
+    mocker.patch.object(package_2, "estimate_size")
 
     package_queue.schedule_job(test_job1)
 
@@ -122,6 +132,10 @@ def test_active_transfer_limit(
 
     assert package_queue.job_queue.qsize() == 1
 
+    # Only the size of the package that waits is estimated.
+    package.estimate_size.assert_not_called()
+    package_2.estimate_size.assert_called_once_with()
+
     package_queue.process_one_job(timeout=0.1)
 
     # give ourselves up to 1 sec for other threads to spin up
@@ -155,3 +169,55 @@ def test_queue_next_job_raises_full(
 
     with pytest.raises(queue.Full):
         package_queue.queue_next_job()
+
+
+def test_watch_package(package_queue, package, workflow_link, mocker):
+    test_job = MockJob(mocker.Mock(), workflow_link, package)
+    updates = package_queue.watch(package.uuid)
+
+    package_queue.schedule_job(test_job)
+    package_queue.process_one_job(timeout=0.1)
+
+    assert updates.get(timeout=1.0) == (test_job, Job.STATUS_EXECUTING_COMMANDS)
+    assert updates.get(timeout=1.0) == (test_job, Job.STATUS_COMPLETED_SUCCESSFULLY)
+
+    package_queue.deactivate_package(package)
+
+    assert updates.get(timeout=1.0) is None
+
+    package_queue.unwatch(package.uuid, updates)
+
+    assert package_queue.watchers == {}
+
+
+def test_async_queue_jobs_wait_without_threads(
+    simple_executor, package, package_2, workflow_link, mocker
+):
+    package_queue = AsyncPackageQueue(
+        simple_executor, max_concurrent_packages=2, max_queued_packages=2
+    )
+    jobs = [
+        WaitingJob(mocker.Mock(), workflow_link, package),
+        WaitingJob(mocker.Mock(), workflow_link, package_2),
+    ]
+
+    async def main():
+        for job in jobs:
+            job.may_finish = asyncio.Event()
+        worker = asyncio.create_task(package_queue.work_async())
+        for job in jobs:
+            # Jobs are picked up as soon as they are scheduled from a thread.
+            await asyncio.to_thread(package_queue.schedule_job, job)
+        for job in jobs:
+            assert await asyncio.to_thread(job.job_ran.wait, 1.0)
+
+        # Both jobs are running, while the executor has a single thread.
+        assert package_queue.job_queue.qsize() == 0
+        assert package_queue.active_packages.keys() == {package.uuid, package_2.uuid}
+
+        for job in jobs:
+            job.may_finish.set()
+        package_queue.stop()
+        await worker
+
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+import queue
+
+import pytest
+
+from a3m.server import scheduling
+from a3m.server.scheduling import FairSharePolicy
+from a3m.server.scheduling import PackageScheduler
+
+
+class FakePackage:
+    def __init__(self, priority=None, file_count=None, byte_size=None):
+        self.priority = priority
+        self.file_count = file_count
+        self.byte_size = byte_size
+
+
+class FakeJob:
+    def __init__(self, package):
+        self.package = package
+
+
+@pytest.fixture
+def clock(mocker):
+    clock = mocker.patch("a3m.server.scheduling.time")
+    clock.time.return_value = 1000.0
+    return clock
+
+
+def test_fifo_keeps_the_order_of_arrival(clock):
+    scheduler = PackageScheduler(maxsize=2)
+    jobs = [FakeJob(FakePackage(scheduling.PRIORITY_LOW)), FakeJob(FakePackage())]
+    for job in jobs:
+        scheduler.put_nowait(job)
+
+    with pytest.raises(queue.Full):
+        scheduler.put_nowait(FakeJob(FakePackage()))
+
+    assert [scheduler.get_nowait() for _ in jobs] == jobs
+    with pytest.raises(queue.Empty):
+        scheduler.get_nowait()
+
+
+def test_fair_share_prefers_high_priority_and_small_packages(clock):
+    scheduler = PackageScheduler(FairSharePolicy())
+    large = FakeJob(FakePackage(file_count=10000, byte_size=2 * 1024**4))
+    low = FakeJob(FakePackage(scheduling.PRIORITY_LOW, 1, 10))
+    small = FakeJob(FakePackage(file_count=10, byte_size=1024))
+    high = FakeJob(FakePackage(scheduling.PRIORITY_HIGH))
+    for job in (large, low, small, high):
+        scheduler.put_nowait(job)
+
+    assert [scheduler.get_nowait() for _ in range(4)] == [high, small, low, large]
+
+
+def test_fair_share_ages_waiting_packages(clock):
+    scheduler = PackageScheduler(FairSharePolicy())
+    large = FakeJob(FakePackage(file_count=10000, byte_size=2 * 1024**4))
+    scheduler.put_nowait(large)
+
+    # Small packages submitted later go first, until the large one has waited
+    # long enough.
+    clock.time.return_value += 60
+    small = FakeJob(FakePackage(file_count=1, byte_size=1))
+    scheduler.put_nowait(small)
+    assert scheduler.get_nowait() is small
+
+    clock.time.return_value += FairSharePolicy.MAX_SIZE_DELAY
+    scheduler.put_nowait(small)
+    assert scheduler.get_nowait() is large
+
+
+def test_get_policy():
+    assert isinstance(scheduling.get_policy("fair_share"), FairSharePolicy)
+    with pytest.raises(ValueError):
+        scheduling.get_policy("unknown")
@@ -0,0 +1,193 @@
+import concurrent.futures
+import threading
+import uuid
+
+import grpc
+import pytest
+from django.utils import timezone
+from google.protobuf import field_mask_pb2
+
+from a3m.api.transferservice.v1beta1 import request_response_pb2
+from a3m.api.transferservice.v1beta1 import service_pb2_grpc
+from a3m.main import models
+from a3m.server.queues import PackageQueue
+from a3m.server.rpc.client import Client
+from a3m.server.transfer_service import TransferService
+
+
+class AbortError(Exception):
+    pass
+
+
+@pytest.fixture
+def context(mocker):
+    context = mocker.Mock()
+    context.abort.side_effect = AbortError
+    return context
+
+
+@pytest.fixture
+def job(db):
+    job = models.Job.objects.create(
+        jobuuid=uuid.uuid4(), sipuuid=uuid.uuid4(), createdtime=timezone.now()
+    )
+    for index in range(5):
+        models.Task.objects.create(
+            taskuuid=str(uuid.uuid4()),
+            job=job,
+            createdtime=timezone.now(),
+            starttime=timezone.now(),
+            endtime=timezone.now(),
+            filename=f"{'objects' if index % 2 else 'metadata'}/file{index}.txt",
+            exitcode=index % 3,
+            stdout="output",
+            stderror="errors",
+        )
+    # Still running.
+    models.Task.objects.create(
+        taskuuid=str(uuid.uuid4()),
+        job=job,
+        createdtime=timezone.now(),
+        starttime=timezone.now(),
+        filename="objects/running.txt",
+    )
+    return job
+
+
+def test_list_tasks_paginates(job, context):
+    service = TransferService(None, None, None)
+    request = request_response_pb2.ListTasksRequest(job_id=str(job.pk), page_size=2)
+    pages = []
+    while True:
+        resp = service.ListTasks(request, context)
+        pages.append([task.id for task in resp.tasks])
+        if not resp.next_page_token:
+            break
+        request.page_token = resp.next_page_token
+
+    assert [len(page) for page in pages] == [2, 2, 2]
+    assert sorted(sum(pages, [])) == sorted(
+        models.Task.objects.values_list("taskuuid", flat=True)
+    )
+
+
+def test_list_tasks_filters_and_masks_fields(job, context):
+    service = TransferService(None, None, None)
+    request = request_response_pb2.ListTasksRequest(
+        job_id=str(job.pk),
+        filter=request_response_pb2.TaskFilter(failed=True, filename_prefix="objects/"),
+        read_mask=field_mask_pb2.FieldMask(paths=["filename", "exit_code"]),
+    )
+
+    resp = service.ListTasks(request, context)
+
+    assert sorted((task.filename, task.exit_code) for task in resp.tasks) == [
+        ("objects/file1.txt", 1),
+    ]
+    assert resp.tasks[0].stdout == ""
+    assert not resp.tasks[0].HasField("start_time")
+
+    request.read_mask.paths.append("unknown")
+    with pytest.raises(AbortError):
+        service.ListTasks(request, context)
+
+
+def test_stream_tasks(job, context):
+    service = TransferService(None, None, None)
+    service.STREAM_CHUNK_SIZE = 2
+    request = request_response_pb2.StreamTasksRequest(
+        job_id=str(job.pk), filter=request_response_pb2.TaskFilter(failed=True)
+    )
+
+    responses = list(service.StreamTasks(request, context))
+
+    assert [len(resp.tasks) for resp in responses] == [2, 1]
+    assert {task.exit_code for resp in responses for task in resp.tasks} == {1, 2}
+    assert {task.stdout for resp in responses for task in resp.tasks} == {"output"}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_submit_batch(context, mocker):
+    executor = mocker.Mock()
+    service = TransferService(None, PackageQueue(executor), executor)
+    request = request_response_pb2.SubmitBatchRequest(
+        transfers=[
+            request_response_pb2.SubmitRequest(name=f"name{index}", url="file:///a")
+            for index in range(3)
+        ]
+    )
+
+    resp = service.SubmitBatch(request, context)
+
+    assert len(resp.ids) == 3
+    assert models.SIP.objects.filter(uuid__in=resp.ids).count() == 3
+    executor.submit.assert_called_once()
+
+    request.transfers.add(name="missing url")
+    with pytest.raises(AbortError):
+        service.SubmitBatch(request, context)
+    context.abort.assert_called_once_with(3, "No url provided.")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_submit_batch_rejects_batches_larger_than_the_queue(context, mocker):
+    executor = mocker.Mock()
+    package_queue = PackageQueue(executor, max_queued_packages=2)
+    service = TransferService(None, package_queue, executor)
+    request = request_response_pb2.SubmitBatchRequest(
+        transfers=[
+            request_response_pb2.SubmitRequest(name=f"name{index}", url="file:///a")
+            for index in range(3)
+        ]
+    )
+
+    with pytest.raises(AbortError):
+        service.SubmitBatch(request, context)
+
+    context.abort.assert_called_once_with(
+        grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many packages"
+    )
+    assert models.SIP.objects.count() == 0
+    assert package_queue.reserved == 0
+    executor.submit.assert_not_called()
+
+
+def test_watchers_do_not_starve_other_calls(mocker):
+    package_id = str(uuid.uuid4())
+    package_queue = PackageQueue(mocker.Mock(), threading.Event())
+    package_queue.statuses.set_processing(package_id, "Job")
+    mocker.patch("a3m.server.packages.get_package_jobs", return_value=[])
+    mocker.patch("a3m.server.transfer_service.get_package_jobs", return_value=[])
+    mocker.patch(
+        "a3m.server.transfer_service.Package.create_package",
+        return_value=mocker.Mock(uuid=package_id),
+    )
+    rpc_threads = 2
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=rpc_threads))
+    service = TransferService(None, package_queue, None, max_watches=1)
+    service_pb2_grpc.add_TransferServiceServicer_to_server(service, server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    channel = grpc.insecure_channel(f"localhost:{port}")
+    client = Client(channel)
+    client.POLL_INTERVAL = 0.05
+
+    # More clients than RPC threads wait for the package.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        waiting = [
+            executor.submit(client.wait_until_complete, package_id) for _ in range(4)
+        ]
+        resp = client.submit("file:///a", "name")
+        assert resp.id == package_id
+
+        package_queue.statuses.set_done(
+            package_id, request_response_pb2.PACKAGE_STATUS_COMPLETE, "Done"
+        )
+        package_queue.notify(package_id, None)
+        results = [future.result(timeout=10) for future in waiting]
+
+    assert {resp.status for resp in results} == {
+        request_response_pb2.PACKAGE_STATUS_COMPLETE
+    }
+    channel.close()
+    server.stop(None)
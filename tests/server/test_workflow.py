@@ -1,4 +1,5 @@
 import os
+import types
 from io import StringIO
 
 import pytest
@@ -99,3 +100,41 @@ def test_get_schema_not_found(mocker):
     mocker.patch("a3m.server.workflow._LATEST_SCHEMA", "non-existen-schema")
     with pytest.raises(IOError):
         workflow._get_schema()
+
+
+def test_link_resource_class():
+    with open(os.path.join(ASSETS_DIR, "workflow.json")) as fp:
+        wf = workflow.load(fp)
+    resource_classes = {
+        link.config.get("execute"): link.resource_class
+        for link in wf.get_links().values()
+    }
+
+    assert resource_classes["compress_aip"] == "cpu"
+    assert resource_classes["a3m_store_aip"] == "io"
+    assert resource_classes["identify_file_format"] == workflow.DEFAULT_RESOURCE_CLASS
+
+
+def test_plan_folds_decision_links():
+    with open(os.path.join(FIXTURES_DIR, "workflow-integration-test.json")) as fp:
+        wf = workflow.load(fp)
+    fourth_link = wf.get_link("c38f7b32-6f0c-48a5-a5f6-6dbe97ca75ba")
+    decision_link = wf.get_link("d875dcf3-5e0e-4546-a66d-b2580c7a1a75")
+    final_link = wf.get_link("f8e4c1ee-3e43-4caa-a664-f6b6bd8f156e")
+
+    plan = wf.get_plan(types.SimpleNamespace())
+    assert wf.decision_attrs == ("run_fifth_link",)
+    assert plan.get_next_link(fourth_link, 0).id == (
+        "de6eb412-0029-4dbd-9bfa-7311697d6012"
+    )
+    assert plan.get_next_link(fourth_link, 1) is None
+    assert plan.get_next_link(final_link, 0) is None
+    assert plan.resolve(final_link.id) is final_link
+
+    plan = wf.get_plan(types.SimpleNamespace(run_fifth_link=False))
+    assert plan.get_next_link(fourth_link, 0) is final_link
+    assert plan.resolve(decision_link) is final_link
+
+    # Plans are cached by the values of the attributes decisions read.
+    assert wf.get_plan(types.SimpleNamespace(run_fifth_link=False, other=1)) is plan
+    assert wf.get_plan(types.SimpleNamespace(run_fifth_link=True)) is not plan